@@ -0,0 +1,146 @@
+"""
+Process-local cache for small, rarely changing tables.
+
+Each ReferenceTable keeps its loaded rows in memory next to a version stamp
+stored in the shared cache, which every web and worker process reads.
+Saving or deleting one of the table's models writes a new stamp once the
+transaction commits, and every process reloads the table the next time it
+reads a stamp that differs from the one it loaded. A process re-reads the
+stamp at most every VERSION_CHECK_INTERVAL seconds, so other processes pick
+up a change within that time; lookups are dictionary reads in between.
+
+Cached instances are shared by every request in the process, so treat
+them as read-only.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache import caches
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_delete, post_save
+
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_ALIAS = 'shared'
+VERSION_CHECK_INTERVAL = 5
+
+
+class ReferenceTable:
+    """A value built from the database and kept until one of its models changes."""
+
+    def __init__(self, name, models, load):
+        self.name = name
+        self.models = models
+        self._load = load
+        self._value = None
+        self._version = None
+        self._checked_version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def version_key(self):
+        return f'reference-data:{self.name}:version'
+
+    def get_version(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= VERSION_CHECK_INTERVAL:
+            cache = caches[SHARED_CACHE_ALIAS]
+            version = cache.get(self.version_key)
+            if version is None:
+                cache.add(self.version_key, uuid.uuid4().hex, None)
+                version = cache.get(self.version_key)
+            self._checked_version = version
+            self._checked_at = now
+        return self._checked_version
+
+    def get(self):
+        version = self.get_version()
+        if self._version != version or self._value is None:
+            with self._lock:
+                if self._version != version or self._value is None:
+                    # Stamp with the version read before loading, so a change
+                    # made while loading triggers another reload
+                    self._value = self._load()
+                    self._version = version
+        return self._value
+
+    def invalidate(self, **kwargs):
+        # Nothing reloads before the change is committed: a reload inside the
+        # transaction would keep its rows, and the old stamp, after a rollback
+        transaction.on_commit(self._set_new_version)
+
+    def _set_new_version(self):
+        version = uuid.uuid4().hex
+        caches[SHARED_CACHE_ALIAS].set(self.version_key, version, None)
+        self._checked_version = version
+        self._checked_at = time.monotonic()
+        self._value = None
+
+    def reset(self):
+        """Forget the loaded value and stamp, so the next read starts afresh."""
+        self._value = None
+        self._version = None
+        self._checked_version = None
+        self._checked_at = None
+
+
+class ModelReferenceTable(ReferenceTable):
+    """Every row of a model, keyed by one of its fields."""
+
+    def __init__(self, name, model, key='pk', queryset=None):
+        self.model = model
+        self.key = key
+        self.queryset = queryset if queryset is not None else model.objects.all()
+        super().__init__(name, [model], self._load_rows)
+
+    def _load_rows(self):
+        return {getattr(row, self.key): row for row in self.queryset.all()}
+
+    def get_object(self, key):
+        try:
+            return self.get()[key]
+        except KeyError:
+            raise self.model.DoesNotExist(
+                f'{self.model.__name__} with {self.key}={key!r} does not exist')
+
+    def all(self):
+        return list(self.get().values())
+
+
+class ReferenceDataRegistry:
+
+    def __init__(self):
+        self.tables = {}
+
+    def register(self, table):
+        """Register a table and invalidate it whenever one of its models changes."""
+        self.tables[table.name] = table
+        for model in table.models:
+            dispatch_uid = f'reference-data:{table.name}:{model._meta.label}'
+            post_save.connect(table.invalidate, sender=model,
+                              weak=False, dispatch_uid=dispatch_uid)
+            post_delete.connect(table.invalidate, sender=model,
+                                weak=False, dispatch_uid=dispatch_uid)
+        return table
+
+    def reset(self):
+        """Reset every registered table, e.g. after clearing the caches in tests."""
+        for table in self.tables.values():
+            table.reset()
+
+    def warm_up(self):
+        """Load every registered table, e.g. when a worker boots."""
+        for table in self.tables.values():
+            try:
+                table.get()
+            except DatabaseError:
+                logger.warning('Could not warm up reference data %s', table.name,
+                               exc_info=True)
+
+
+reference_data = ReferenceDataRegistry()
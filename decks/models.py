@@ -3,6 +3,7 @@ import re
 from django.db import models
 from requests import get, head
 from django.utils.translation import gettext_lazy as _
+from common.reference_data import ModelReferenceTable, reference_data
 
 
 class Set(models.Model):
@@ -85,13 +86,13 @@ class Deck(models.Model):
             data = r.json()['data']
             houses = data['_links']['houses']
             self.name = data['name']
-            self.set = Set.objects.get(id=data['expansion'])
-            self.house_1 = House.objects.get(
-                mv_id=houses[0]) if len(houses) > 0 else None
-            self.house_2 = House.objects.get(
-                mv_id=houses[1]) if len(houses) > 1 else None
-            self.house_3 = House.objects.get(
-                mv_id=houses[2]) if len(houses) > 2 else None
+            self.set = SETS.get_object(data['expansion'])
+            self.house_1 = HOUSES.get_object(
+                houses[0]) if len(houses) > 0 else None
+            self.house_2 = HOUSES.get_object(
+                houses[1]) if len(houses) > 1 else None
+            self.house_3 = HOUSES.get_object(
+                houses[2]) if len(houses) > 2 else None
             if save:
                 self.save()
         else:
@@ -100,3 +101,9 @@ class Deck(models.Model):
 
     def __str__(self):
         return self.name if self.name else str(self.id)
+
+
+SETS = reference_data.register(ModelReferenceTable('decks.sets', Set))
+HOUSES = reference_data.register(ModelReferenceTable(
+    'decks.houses', House, key='mv_id',
+    queryset=House.objects.filter(mv_id__isnull=False)))
@@ -11,7 +11,7 @@ from xml.etree.ElementTree import Element, SubElement, tostring
 
 from .models import Lineup, LineupNote, LineupVersion, LineupVersionNote, LineupVersionDeck
 from .forms import LineupForm, LineupNoteForm, LineupVersionForm, LineupVersionNoteForm
-from pmc.models import EventFormat
+from pmc.models import EVENT_FORMATS
 from decks.models import Deck
 
 
@@ -52,7 +52,7 @@ def lineup_list(request):
     page = request.GET.get('page', 1)
     lineups_page = paginator.get_page(page)
 
-    formats = EventFormat.objects.all()
+    formats = EVENT_FORMATS.all()
 
     context = {
         'lineups': lineups_page,
@@ -1,21 +1,10 @@
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from .models import Playgroup
-from .models import PlaygroupMember
-
-
-def _get_playgroup_slug(request):
-    chunks = request.path.split('/')
-    playgroup_slug = None
-    while len(chunks):
-        chunk = chunks.pop(0)
-        if chunk == 'pg':
-            playgroup_slug = chunks.pop(0)
-    return playgroup_slug
+from .middleware import get_request_playgroup
 
 
 def nav_links(request):
-    playgroup_slug = _get_playgroup_slug(request)
+    playgroup_slug = get_request_playgroup(request).slug
     nav_links = []
 
     nav_links.append({
@@ -25,10 +14,7 @@ def nav_links(request):
     })
 
     if playgroup_slug:
-        try:
-            current_playgroup = Playgroup.objects.get(slug=playgroup_slug)
-        except Playgroup.DoesNotExist:
-            current_playgroup = None
+        current_playgroup = get_request_playgroup(request).playgroup
 
         nav_links.append({
             'name': _('Home'),
@@ -100,24 +86,13 @@ def nav_links(request):
 
 
 def playgroup(request):
-    playgroup_slug = _get_playgroup_slug(request)
-    try:
-        return {'playgroup': Playgroup.objects.get(slug=playgroup_slug)} if playgroup_slug else {}
-    except Playgroup.DoesNotExist:
-        return {}
+    current_playgroup = get_request_playgroup(request).playgroup
+    return {'playgroup': current_playgroup} if current_playgroup else {}
 
 
 def playgroup_member(request):
-    playgroup_slug = _get_playgroup_slug(request)
-    try:
-        return {'playgroup_member': PlaygroupMember.objects.get(
-            playgroup__slug=playgroup_slug,
-            user=request.user
-        )} if playgroup_slug and request.user else {}
-    except PlaygroupMember.DoesNotExist:
-        return {}
-    except TypeError:
-        return {}
+    member = get_request_playgroup(request).member
+    return {'playgroup_member': member} if member else {}
 
 
 def pmc_profile(request):
@@ -0,0 +1,169 @@
+"""
+Geometry helpers for the playgroup finder.
+
+Venues store a geohash of their coordinates. Geohashes that share a prefix
+lie in the same cell, so a sorted list of them doubles as a grid index:
+every venue in a cell is a contiguous run found with two bisections.
+Nearest-neighbour searches use a KD-tree over points on the unit sphere,
+where straight-line distance orders points the same way as great-circle
+distance, so no special handling is needed at the poles or antimeridian.
+"""
+
+import heapq
+import itertools
+import math
+
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    geohash = []
+    char = 0
+    bit = 0
+    is_longitude_bit = True
+    while len(geohash) < precision:
+        if is_longitude_bit:
+            value_range, value = longitude_range, longitude
+        else:
+            value_range, value = latitude_range, latitude
+        middle = (value_range[0] + value_range[1]) / 2
+        char <<= 1
+        if value >= middle:
+            char |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        is_longitude_bit = not is_longitude_bit
+        bit += 1
+        if bit == 5:
+            geohash.append(GEOHASH_BASE32[char])
+            char = 0
+            bit = 0
+    return ''.join(geohash)
+
+
+def get_geohash_cell_size(precision):
+    """Height and width in degrees of a geohash cell of the given precision."""
+    bits = 5 * precision
+    return 180 / 2 ** (bits // 2), 360 / 2 ** ((bits + 1) // 2)
+
+
+def _get_longitude_spans(west, east):
+    # A box whose west edge is east of its east edge crosses the antimeridian
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+def get_geohashes_for_bbox(south, west, north, east, max_cells=64):
+    """
+    The geohash cells covering a bounding box, at the finest precision that
+    needs no more than max_cells of them.
+    """
+    spans = _get_longitude_spans(west, east)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = get_geohash_cell_size(precision)
+        rows = math.floor((north + 90) / height) - math.floor((south + 90) / height) + 1
+        columns = sum(
+            math.floor((span_east + 180) / width) - math.floor((span_west + 180) / width) + 1
+            for span_west, span_east in spans)
+        if rows * columns <= max_cells or precision == 1:
+            break
+
+    cells = set()
+    latitude = math.floor((south + 90) / height) * height - 90
+    while latitude <= north and latitude < 90:
+        for span_west, span_east in spans:
+            longitude = math.floor((span_west + 180) / width) * width - 180
+            while longitude <= span_east and longitude < 180:
+                cells.add(encode_geohash(
+                    latitude + height / 2, longitude + width / 2, precision))
+                longitude += width
+        latitude += height
+    return sorted(cells)
+
+
+def is_in_bbox(latitude, longitude, south, west, north, east):
+    if not south <= latitude <= north:
+        return False
+    return any(span_west <= longitude <= span_east
+               for span_west, span_east in _get_longitude_spans(west, east))
+
+
+def get_bbox_center(south, west, north, east):
+    longitude = west + ((east - west) % 360) / 2
+    if longitude > 180:
+        longitude -= 360
+    return (south + north) / 2, longitude
+
+
+def haversine_km(latitude_1, longitude_1, latitude_2, longitude_2):
+    phi_1 = math.radians(latitude_1)
+    phi_2 = math.radians(latitude_2)
+    d_phi = phi_2 - phi_1
+    d_lambda = math.radians(longitude_2 - longitude_1)
+    a = (math.sin(d_phi / 2) ** 2 +
+         math.cos(phi_1) * math.cos(phi_2) * math.sin(d_lambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _to_unit_vector(latitude, longitude):
+    phi = math.radians(latitude)
+    lam = math.radians(longitude)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+class KDTree:
+    """Static KD-tree over (latitude, longitude, value) points."""
+
+    def __init__(self, points):
+        self.size = len(points)
+        self.root = self._build(
+            [(_to_unit_vector(latitude, longitude), value)
+             for latitude, longitude, value in points], 0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+        vector, value = points[middle]
+        return (vector, value, axis,
+                self._build(points[:middle], depth + 1),
+                self._build(points[middle + 1:], depth + 1))
+
+    def nearest(self, latitude, longitude, count, predicate=None):
+        """
+        Values of the count points closest to (latitude, longitude), nearest
+        first. Points whose value fails predicate are skipped.
+        """
+        target = _to_unit_vector(latitude, longitude)
+        # Max-heap of the best matches so far, as (-distance, tiebreak, value)
+        best = []
+        tiebreak = itertools.count()
+
+        def visit(node):
+            if node is None:
+                return
+            vector, value, axis, left, right = node
+            if predicate is None or predicate(value):
+                distance = sum((a - b) ** 2 for a, b in zip(vector, target))
+                if len(best) < count:
+                    heapq.heappush(best, (-distance, next(tiebreak), value))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, next(tiebreak), value))
+            offset = target[axis] - vector[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if len(best) < count or offset ** 2 < -best[0][0]:
+                visit(far)
+
+        if count > 0:
+            visit(self.root)
+        return [value for _, _, value in sorted(best, key=lambda item: (-item[0], item[1]))]
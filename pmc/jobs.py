@@ -0,0 +1,349 @@
+"""
+Database-backed background jobs.
+
+Handlers are registered with @job and enqueued by name; the run_jobs
+management command claims and runs them. Everything lives in the
+BackgroundJob table, so no broker is needed and the queue works on SQLite.
+
+A claim locks every active job of the same name before counting the
+running ones, so several workers can poll the same table without running a
+job twice or exceeding a name's concurrency. Failed jobs are retried with
+exponential backoff until max_attempts is reached. While a job runs, a side
+thread refreshes its heartbeat; jobs whose heartbeat stops because their
+worker disappeared are requeued once it goes stale.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (
+    Achievement, AwardAssignmentService, AwardBase, BackgroundJob, EventResult,
+    Leaderboard, RankingPointsService, Trophy
+)
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF = timedelta(seconds=30)
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+# A running job whose heartbeat is older than this has lost its worker
+LOCK_TIMEOUT = timedelta(minutes=5)
+
+JOB_HANDLERS = {}
+
+
+def job(name, concurrency=1, max_attempts=3):
+    """
+    Register a job handler. The handler is called with the BackgroundJob
+    followed by the job's params as keyword arguments.
+
+    Args:
+        name: Name the job is enqueued under
+        concurrency: Maximum number of jobs of this name running at once
+        max_attempts: Attempts before the job is marked failed
+    """
+    def decorator(handler):
+        JOB_HANDLERS[name] = {
+            'handler': handler,
+            'concurrency': concurrency,
+            'max_attempts': max_attempts,
+        }
+        return handler
+    return decorator
+
+
+def get_job_key(name, params=None):
+    return f'{name}:{json.dumps(params or {}, sort_keys=True)}'
+
+
+def enqueue_job(name, params=None, key=None):
+    """
+    Queue a job unless one with the same key is already queued.
+
+    The key defaults to the job name and params, so repeated calls for the
+    same work share a single job. A job that is already running has read its
+    inputs, so a new request queues one follow-up run behind it.
+
+    Returns:
+        Tuple of (BackgroundJob, created)
+    """
+    if name not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job: {name}')
+    params = params or {}
+    key = key or get_job_key(name, params)
+
+    queued = BackgroundJob.objects.filter(
+        key=key, status=BackgroundJob.StatusOptions.QUEUED)
+    existing = queued.first()
+    if existing:
+        return existing, False
+    try:
+        with transaction.atomic():
+            return BackgroundJob.objects.create(
+                name=name,
+                key=key,
+                params=params,
+                max_attempts=JOB_HANDLERS[name]['max_attempts'],
+            ), True
+    except IntegrityError:
+        # Another request queued the same key in the meantime
+        return queued.get(), False
+
+
+def get_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def requeue_stale_jobs():
+    """Release running jobs whose worker has stopped sending heartbeats."""
+    cutoff = timezone.now() - LOCK_TIMEOUT
+    stale = BackgroundJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) |
+        Q(heartbeat_at__isnull=True, locked_at__lt=cutoff),
+        status=BackgroundJob.StatusOptions.RUNNING,
+    )
+    count = 0
+    for stale_job in stale:
+        _record_failure(stale_job, 'Worker heartbeat expired')
+        count += 1
+    return count
+
+
+def claim_next_job(worker_id=None):
+    """
+    Claim the next runnable job, respecting per-name concurrency limits.
+
+    Returns:
+        The claimed BackgroundJob, or None if nothing can run now
+    """
+    worker_id = worker_id or get_worker_id()
+    candidates = BackgroundJob.objects.filter(
+        status=BackgroundJob.StatusOptions.QUEUED,
+        run_after__lte=timezone.now()
+    ).exclude(
+        # A follow-up run waits for the running job of the same key
+        key__in=_running_keys()
+    ).order_by('run_after', 'id').values_list('pk', 'name')
+
+    full_names = set()
+    for candidate_id, name in candidates:
+        registration = JOB_HANDLERS.get(name)
+        if registration is None or name in full_names:
+            continue
+        claimed = _claim_job(candidate_id, name, registration['concurrency'], worker_id)
+        if claimed is not None:
+            return claimed
+        full_names.add(name)
+    return None
+
+
+def _running_keys():
+    return BackgroundJob.objects.filter(
+        status=BackgroundJob.StatusOptions.RUNNING).values('key')
+
+
+def _claim_job(job_id, name, concurrency, worker_id):
+    with transaction.atomic():
+        # Workers claiming a job of the same name queue up on these locks,
+        # so each one counts the running jobs after the previous claim
+        # committed. Locking in id order keeps them from deadlocking.
+        list(BackgroundJob.objects.select_for_update().filter(
+            name=name,
+            status__in=[BackgroundJob.StatusOptions.QUEUED,
+                        BackgroundJob.StatusOptions.RUNNING]
+        ).order_by('pk').values_list('pk', flat=True))
+        running = BackgroundJob.objects.filter(
+            name=name, status=BackgroundJob.StatusOptions.RUNNING).count()
+        if running >= concurrency:
+            return None
+
+        now = timezone.now()
+        claimed = BackgroundJob.objects.filter(
+            pk=job_id,
+            status=BackgroundJob.StatusOptions.QUEUED
+        ).exclude(
+            key__in=_running_keys()
+        ).update(
+            status=BackgroundJob.StatusOptions.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1
+        )
+        if not claimed:
+            return None
+    return BackgroundJob.objects.get(pk=job_id)
+
+
+class _Heartbeat:
+    """Refresh a running job's heartbeat from a side thread until stopped."""
+
+    def __init__(self, background_job):
+        self.background_job = background_job
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(HEARTBEAT_INTERVAL.total_seconds()):
+                self.background_job.heartbeat()
+        except Exception:
+            logger.exception('Heartbeat for background job %s failed',
+                             self.background_job.pk)
+        finally:
+            # The thread opened its own connection
+            connection.close()
+
+
+def run_job(claimed_job):
+    """Run a claimed job and record its outcome."""
+    handler = JOB_HANDLERS[claimed_job.name]['handler']
+    try:
+        with _Heartbeat(claimed_job):
+            handler(claimed_job, **claimed_job.params)
+    except Exception:
+        logger.exception('Background job %s failed', claimed_job.pk)
+        _record_failure(claimed_job, traceback.format_exc())
+        return False
+
+    claimed_job.status = BackgroundJob.StatusOptions.SUCCEEDED
+    claimed_job.finished_on = timezone.now()
+    claimed_job.locked_by = None
+    claimed_job.locked_at = None
+    claimed_job.heartbeat_at = None
+    claimed_job.last_error = None
+    claimed_job.save(update_fields=[
+        'status', 'finished_on', 'locked_by', 'locked_at', 'heartbeat_at', 'last_error'])
+    return True
+
+
+def run_next_job(worker_id=None):
+    """
+    Claim and run one job.
+
+    Returns:
+        The job that ran, or None if the queue had nothing runnable
+    """
+    claimed_job = claim_next_job(worker_id)
+    if claimed_job:
+        run_job(claimed_job)
+    return claimed_job
+
+
+def _record_failure(failed_job, error):
+    failed_job.last_error = error
+    failed_job.locked_by = None
+    failed_job.locked_at = None
+    failed_job.heartbeat_at = None
+    if failed_job.attempts >= failed_job.max_attempts:
+        failed_job.status = BackgroundJob.StatusOptions.FAILED
+        failed_job.finished_on = timezone.now()
+    else:
+        failed_job.status = BackgroundJob.StatusOptions.QUEUED
+        failed_job.run_after = timezone.now() + \
+            RETRY_BACKOFF * 2 ** (failed_job.attempts - 1)
+    update_fields = [
+        'last_error', 'locked_by', 'locked_at', 'heartbeat_at', 'status', 'finished_on',
+        'run_after']
+    try:
+        with transaction.atomic():
+            failed_job.save(update_fields=update_fields)
+    except IntegrityError:
+        # A follow-up run of the same key was queued while this one ran and
+        # will redo the work, so give up on this one instead of retrying
+        failed_job.status = BackgroundJob.StatusOptions.FAILED
+        failed_job.finished_on = timezone.now()
+        failed_job.save(update_fields=update_fields)
+
+
+@job('refresh_leaderboard')
+def refresh_leaderboard(background_job, leaderboard_id):
+    leaderboard = Leaderboard.objects.get(pk=leaderboard_id)
+    with transaction.atomic():
+        changes = RankingPointsService.refresh_leaderboard(
+            leaderboard, progress=background_job.set_progress)
+    logger.info(
+        'Refreshed leaderboard %s: %s', leaderboard_id,
+        ', '.join(f'{count} {name}' for name, count in changes.items()))
+
+
+@job('refresh_all_leaderboards')
+def refresh_all_leaderboards(background_job):
+    changes = RankingPointsService.refresh_all_leaderboards(
+        progress=background_job.set_progress)
+    logger.info(
+        'Refreshed all leaderboards: %s',
+        ', '.join(f'{count} {name}' for name, count in changes.items()))
+
+
+@job('refresh_trophies')
+def refresh_trophies(background_job, pmc_id=None):
+    trophies = Trophy.objects.exclude(
+        criteria=AwardBase.CriteriaTypeOptions.manually_awarded)
+    if pmc_id is not None:
+        trophies = trophies.filter(pmc_id=pmc_id)
+    _refresh_awards(
+        background_job, list(trophies), AwardAssignmentService.get_user_trophy_changes)
+
+
+@job('refresh_achievements')
+def refresh_achievements(background_job, pmc_id=None, pmc_id_min=None, pmc_id_max=None):
+    achievements = Achievement.objects.all()
+    if pmc_id is not None:
+        achievements = achievements.filter(pmc_id=pmc_id)
+    if pmc_id_min is not None:
+        achievements = achievements.filter(pmc_id__gte=pmc_id_min)
+    if pmc_id_max is not None:
+        achievements = achievements.filter(pmc_id__lte=pmc_id_max)
+    _refresh_awards(
+        background_job, list(achievements),
+        AwardAssignmentService.get_user_achievement_tier_changes)
+
+
+@job('refresh_badges')
+def refresh_badges(background_job):
+    with transaction.atomic():
+        AwardAssignmentService.refresh_user_badges()
+    background_job.set_progress(1, 1)
+
+
+@job('hydrate_result_decks')
+def hydrate_result_decks(background_job, limit=20):
+    results = list(EventResult.objects.filter(
+        uploaded_deck_link__isnull=False,
+        uploaded_deck_lookup_attempts__lt=EventResult.max_deck_lookup_attempts
+    )[:limit])
+    background_job.set_progress(0, len(results))
+    for done, result in enumerate(results, start=1):
+        try:
+            result.add_deck_by_uploaded_link()
+        except Exception:
+            # Lookup attempts are tracked on the result itself
+            pass
+        background_job.set_progress(done)
+
+
+def _refresh_awards(background_job, awards, get_changes):
+    """Refresh awards one at a time so progress is visible while running."""
+    background_job.set_progress(0, len(awards))
+    for done, award in enumerate(awards, start=1):
+        with transaction.atomic():
+            AwardAssignmentService.apply_award_changes(get_changes([award]))
+        background_job.set_progress(done)
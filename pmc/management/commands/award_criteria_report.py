@@ -0,0 +1,137 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from pmc.models import Achievement, AwardAssignmentService, AwardBase, Trophy
+
+
+REPORT_FIELDS = [
+    'criteria', 'label', 'awards', 'wall_time_ms', 'queries',
+    'created', 'updated', 'deleted', 'mismatched_users',
+]
+
+
+class Command(BaseCommand):
+    help = ('Evaluate every trophy and achievement without saving, and report the '
+            'changes a refresh would make plus wall time and queries per criteria type')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--engine', choices=['set', 'per-user'], default='set',
+            help='Evaluate criteria with grouped queries (set) or get_user_criteria_value for each user (per-user)')
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Also evaluate with the other engine and count users whose values differ')
+        parser.add_argument(
+            '--format', choices=['text', 'json'], default='text',
+            help='Output format')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION READ ONLY')
+            try:
+                rows = self._build_report(options['engine'], options['compare'])
+            finally:
+                transaction.set_rollback(True)
+
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps(rows, indent=2))
+        else:
+            self._write_table(rows, options['compare'])
+
+    def _build_report(self, engine, compare):
+        users = list(User.objects.all())
+
+        def per_user_values(award, user_ids=None):
+            values = {}
+            for user in users:
+                value = AwardAssignmentService.get_user_criteria_value(user, award)
+                if value:
+                    values[user.id] = value
+            return values
+
+        engines = {
+            'set': AwardAssignmentService.get_criteria_values,
+            'per-user': per_user_values,
+        }
+        get_values = engines[engine]
+        get_other_values = engines['per-user' if engine == 'set' else 'set']
+
+        rows = {}
+
+        def measured_values(award, user_ids=None):
+            row = rows.setdefault(award.criteria, self._empty_row(award.criteria))
+            # The query log is bounded, so clear it before each capture
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                values = get_values(award, user_ids)
+                elapsed = time.perf_counter() - start
+            row['awards'] += 1
+            row['wall_time_ms'] += elapsed * 1000
+            row['queries'] += len(queries)
+
+            if compare:
+                other_values = get_other_values(award, user_ids)
+                row['mismatched_users'] += sum(
+                    1 for user_id in set(values) | set(other_values)
+                    if values.get(user_id, 0) != other_values.get(user_id, 0)
+                )
+            return values
+
+        awards = [
+            (trophy, AwardAssignmentService.get_user_trophy_changes)
+            for trophy in Trophy.objects.exclude(
+                criteria=AwardBase.CriteriaTypeOptions.manually_awarded)
+        ] + [
+            (achievement, AwardAssignmentService.get_user_achievement_tier_changes)
+            for achievement in Achievement.objects.all()
+        ]
+        for award, get_changes in awards:
+            changes = get_changes([award], get_values=measured_values)
+            row = rows.setdefault(award.criteria, self._empty_row(award.criteria))
+            row['created'] += len(changes['create'])
+            row['updated'] += len(changes['update'])
+            row['deleted'] += len(changes['delete'])
+
+        for row in rows.values():
+            row['wall_time_ms'] = round(row['wall_time_ms'], 3)
+            if not compare:
+                row['mismatched_users'] = None
+        return sorted(rows.values(), key=lambda row: -row['wall_time_ms'])
+
+    def _empty_row(self, criteria):
+        row = dict.fromkeys(REPORT_FIELDS, 0)
+        row['criteria'] = criteria
+        row['label'] = str(dict(AwardBase.CriteriaTypeOptions.choices).get(
+            criteria, f'Unknown ({criteria})'))
+        return row
+
+    def _write_table(self, rows, compare):
+        header = f'{"Criteria":<50} {"Awards":>6} {"Time (ms)":>11} {"Queries":>8} {"Create":>7} {"Update":>7} {"Delete":>7}'
+        if compare:
+            header += f' {"Mismatch":>9}'
+        self.stdout.write(header)
+        for row in rows:
+            line = (f'{row["criteria"]:>3} {row["label"][:46]:<46} {row["awards"]:>6} '
+                    f'{row["wall_time_ms"]:>11.1f} {row["queries"]:>8} {row["created"]:>7} '
+                    f'{row["updated"]:>7} {row["deleted"]:>7}')
+            if compare:
+                line += f' {row["mismatched_users"]:>9}'
+            self.stdout.write(line)
+
+        total_time = sum(row['wall_time_ms'] for row in rows)
+        total_queries = sum(row['queries'] for row in rows)
+        total_changes = sum(row['created'] + row['updated'] + row['deleted'] for row in rows)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(rows)} criteria types, {total_time:.1f} ms, {total_queries} queries, '
+            f'{total_changes} pending changes (nothing was saved)'))
+        if compare:
+            mismatched = sum(row['mismatched_users'] for row in rows)
+            style = self.style.SUCCESS if not mismatched else self.style.ERROR
+            self.stdout.write(style(f'{mismatched} mismatched user values between engines'))
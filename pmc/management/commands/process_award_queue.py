@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from pmc.models import AwardAssignmentService
+
+
+class Command(BaseCommand):
+    help = 'Re-evaluate the awards of users queued by changes to their results, ranks and credits'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Queue entries to process per transaction')
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Keep running and poll the queue once it is empty')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds between polls in --watch mode')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = AwardAssignmentService.process_dirty_users(
+                batch_size=options['batch_size'])
+            if stats['entries']:
+                self.stdout.write(
+                    f'Processed {stats["entries"]} queue entries: '
+                    f'{stats["created"]} created, {stats["updated"]} updated, '
+                    f'{stats["deleted"]} deleted')
+                continue
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Award queue is empty'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from pmc.models import UserStatsRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user stats rollup from event results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only rebuild this user id (may be repeated)')
+
+    def handle(self, *args, **options):
+        count = UserStatsRollup.rebuild(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} stats rollup rows'))
@@ -0,0 +1,57 @@
+import time
+
+from common.reference_data import reference_data
+from django.core.management.base import BaseCommand
+from pmc.jobs import get_worker_id, requeue_stale_jobs, run_next_job
+from pmc.models import AwardAssignmentService
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs and re-evaluate the awards of queued users'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Keep running and poll for new jobs once the queue is empty')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds between polls in --watch mode')
+        parser.add_argument(
+            '--max-jobs', type=int, default=None,
+            help='Stop after running this many jobs')
+        parser.add_argument(
+            '--award-batch-size', type=int, default=1000,
+            help='Award queue entries to process per transaction')
+
+    def handle(self, *args, **options):
+        worker_id = get_worker_id()
+        reference_data.warm_up()
+        jobs_run = 0
+        while options['max_jobs'] is None or jobs_run < options['max_jobs']:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(f'Requeued {requeued} stale jobs')
+
+            background_job = run_next_job(worker_id)
+            if background_job:
+                jobs_run += 1
+                background_job.refresh_from_db()
+                self.stdout.write(
+                    f'Job {background_job.pk} ({background_job.name}): '
+                    f'{background_job.get_status_display()}')
+                continue
+
+            # Jobs go first; the award queue is drained whenever none is runnable
+            stats = AwardAssignmentService.process_dirty_users(
+                batch_size=options['award_batch_size'])
+            if stats['entries']:
+                self.stdout.write(
+                    f'Processed {stats["entries"]} award queue entries: '
+                    f'{stats["created"]} created, {stats["updated"]} updated, '
+                    f'{stats["deleted"]} deleted')
+                continue
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {jobs_run} jobs'))
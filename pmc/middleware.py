@@ -0,0 +1,93 @@
+"""
+Request-scoped playgroup resolution.
+
+Pages under pg/<slug>/ need the playgroup and the current user's membership
+in the context processors, the permission decorators and the view itself.
+PlaygroupMiddleware attaches a lazy resolver to the request so they all
+share one joined query, made the first time any of them asks.
+"""
+
+from functools import partial
+
+from django.db.models import FilteredRelation, Q
+from django.utils.functional import SimpleLazyObject
+
+from .models import Playgroup
+
+
+def get_playgroup_slug(request):
+    chunks = request.path.split('/')
+    playgroup_slug = None
+    while len(chunks):
+        chunk = chunks.pop(0)
+        if chunk == 'pg' and len(chunks):
+            playgroup_slug = chunks.pop(0)
+    return playgroup_slug
+
+
+class RequestPlaygroup:
+    """The playgroup in the request path and the current user's membership."""
+
+    def __init__(self, slug, playgroup=None, member=None):
+        self.slug = slug
+        self.playgroup = playgroup
+        self.member = member
+
+    @property
+    def is_member(self):
+        return self.member is not None
+
+    @property
+    def is_staff(self):
+        return self.member is not None and self.member.is_staff
+
+    @classmethod
+    def load(cls, request, slug=None):
+        """Load the playgroup and membership with a single query."""
+        slug = slug or get_playgroup_slug(request)
+        if not slug:
+            return cls(slug)
+
+        user = getattr(request, 'user', None)
+        is_authenticated = user is not None and user.is_authenticated
+        playgroups = Playgroup.objects.filter(slug=slug)
+        if is_authenticated:
+            playgroups = playgroups.annotate(
+                current_member=FilteredRelation(
+                    'members', condition=Q(members__user=user))
+            ).select_related('current_member')
+        playgroup = playgroups.first()
+        if playgroup is None:
+            return cls(slug)
+
+        # Without a matching row the joined member is never set
+        member = getattr(playgroup, 'current_member', None)
+        if member is not None:
+            member.playgroup = playgroup
+            member.user = user
+        return cls(slug, playgroup, member)
+
+
+def get_request_playgroup(request, slug=None):
+    """
+    The RequestPlaygroup for this request, loaded once and kept on the
+    request. Passing a slug other than the one in the path loads that
+    playgroup without replacing the memoized one.
+    """
+    if not hasattr(request, 'pmc_playgroup'):
+        request.pmc_playgroup = RequestPlaygroup.load(request)
+    if slug and slug != request.pmc_playgroup.slug:
+        return RequestPlaygroup.load(request, slug)
+    return request.pmc_playgroup
+
+
+class PlaygroupMiddleware:
+    """Attach a lazily loaded RequestPlaygroup to every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.pmc_playgroup = SimpleLazyObject(
+            partial(RequestPlaygroup.load, request))
+        return self.get_response(request)
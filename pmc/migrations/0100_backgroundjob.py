@@ -0,0 +1,38 @@
+# Generated by Django 5.2.13 on 2026-10-17 13:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pmc', '0099_dirtyawarduser'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=200)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.IntegerField(choices=[(0, 'Queued'), (1, 'Running'), (2, 'Succeeded'), (3, 'Failed')], default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, default=None, max_length=100, null=True)),
+                ('locked_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('progress_current', models.PositiveIntegerField(default=0)),
+                ('progress_total', models.PositiveIntegerField(blank=True, default=None, null=True)),
+                ('last_error', models.TextField(blank=True, default=None, null=True)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('finished_on', models.DateTimeField(blank=True, default=None, null=True)),
+            ],
+            options={
+                'ordering': ('run_after', 'id'),
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', [0, 1])), fields=('key',), name='unique_active_background_job_key')],
+            },
+        ),
+    ]
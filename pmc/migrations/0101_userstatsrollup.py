@@ -0,0 +1,104 @@
+# Generated by Django 5.2.13 on 2026-10-17 13:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def fill_stats_rollup(apps, schema_editor):
+    # Mirrors UserStatsRollup.rebuild, a batch of users at a time, so the
+    # rollup is populated by migrate instead of a manual rebuild_stats_rollup.
+    from pmc.models import EventResult as CurrentEventResult
+
+    EventResult = apps.get_model('pmc', 'EventResult')
+    UserStatsRollup = apps.get_model('pmc', 'UserStatsRollup')
+
+    total_fields = [
+        'events', 'match_wins', 'match_losses', 'match_ties', 'events_won',
+        'wins_3_to_5', 'wins_6_plus', 'seconds_6_plus', 'thirds_6_to_10',
+        'top_four_11_plus', 'top_eight_11_plus', 'xp',
+    ]
+    tournament_win = Q(finishing_position=1,
+                       event__is_excluded_from_global_rankings=False)
+    user_ids = list(
+        EventResult.objects.order_by('user_id')
+        .values_list('user_id', flat=True).distinct())
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        totals = (
+            EventResult.objects
+            .filter(user_id__in=user_ids[start:start + BATCH_SIZE])
+            .order_by()
+            .values('user', 'event__is_digital', 'event__is_casual', 'event__format')
+            .annotate(
+                total_events=Count('id'),
+                total_match_wins=Coalesce(Sum('num_wins'), 0),
+                total_match_losses=Coalesce(Sum('num_losses'), 0),
+                total_match_ties=Coalesce(Sum('num_ties'), 0),
+                total_events_won=Count('id', filter=Q(finishing_position=1)),
+                total_wins_3_to_5=Count('id', filter=tournament_win & Q(
+                    event__player_count__range=(3, 5))),
+                total_wins_6_plus=Count('id', filter=tournament_win & Q(
+                    event__player_count__gte=6)),
+                total_seconds_6_plus=Count('id', filter=Q(
+                    finishing_position=2, event__player_count__gte=6)),
+                total_thirds_6_to_10=Count('id', filter=Q(
+                    finishing_position=3, event__player_count__range=(6, 10))),
+                total_top_four_11_plus=Count('id', filter=Q(
+                    finishing_position__range=(3, 4), event__player_count__gte=11)),
+                total_top_eight_11_plus=Count('id', filter=Q(
+                    finishing_position__range=(5, 8), event__player_count__gte=11)),
+                total_xp=Coalesce(
+                    Sum(CurrentEventResult.get_xp_expression()), 0),
+            )
+        )
+        UserStatsRollup.objects.bulk_create([
+            UserStatsRollup(
+                user_id=row['user'],
+                is_digital=row['event__is_digital'],
+                is_casual=row['event__is_casual'],
+                format_id=row['event__format'],
+                **{field: row[f'total_{field}'] for field in total_fields}
+            )
+            for row in totals
+        ], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pmc', '0100_backgroundjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_digital', models.BooleanField(default=False)),
+                ('is_casual', models.BooleanField(default=False)),
+                ('events', models.PositiveIntegerField(default=0)),
+                ('match_wins', models.PositiveIntegerField(default=0)),
+                ('match_losses', models.PositiveIntegerField(default=0)),
+                ('match_ties', models.PositiveIntegerField(default=0)),
+                ('events_won', models.PositiveIntegerField(default=0)),
+                ('wins_3_to_5', models.PositiveIntegerField(default=0, help_text='Wins at 3 to 5 player events counted in global rankings')),
+                ('wins_6_plus', models.PositiveIntegerField(default=0, help_text='Wins at 6+ player events counted in global rankings')),
+                ('seconds_6_plus', models.PositiveIntegerField(default=0)),
+                ('thirds_6_to_10', models.PositiveIntegerField(default=0)),
+                ('top_four_11_plus', models.PositiveIntegerField(default=0, help_text='3rd or 4th place at 11+ player events')),
+                ('top_eight_11_plus', models.PositiveIntegerField(default=0, help_text='5th to 8th place at 11+ player events')),
+                ('xp', models.PositiveIntegerField(default=0)),
+                ('format', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pmc.eventformat')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'is_digital', 'is_casual', 'format'), name='unique_user_stats_rollup')],
+            },
+        ),
+        migrations.RunPython(fill_stats_rollup, migrations.RunPython.noop),
+    ]
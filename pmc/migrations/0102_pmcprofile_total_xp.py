@@ -0,0 +1,32 @@
+# Generated by Django 5.2.13 on 2026-10-17 13:24
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def copy_rollup_xp(apps, schema_editor):
+    # The rollup is filled from event results by 0101, which this depends on.
+    PmcProfile = apps.get_model('pmc', 'PmcProfile')
+    UserStatsRollup = apps.get_model('pmc', 'UserStatsRollup')
+
+    user_xp = UserStatsRollup.objects.filter(
+        user=OuterRef('user')
+    ).order_by().values('user').annotate(total=Sum('xp')).values('total')
+    PmcProfile.objects.update(total_xp=Coalesce(Subquery(user_xp), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pmc', '0101_userstatsrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pmcprofile',
+            name='total_xp',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Kept in step with the stats rollup, for XP leaderboards'),
+        ),
+        migrations.RunPython(copy_rollup_xp, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.13 on 2026-10-17 13:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pmc', '0102_pmcprofile_total_xp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playerrank',
+            index=models.Index(fields=['leaderboard', 'period', 'playgroup', 'rank'], name='playerrank_board_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.13 on 2026-10-17 13:47
+
+from django.db import migrations, models
+
+from pmc.geo import encode_geohash
+
+
+def fill_venue_geohashes(apps, schema_editor):
+    Venue = apps.get_model('pmc', 'Venue')
+
+    venues = list(Venue.objects.filter(
+        latitude__isnull=False, longitude__isnull=False))
+    for venue in venues:
+        venue.geohash = encode_geohash(float(venue.latitude), float(venue.longitude))
+    Venue.objects.bulk_update(venues, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pmc', '0103_playerrank_board_rank_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default=None, editable=False, help_text='Kept in step with the coordinates, for the playgroup finder', max_length=12, null=True),
+        ),
+        migrations.RunPython(fill_venue_geohashes, migrations.RunPython.noop),
+    ]
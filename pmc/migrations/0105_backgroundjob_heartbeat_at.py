@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-17 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pmc', '0104_venue_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, default=None, help_text='Refreshed by the worker while the job runs', null=True),
+        ),
+    ]
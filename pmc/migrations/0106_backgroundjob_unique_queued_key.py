@@ -0,0 +1,21 @@
+# Generated by Django 5.2.13 on 2026-10-17 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pmc', '0105_backgroundjob_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='backgroundjob',
+            name='unique_active_background_job_key',
+        ),
+        migrations.AddConstraint(
+            model_name='backgroundjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 0)), fields=('key',), name='unique_queued_background_job_key'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from sre_constants import ANY
+from bisect import bisect_left, bisect_right
 from django.contrib.auth.models import User
 from django.db import models, transaction
 from django.db.models import Q, UniqueConstraint, OuterRef, Subquery, Exists
@@ -8,15 +9,20 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.dispatch import receiver
-from django.db.models.signals import post_save
-from django.db.models import Sum, F, Count, Window
-from django.db.models.functions import Coalesce, Rank
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.db.models import Avg, Sum, F, Count, Window, Case, When, Value, IntegerField
+from django.db.models.functions import Coalesce, Least, Rank
 from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils import timezone
+from django.utils.functional import cached_property
 from io import BytesIO
 import qrcode
 import boto3
 import hashlib
+from common.reference_data import SHARED_CACHE_ALIAS, ModelReferenceTable, ReferenceTable, reference_data
 from decks.models import Deck
+from .geo import KDTree, encode_geohash, get_bbox_center, get_geohashes_for_bbox, haversine_km, is_in_bbox
 
 
 def exclude_upcoming_event_results(qs):
@@ -185,6 +191,9 @@ class Venue(models.Model):
     postal_code = models.CharField(
         max_length=20, default=None, null=True, blank=True
     )
+    geohash = models.CharField(
+        max_length=12, default=None, null=True, blank=True, db_index=True, editable=False,
+        help_text=_('Kept in step with the coordinates, for the playgroup finder'))
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
@@ -198,6 +207,14 @@ class Venue(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.geohash = encode_geohash(
+            float(self.latitude), float(self.longitude)) if self.has_coordinates() else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
     def has_coordinates(self):
         return self.latitude is not None and self.longitude is not None
 
@@ -261,6 +278,186 @@ class PlaygroupVenue(models.Model):
         return f'{self.playgroup.name} - {self.venue.name}'
 
 
+class PlaygroupFinderService():
+    TILE_CACHE_TIMEOUT = 60 * 60
+    MAX_TILES = 64
+
+    @staticmethod
+    def build_index():
+        """
+        Everything the finder serves, built from the geocoded venues.
+
+        Returns:
+            Dict with 'playgroups', the finder payload of each playgroup by
+            id; 'geohashes' and 'links', the sorted venue geohashes and the
+            (playgroup id, venue id, latitude, longitude) at each of them;
+            and 'tree', a KDTree over the same links
+        """
+        from django.urls import reverse
+
+        playgroups = Playgroup.objects.filter(
+            venues__geohash__isnull=False
+        ).distinct().select_related('type')
+        links = list(PlaygroupVenue.objects.filter(
+            venue__geohash__isnull=False
+        ).select_related('venue').order_by('venue__geohash', 'pk'))
+
+        venues_by_playgroup = {}
+        for link in links:
+            venues_by_playgroup.setdefault(link.playgroup_id, []).append(link.venue)
+
+        payloads = {}
+        for pg in playgroups:
+            venues_data = [
+                {
+                    'id': venue.id,
+                    'name': venue.name,
+                    'latitude': float(venue.latitude),
+                    'longitude': float(venue.longitude),
+                    'city': venue.city or '',
+                    'state_province': venue.state_province or '',
+                    'is_primary': pg.primary_venue_id == venue.id,
+                }
+                for venue in sorted(venues_by_playgroup.get(pg.id, []), key=lambda v: v.name)
+            ]
+            primary = next(
+                (v for v in venues_data if v['is_primary']), venues_data[0])
+            payloads[pg.id] = {
+                'id': pg.id,
+                'name': pg.name,
+                'slug': pg.slug,
+                'type': pg.type.name if pg.type else None,
+                'logo_src': pg.get_logo_src(),
+                'url': reverse('pmc-pg-detail', args=[pg.slug]),
+                'primary_latitude': primary['latitude'],
+                'primary_longitude': primary['longitude'],
+                'venues': venues_data,
+            }
+
+        points = [
+            (float(link.venue.latitude), float(link.venue.longitude), link.playgroup_id, link.venue_id)
+            for link in links
+        ]
+        return {
+            'playgroups': payloads,
+            'geohashes': [link.venue.geohash for link in links],
+            'links': [(playgroup_id, venue_id, latitude, longitude)
+                      for latitude, longitude, playgroup_id, venue_id in points],
+            'tree': KDTree([(latitude, longitude, (playgroup_id, venue_id))
+                            for latitude, longitude, playgroup_id, venue_id in points]),
+        }
+
+    @staticmethod
+    def get_payloads(playgroup_ids):
+        """Finder payloads of the given playgroups, in order, skipping ones without venues."""
+        payloads = VENUE_INDEX.get()['playgroups']
+        return [payloads[pk] for pk in playgroup_ids if pk in payloads]
+
+    @staticmethod
+    def add_member_counts(results):
+        """
+        Copies of finder results with each playgroup's 'member_count', read
+        with one query. Members come and go too often to keep in the index.
+        """
+        counts = dict(
+            PlaygroupMember.objects.filter(
+                playgroup_id__in=[result['id'] for result in results]
+            ).order_by().values_list('playgroup_id').annotate(Count('id')))
+        return [
+            {**result, 'member_count': counts.get(result['id'], 0)}
+            for result in results
+        ]
+
+    @staticmethod
+    def get_count(playgroup_ids=None):
+        """Number of playgroups in the index, optionally only among playgroup_ids."""
+        payloads = VENUE_INDEX.get()['playgroups']
+        if playgroup_ids is None:
+            return len(payloads)
+        return len(payloads.keys() & playgroup_ids)
+
+    @staticmethod
+    def get_tile(geohash):
+        """
+        Finder payloads of the playgroups with a venue in a geohash cell,
+        cached until a venue or playgroup changes.
+        """
+        def build_tile():
+            index = VENUE_INDEX.get()
+            start = bisect_left(index['geohashes'], geohash)
+            # '~' sorts after every geohash character
+            end = bisect_left(index['geohashes'], geohash + '~', start)
+            playgroup_ids = sorted({index['links'][i][0] for i in range(start, end)})
+            return PlaygroupFinderService.get_payloads(playgroup_ids)
+
+        return cache.get_or_set(
+            f'pmc:finder-tile:{VENUE_INDEX.get_version()}:{geohash}',
+            build_tile,
+            PlaygroupFinderService.TILE_CACHE_TIMEOUT)
+
+    @staticmethod
+    def get_nearest(latitude, longitude, limit, playgroup_ids=None):
+        """
+        The limit playgroups with a venue closest to (latitude, longitude),
+        nearest first, each with its 'distance_km'.
+
+        Args:
+            playgroup_ids: If given, only these playgroups are considered
+        """
+        index = VENUE_INDEX.get()
+        predicate = None
+        if playgroup_ids is not None:
+            def predicate(value):
+                return value[0] in playgroup_ids
+
+        # A playgroup may own several of the nearest venues, so widen the
+        # search until enough distinct playgroups are found
+        count = limit
+        while True:
+            matches = index['tree'].nearest(latitude, longitude, count, predicate)
+            ordered_ids = list(dict.fromkeys(playgroup_id for playgroup_id, _ in matches))
+            if len(ordered_ids) >= limit or len(matches) < count:
+                break
+            count *= 2
+        return [
+            PlaygroupFinderService._with_distance(payload, latitude, longitude)
+            for payload in PlaygroupFinderService.get_payloads(ordered_ids[:limit])
+        ]
+
+    @staticmethod
+    def get_in_bbox(south, west, north, east, near=None, playgroup_ids=None):
+        """
+        Playgroups with a venue inside a bounding box, ranked by distance
+        from near, or from the middle of the box, each with its 'distance_km'.
+        A west edge greater than the east edge crosses the antimeridian.
+        """
+        latitude, longitude = near or get_bbox_center(south, west, north, east)
+        results = {}
+        for geohash in get_geohashes_for_bbox(
+                south, west, north, east, PlaygroupFinderService.MAX_TILES):
+            for payload in PlaygroupFinderService.get_tile(geohash):
+                if payload['id'] in results:
+                    continue
+                if playgroup_ids is not None and payload['id'] not in playgroup_ids:
+                    continue
+                venues = [
+                    venue for venue in payload['venues']
+                    if is_in_bbox(venue['latitude'], venue['longitude'], south, west, north, east)
+                ]
+                if venues:
+                    results[payload['id']] = PlaygroupFinderService._with_distance(
+                        payload, latitude, longitude, venues)
+        return sorted(results.values(), key=lambda result: (result['distance_km'], result['name']))
+
+    @staticmethod
+    def _with_distance(payload, latitude, longitude, venues=None):
+        result = dict(payload)
+        result['distance_km'] = round(min(
+            haversine_km(latitude, longitude, venue['latitude'], venue['longitude'])
+            for venue in venues or payload['venues']), 3)
+        return result
+
+
 class EventFormat(models.Model):
     name = models.CharField(max_length=200, unique=True)
     sort_order = models.PositiveSmallIntegerField(default=1)
@@ -447,6 +644,29 @@ class EventResult(models.Model):
             xp += self.num_ties * self.xp_for_digital_loss
         return min(xp, 100)
 
+    @classmethod
+    def get_xp_expression(cls):
+        """get_xp as an SQL expression, for annotating and aggregating results."""
+        def capped_xp(attendance, win, loss):
+            return Least(
+                Value(100),
+                attendance
+                + Coalesce(F('num_wins'), 0) * win
+                + (Coalesce(F('num_losses'), 0) + Coalesce(F('num_ties'), 0)) * loss
+            )
+
+        return Case(
+            When(Q(event__is_excluded_from_xp=True) | Q(event__player_count__lte=1),
+                 then=Value(0)),
+            When(event__is_digital=True, event__is_casual=True,
+                 then=Value(cls.xp_for_digital_casual_attendance)),
+            When(event__is_casual=True, then=Value(cls.xp_for_casual_attendance)),
+            When(event__is_digital=True, then=capped_xp(
+                cls.xp_for_digital_attendance, cls.xp_for_digital_win, cls.xp_for_digital_loss)),
+            default=capped_xp(cls.xp_for_attendance, cls.xp_for_win, cls.xp_for_loss),
+            output_field=IntegerField(),
+        )
+
     def add_deck_by_uploaded_link(self):
         if not self.uploaded_deck_link or self.uploaded_deck_lookup_attempts >= self.max_deck_lookup_attempts:
             raise ValueError(
@@ -487,6 +707,129 @@ class EventResultDeck(models.Model):
         return f'{self.event_result.event.name} - {self.deck}'
 
 
+class UserStatsRollup(models.Model):
+    """Per-user totals of event results, one row per mode, event type and format.
+
+    Rows are rebuilt for a user whenever one of their results or events
+    changes (see the receivers at the end of this module), so profile stats,
+    XP and result-based award criteria can be read without scanning every
+    EventResult. Format families such as "Sealed" are matched on the format
+    name when reading, as the award criteria do.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='stats_rollups')
+    is_digital = models.BooleanField(default=False)
+    is_casual = models.BooleanField(default=False)
+    format = models.ForeignKey(
+        EventFormat, on_delete=models.CASCADE, default=None, null=True, blank=True,
+        related_name='+')
+    events = models.PositiveIntegerField(default=0)
+    match_wins = models.PositiveIntegerField(default=0)
+    match_losses = models.PositiveIntegerField(default=0)
+    match_ties = models.PositiveIntegerField(default=0)
+    events_won = models.PositiveIntegerField(default=0)
+    wins_3_to_5 = models.PositiveIntegerField(
+        default=0, help_text=_('Wins at 3 to 5 player events counted in global rankings'))
+    wins_6_plus = models.PositiveIntegerField(
+        default=0, help_text=_('Wins at 6+ player events counted in global rankings'))
+    seconds_6_plus = models.PositiveIntegerField(default=0)
+    thirds_6_to_10 = models.PositiveIntegerField(default=0)
+    top_four_11_plus = models.PositiveIntegerField(
+        default=0, help_text=_('3rd or 4th place at 11+ player events'))
+    top_eight_11_plus = models.PositiveIntegerField(
+        default=0, help_text=_('5th to 8th place at 11+ player events'))
+    xp = models.PositiveIntegerField(default=0)
+
+    TOTAL_FIELDS = [
+        'events', 'match_wins', 'match_losses', 'match_ties', 'events_won',
+        'wins_3_to_5', 'wins_6_plus', 'seconds_6_plus', 'thirds_6_to_10',
+        'top_four_11_plus', 'top_eight_11_plus', 'xp',
+    ]
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['user', 'is_digital', 'is_casual', 'format'],
+                             name='unique_user_stats_rollup'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.format}'
+
+    @classmethod
+    def rebuild(cls, user_ids=None, batch_size=1000):
+        """
+        Recompute the rollup rows of the given users, or of everyone, with a
+        single grouped query over their results.
+
+        Returns:
+            Number of rows written
+        """
+        results = EventResult.objects.all()
+        if user_ids is not None:
+            user_ids = set(user_ids)
+            if not user_ids:
+                return 0
+            results = results.filter(user_id__in=user_ids)
+
+        tournament_win = Q(finishing_position=1,
+                           event__is_excluded_from_global_rankings=False)
+        totals = (
+            results
+            .order_by()
+            .values('user', 'event__is_digital', 'event__is_casual', 'event__format')
+            .annotate(
+                total_events=Count('id'),
+                total_match_wins=Coalesce(Sum('num_wins'), 0),
+                total_match_losses=Coalesce(Sum('num_losses'), 0),
+                total_match_ties=Coalesce(Sum('num_ties'), 0),
+                total_events_won=Count('id', filter=Q(finishing_position=1)),
+                total_wins_3_to_5=Count('id', filter=tournament_win & Q(
+                    event__player_count__range=(3, 5))),
+                total_wins_6_plus=Count('id', filter=tournament_win & Q(
+                    event__player_count__gte=6)),
+                total_seconds_6_plus=Count('id', filter=Q(
+                    finishing_position=2, event__player_count__gte=6)),
+                total_thirds_6_to_10=Count('id', filter=Q(
+                    finishing_position=3, event__player_count__range=(6, 10))),
+                total_top_four_11_plus=Count('id', filter=Q(
+                    finishing_position__range=(3, 4), event__player_count__gte=11)),
+                total_top_eight_11_plus=Count('id', filter=Q(
+                    finishing_position__range=(5, 8), event__player_count__gte=11)),
+                total_xp=Coalesce(Sum(EventResult.get_xp_expression()), 0),
+            )
+        )
+        rollups = [
+            cls(
+                user_id=row['user'],
+                is_digital=row['event__is_digital'],
+                is_casual=row['event__is_casual'],
+                format_id=row['event__format'],
+                **{field: row[f'total_{field}'] for field in cls.TOTAL_FIELDS}
+            )
+            for row in totals
+        ]
+
+        with transaction.atomic():
+            existing = cls.objects.all()
+            if user_ids is not None:
+                existing = existing.filter(user_id__in=user_ids)
+            existing.delete()
+            cls.objects.bulk_create(rollups, batch_size=batch_size)
+            cls.update_profile_xp(user_ids)
+        return len(rollups)
+
+    @classmethod
+    def update_profile_xp(cls, user_ids=None):
+        """Copy each user's rolled up XP to PmcProfile.total_xp."""
+        user_xp = cls.objects.filter(
+            user=OuterRef('user')
+        ).order_by().values('user').annotate(total=Sum('xp')).values('total')
+        profiles = PmcProfile.objects.all()
+        if user_ids is not None:
+            profiles = profiles.filter(user_id__in=user_ids)
+        profiles.update(total_xp=Coalesce(Subquery(user_xp), 0))
+
+
 class RankingPointsMapVersion(models.Model):
     name = models.CharField(max_length=100)
     effective_on = models.DateField(unique=True)
@@ -696,12 +1039,83 @@ class PlayerRank(models.Model):
     period = models.ForeignKey(
         LeaderboardSeasonPeriod, on_delete=models.CASCADE)
 
+    BOARD_ORDERING = ('rank', '-num_results', 'id')
+    BOARD_COUNT_CACHE_TIMEOUT = 60 * 60
+
     class Meta:
         ordering = ('rank', '-num_results')
         constraints = [
             UniqueConstraint(
                 fields=['user', 'leaderboard', 'playgroup', 'period'], name='unique_user_leaderboard_playgroup_period'),
         ]
+        indexes = [
+            models.Index(
+                fields=['leaderboard', 'period', 'playgroup', 'rank'], name='playerrank_board_rank_idx'),
+        ]
+
+    @staticmethod
+    def get_board_counts_cache_key(leaderboard_id, period_id):
+        return f'pmc:leaderboard-counts:{leaderboard_id}:{period_id}'
+
+    @classmethod
+    def get_board_count(cls, leaderboard_id, period_id, playgroup_id=None):
+        """
+        Number of ranked players on a leaderboard period, globally or in a
+        playgroup. Counts for every playgroup of the period are read with one
+        query and kept in the shared cache, so every process drops them when
+        apply_player_ranks adds or removes rows.
+        """
+        counts = caches[SHARED_CACHE_ALIAS].get_or_set(
+            cls.get_board_counts_cache_key(leaderboard_id, period_id),
+            lambda: dict(
+                cls.objects.filter(leaderboard_id=leaderboard_id, period_id=period_id)
+                .order_by()
+                .values_list('playgroup_id')
+                .annotate(Count('id'))
+            ),
+            cls.BOARD_COUNT_CACHE_TIMEOUT)
+        return counts.get(playgroup_id, 0)
+
+    @classmethod
+    def get_board_slice(cls, rankings, offset, limit):
+        """
+        Rows offset to offset + limit of rankings in BOARD_ORDERING, read by
+        seeking on rank rather than with OFFSET.
+
+        Ranks are competition ranks, so a player ranked r has exactly r - 1
+        players ahead of them. The row at offset therefore belongs to the
+        highest rank not above offset + 1, and only players tied on that
+        rank have to be skipped.
+        """
+        start_rank = 1
+        if offset > 0:
+            start_rank = rankings.filter(rank__lte=offset + 1).order_by(
+                '-rank').values_list('rank', flat=True).first() or 1
+        skip = offset - (start_rank - 1)
+        return list(rankings.filter(rank__gte=start_rank).order_by(
+            *cls.BOARD_ORDERING)[skip:skip + limit])
+
+    @classmethod
+    def get_board_offset(cls, rankings, player_rank):
+        """Number of rows ahead of player_rank in rankings, in BOARD_ORDERING."""
+        return player_rank.rank - 1 + rankings.filter(rank=player_rank.rank).filter(
+            Q(num_results__gt=player_rank.num_results) |
+            Q(num_results=player_rank.num_results, id__lt=player_rank.id)
+        ).count()
+
+    @classmethod
+    def get_neighbors(cls, rankings, player_rank, distance=5):
+        """
+        Rows ranked within distance of player_rank, read with a single
+        range query on rank. Ties can put more rows than that in range, so
+        at most distance rows are kept on either side of player_rank.
+        """
+        rows = list(rankings.filter(
+            rank__gte=player_rank.rank - distance,
+            rank__lte=player_rank.rank + distance
+        ).order_by(*cls.BOARD_ORDERING))
+        index = next(i for i, row in enumerate(rows) if row.pk == player_rank.pk)
+        return rows[max(0, index - distance):index + distance + 1]
 
 
 class LevelBreakpoint(models.Model):
@@ -714,6 +1128,50 @@ class LevelBreakpoint(models.Model):
     def __str__(self):
         return f'{self.level}'
 
+    @classmethod
+    def build_table(cls):
+        """
+        Breakpoints sorted by required XP.
+
+        Returns:
+            Tuple of (required XP list, highest level reached at each index,
+            lowest level not yet reached after each index)
+        """
+        breakpoints = sorted(cls.objects.all(),
+                             key=lambda b: (b.required_xp, b.level))
+        reached = []
+        for breakpoint in breakpoints:
+            if not reached or breakpoint.level > reached[-1].level:
+                reached.append(breakpoint)
+            else:
+                reached.append(reached[-1])
+        upcoming = []
+        for breakpoint in reversed(breakpoints):
+            if not upcoming or breakpoint.level < upcoming[-1].level:
+                upcoming.append(breakpoint)
+            else:
+                upcoming.append(upcoming[-1])
+        upcoming.reverse()
+        return [b.required_xp for b in breakpoints], reached, upcoming
+
+    @classmethod
+    def get_table(cls):
+        """build_table, kept in memory until a breakpoint changes."""
+        return LEVEL_BREAKPOINTS.get()
+
+    @classmethod
+    def get_for_xp(cls, total_xp):
+        """
+        Returns:
+            Tuple of (highest breakpoint reached, lowest breakpoint not yet
+            reached) for total_xp; either may be None
+        """
+        required_xp, reached, upcoming = cls.get_table()
+        index = bisect_right(required_xp, total_xp)
+        current_level = reached[index - 1] if index > 0 else None
+        next_level = upcoming[index] if index < len(upcoming) else None
+        return current_level, next_level
+
 
 class PmcProfile(models.Model):
     class ThemeOptions(models.IntegerChoices):
@@ -751,18 +1209,25 @@ class PmcProfile(models.Model):
         default=False,
         verbose_name=_('Playgroups')
     )
+    total_xp = models.PositiveIntegerField(
+        default=0, db_index=True, editable=False,
+        help_text=_('Kept in step with the stats rollup, for XP leaderboards'))
+
+    def save(self, *args, **kwargs):
+        # total_xp is written by UserStatsRollup.update_profile_xp, so a
+        # stale instance (e.g. the one saved on every login) must not reset it
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'total_xp'
+            ]
+        super().save(*args, **kwargs)
 
     def get_avatar(self):
-        try:
-            return self.avatar or Avatar.objects.get(pmc_id='001')
-        except Avatar.DoesNotExist:
-            return None
+        return self.avatar or AVATARS.get().get(Avatar.DEFAULT_PMC_ID)
 
     def get_background(self):
-        try:
-            return self.background or Background.objects.get(pmc_id='001')
-        except Background.DoesNotExist:
-            return None
+        return self.background or BACKGROUNDS.get().get(Background.DEFAULT_PMC_ID)
 
     def get_events(self, exclude_upcoming=False):
         qs = self.user.event_results.order_by('-event__start_date')
@@ -773,34 +1238,35 @@ class PmcProfile(models.Model):
     def get_events_won(self):
         return self.get_events().filter(finishing_position=1)
 
+    def get_num_events_won(self):
+        return self._get_stat_total('events_won')
+
     def get_num_match_wins(self):
-        return self.get_events().aggregate(Sum('num_wins'))['num_wins__sum'] or 0
+        return self._get_stat_total('match_wins')
 
     def get_total_xp(self):
-        event_results = EventResult.objects.filter(
-            user=self.user,
-            event__is_excluded_from_xp=False
-        )
-        total_xp = 0
-        for result in event_results:
-            total_xp += result.get_xp()
+        return self._get_stat_total('xp')
 
-        return total_xp
+    def _get_stat_total(self, field):
+        return self.user.stats_rollups.aggregate(
+            total=Coalesce(Sum(field), 0))['total']
 
-    def get_level(self):
-        return LevelBreakpoint.objects.filter(
-            required_xp__lte=self.get_total_xp()
-        ).order_by('-level').first()
+    def get_level(self, total_xp=None):
+        if total_xp is None:
+            total_xp = self.get_total_xp()
+        return LevelBreakpoint.get_for_xp(total_xp)[0]
 
-    def get_next_level(self):
-        return LevelBreakpoint.objects.filter(
-            required_xp__gt=self.get_total_xp()
-        ).order_by('level').first()
+    def get_next_level(self, total_xp=None):
+        if total_xp is None:
+            total_xp = self.get_total_xp()
+        return LevelBreakpoint.get_for_xp(total_xp)[1]
 
-    def _get_level_up_info(self):
+    @cached_property
+    def level_up_info(self):
+        """Level progress, computed once per profile instance."""
         total_xp = self.get_total_xp()
-        current_level = self.get_level()
-        next_level = self.get_next_level()
+        current_level = self.get_level(total_xp)
+        next_level = self.get_next_level(total_xp)
 
         percent_level_up = None
         if current_level and next_level:
@@ -822,13 +1288,29 @@ class PmcProfile(models.Model):
         }
 
     def get_percent_level_up(self):
-        return self._get_level_up_info()['percent_level_up']
+        return self.level_up_info['percent_level_up']
 
     def get_level_increment(self):
-        return self._get_level_up_info()['level_increment']
+        return self.level_up_info['level_increment']
 
     def get_level_increment_progress(self):
-        return self._get_level_up_info()['level_increment_progress']
+        return self.level_up_info['level_increment_progress']
+
+    @classmethod
+    def get_xp_rankings(cls, playgroup=None):
+        """
+        Profiles with XP, ranked by total XP with ties sharing a rank.
+
+        With a playgroup, only its visible members are ranked.
+        """
+        profiles = cls.objects.filter(total_xp__gt=0)
+        if playgroup is not None:
+            profiles = profiles.filter(
+                user__playgroupmember__playgroup=playgroup,
+                user__playgroupmember__is_hidden=False)
+        return profiles.select_related('user', 'avatar').annotate(
+            rank=Window(Rank(), order_by=F('total_xp').desc())
+        ).order_by('rank', 'user__username')
 
     def get_mv_qrcode_path(self):
         if not self.mv_qrcode_message:
@@ -937,6 +1419,9 @@ class RankingPointsService():
             ranking_period (LeaderboardSeasonPeriod): The period defining the date range.
             order_by (str): Field to sort rankings by (default: 'total_points').
             top_n_per_month (int): The number of highest-scoring results per calendar month to consider.
+
+        Returns:
+            Row change counts, as for apply_player_ranks
         """
         start_date = ranking_period.start_date
         next_period = LeaderboardSeasonPeriod.objects.filter(
@@ -962,82 +1447,284 @@ class RankingPointsService():
             )
         ).filter(point_rank__lte=top_n_per_month)
 
-        def compute_rankings(playgroup=None):
-            filters = {}
-            if playgroup:
-                filters["result__event__playgroups"] = playgroup
-                base_qs = ranking_points_qs
-            else:
-                filters["result__event__is_excluded_from_global_rankings"] = False
-                base_qs = ranked_points
+        rank_order = F(order_by).desc()
+
+        global_rows = (
+            RankingPoints.objects
+            .filter(pk__in=ranked_points.filter(
+                result__event__is_excluded_from_global_rankings=False
+            ).values('pk'))
+            .values(user_id=F('result__user'))
+            .annotate(
+                total_points=Sum('points'),
+                num_results=Count('id'),
+                average_points=Avg('points'),
+            )
+            .annotate(rank=Window(Rank(), order_by=rank_order))
+            .order_by('rank', '-num_results')
+        )
+        # Only playgroups with points in the period produce rows
+        playgroup_rows = (
+            ranking_points_qs
+            .filter(result__event__playgroup_events__isnull=False)
+            .values(
+                playgroup_id=F('result__event__playgroup_events__playgroup'),
+                user_id=F('result__user'),
+            )
+            .annotate(
+                total_points=Sum('points'),
+                num_results=Count('id'),
+                average_points=Avg('points'),
+            )
+            # The window must be annotated separately, or Django groups by it
+            .annotate(rank=Window(
+                Rank(),
+                partition_by=F('result__event__playgroup_events__playgroup'),
+                order_by=rank_order))
+            .order_by('playgroup_id', 'rank', '-num_results')
+        )
 
-            raw_results = base_qs.filter(**filters).values_list(
-                "result__user", "points"
+        player_ranks = [
+            PlayerRank(
+                user_id=row['user_id'],
+                playgroup_id=row.get('playgroup_id'),
+                rank=row['rank'],
+                average_points=row['total_points'] / row['num_results'],
+                total_points=row['total_points'],
+                num_results=row['num_results'],
+                leaderboard=leaderboard,
+                period=ranking_period
             )
+            for rows in (global_rows, playgroup_rows)
+            for row in rows
+        ]
 
-            monthly_data = {}
-            for user_id, points in raw_results:
-                if user_id not in monthly_data:
-                    monthly_data[user_id] = {
-                        "total_points": 0, "num_results": 0}
-                monthly_data[user_id]["total_points"] += points
-                monthly_data[user_id]["num_results"] += 1
+        return RankingPointsService.apply_player_ranks(
+            leaderboard, ranking_period, player_ranks)
 
-            top_n_user_points = [
-                {
-                    "result__user": user_id,
-                    "total_points": data["total_points"],
-                    "num_results": data["num_results"]
-                }
-                for user_id, data in monthly_data.items()
-            ]
+    @staticmethod
+    def apply_player_ranks(leaderboard, ranking_period, player_ranks, batch_size=500):
+        """
+        Make the PlayerRank rows of a leaderboard period match player_ranks,
+        writing only the rows that changed, in one transaction.
 
-            user_data = {entry["result__user"]: {
-                "total_points": entry["total_points"],
-                "num_results": entry["num_results"],
-                "avg_points": entry["total_points"] / entry["num_results"] if entry["num_results"] > 0 else 0
-            }
-                for entry in top_n_user_points
+        Returns:
+            Dict with the number of rows 'created', 'updated', 'deleted' and
+            left 'unchanged'
+        """
+        fields = ['rank', 'average_points', 'total_points', 'num_results']
+        with transaction.atomic():
+            existing = {
+                (player_rank.user_id, player_rank.playgroup_id): player_rank
+                for player_rank in PlayerRank.objects.select_for_update().filter(
+                    leaderboard=leaderboard, period=ranking_period)
             }
+            to_create = []
+            to_update = []
+            for player_rank in player_ranks:
+                current = existing.pop(
+                    (player_rank.user_id, player_rank.playgroup_id), None)
+                if current is None:
+                    to_create.append(player_rank)
+                elif any(getattr(current, field) != getattr(player_rank, field)
+                         for field in fields):
+                    for field in fields:
+                        setattr(current, field, getattr(player_rank, field))
+                    to_update.append(current)
+
+            if existing:
+                PlayerRank.objects.filter(
+                    id__in=[player_rank.id for player_rank in existing.values()]
+                ).delete()
+            if to_update:
+                PlayerRank.objects.bulk_update(to_update, fields, batch_size=batch_size)
+            if to_create:
+                PlayerRank.objects.bulk_create(to_create, batch_size=batch_size)
+            if to_create or existing:
+                cache_key = PlayerRank.get_board_counts_cache_key(
+                    leaderboard.pk, ranking_period.pk)
+                transaction.on_commit(
+                    lambda: caches[SHARED_CACHE_ALIAS].delete(cache_key))
+
+        return {
+            'created': len(to_create),
+            'updated': len(to_update),
+            'deleted': len(existing),
+            'unchanged': len(player_ranks) - len(to_create) - len(to_update),
+        }
+
+    @staticmethod
+    def refresh_leaderboard(leaderboard, progress=None):
+        """
+        Recalculate the current and last week's periods of a leaderboard,
+        skipping locked ones, then update period locks.
+
+        progress, if given, is called with (steps done, total steps).
 
-            player_ranks = [
-                PlayerRank(
-                    user_id=user_id,
-                    playgroup=playgroup,
-                    rank=None,
-                    average_points=user_data[user_id].get("avg_points", 0),
-                    total_points=user_data[user_id]["total_points"],
-                    num_results=user_data[user_id]["num_results"],
-                    leaderboard=leaderboard,
-                    period=ranking_period
+        Returns:
+            PlayerRank row change counts summed over the refreshed periods
+        """
+        if leaderboard.period_frequency not in LeaderboardSeasonPeriod.FrequencyOptions.values:
+            raise ValueError('Invalid leaderboard period frequency')
+        order_by = 'total_points'
+
+        period = leaderboard.get_period_for_date(date.today())
+        last_week_period = leaderboard.get_period_for_date(
+            date.today() - timedelta(days=7))
+        periods = [period]
+        if last_week_period.pk != period.pk:
+            periods.append(last_week_period)
+
+        changes = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+        total_steps = len(periods) + 1
+        for step, ranking_period in enumerate(periods, start=1):
+            if not ranking_period.is_locked:
+                period_changes = RankingPointsService.assign_points_for_leaderboard(
+                    leaderboard,
+                    ranking_period,
+                    order_by=order_by
                 )
-                for user_id in user_data
-            ]
+                for name, count in period_changes.items():
+                    changes[name] += count
+            if progress:
+                progress(step, total_steps)
+
+        LeaderboardSeasonPeriod.objects.update_all_lock_statuses()
+
+        LeaderboardLog.objects.create(
+            leaderboard=leaderboard
+        )
+        if progress:
+            progress(total_steps, total_steps)
+        return changes
 
-            player_ranks.sort(
-                key=lambda pr: (-getattr(pr, order_by), -pr.num_results))
-            rank_with_ties = 1
-            prev_value = None
-            for ix, pr in enumerate(player_ranks, start=1):
-                current_value = getattr(pr, order_by)
-                if current_value != prev_value:
-                    rank_with_ties = ix
-                prev_value = current_value
-                pr.rank = rank_with_ties
+    @staticmethod
+    def refresh_all_leaderboards(progress=None, top_n_per_month=5):
+        """
+        Refresh the current and last week's periods of every leaderboard,
+        as refresh_leaderboard does, from a single read of the RankingPoints
+        covering all of them. Ranks are computed once per period, shared by
+        leaderboards of the same frequency, and written in one transaction.
 
-            return player_ranks
+        Returns:
+            PlayerRank row change counts summed over the refreshed periods
+        """
+        leaderboards = list(Leaderboard.objects.filter(
+            period_frequency__in=LeaderboardSeasonPeriod.FrequencyOptions.values))
+        targets = []
+        for leaderboard in leaderboards:
+            periods = {}
+            for the_date in [date.today(), date.today() - timedelta(days=7)]:
+                period = leaderboard.get_period_for_date(the_date)
+                periods[period.pk] = period
+            targets.extend(
+                (leaderboard, period) for period in periods.values()
+                if not period.is_locked)
+
+        date_ranges = {
+            period.pk: (period.start_date, period.get_end_date())
+            for _, period in targets
+        }
+        ranks_by_period = {}
+        if date_ranges:
+            start_date = min(start for start, _ in date_ranges.values())
+            end_date = max(end for _, end in date_ranges.values())
+            points = list(RankingPoints.objects.filter(
+                result__event__start_date__gte=start_date,
+                result__event__start_date__lt=end_date
+            ).values_list(
+                'result__user', 'result__event', 'result__event__start_date',
+                'result__event__is_excluded_from_global_rankings', 'points'))
+            event_playgroups = {}
+            for event_id, playgroup_id in PlaygroupEvent.objects.filter(
+                event__start_date__gte=start_date,
+                event__start_date__lt=end_date
+            ).values_list('event', 'playgroup'):
+                event_playgroups.setdefault(event_id, []).append(playgroup_id)
+
+            for period_id, (period_start, period_end) in date_ranges.items():
+                ranks_by_period[period_id] = RankingPointsService._rank_points(
+                    [row for row in points if period_start <= row[2] < period_end],
+                    event_playgroups,
+                    top_n_per_month)
+
+        changes = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+        total_steps = len(targets) + 1
+        with transaction.atomic():
+            for step, (leaderboard, period) in enumerate(targets, start=1):
+                player_ranks = [
+                    PlayerRank(
+                        user_id=user_id,
+                        playgroup_id=playgroup_id,
+                        rank=rank,
+                        average_points=total_points / num_results,
+                        total_points=total_points,
+                        num_results=num_results,
+                        leaderboard=leaderboard,
+                        period=period
+                    )
+                    for user_id, playgroup_id, rank, total_points, num_results
+                    in ranks_by_period[period.pk]
+                ]
+                period_changes = RankingPointsService.apply_player_ranks(
+                    leaderboard, period, player_ranks)
+                for name, count in period_changes.items():
+                    changes[name] += count
+                if progress:
+                    progress(step, total_steps)
+
+            LeaderboardSeasonPeriod.objects.update_all_lock_statuses()
+            LeaderboardLog.objects.bulk_create(
+                [LeaderboardLog(leaderboard=leaderboard) for leaderboard in leaderboards])
+        if progress:
+            progress(total_steps, total_steps)
+        return changes
 
-        global_ranks = compute_rankings(playgroup=None)
-        playgroup_ranks = []
-        for playgroup in Playgroup.objects.all():
-            playgroup_ranks.extend(compute_rankings(playgroup=playgroup))
+    @staticmethod
+    def _rank_points(points, event_playgroups, top_n_per_month):
+        """
+        In-memory counterpart of the ranking queries in
+        assign_points_for_leaderboard, ordered by total points.
 
-        PlayerRank.objects.filter(
-            leaderboard=leaderboard, period=ranking_period).delete()
-        PlayerRank.objects.bulk_create(
-            global_ranks + playgroup_ranks, ignore_conflicts=True)
+        Args:
+            points: (user id, event id, event date, excluded from global
+                rankings, points) rows of one period
+            event_playgroups: Dict of event id to its playgroup ids
 
-        return global_ranks + playgroup_ranks
+        Returns:
+            List of (user id, playgroup id or None, rank, total points,
+            number of results)
+        """
+        monthly_points = {}
+        playgroup_totals = {}
+        for user_id, event_id, event_date, is_excluded, value in points:
+            if not is_excluded:
+                month = (user_id, event_date.year, event_date.month)
+                monthly_points.setdefault(month, []).append(value)
+            for playgroup_id in event_playgroups.get(event_id, []):
+                totals = playgroup_totals.setdefault(playgroup_id, {}).setdefault(
+                    user_id, [0, 0])
+                totals[0] += value
+                totals[1] += 1
+
+        global_totals = {}
+        for (user_id, _year, _month), values in monthly_points.items():
+            top_values = sorted(values, reverse=True)[:top_n_per_month]
+            totals = global_totals.setdefault(user_id, [0, 0])
+            totals[0] += sum(top_values)
+            totals[1] += len(top_values)
+
+        ranks = []
+        for playgroup_id, user_totals in [(None, global_totals)] + sorted(playgroup_totals.items()):
+            ordered = sorted(user_totals.items(), key=lambda item: (-item[1][0], -item[1][1]))
+            rank = 0
+            previous_total = None
+            for position, (user_id, (total_points, num_results)) in enumerate(ordered, start=1):
+                if total_points != previous_total:
+                    rank = position
+                previous_total = total_points
+                ranks.append((user_id, playgroup_id, rank, total_points, num_results))
+        return ranks
 
 
 class AvatarCategory(models.Model):
@@ -1065,6 +1752,8 @@ class BackgroundCategory(models.Model):
 
 
 class Avatar(models.Model):
+    DEFAULT_PMC_ID = '001'
+
     pmc_id = models.CharField(max_length=10, unique=True)
     src = models.URLField()
     category = models.ForeignKey(
@@ -1090,6 +1779,8 @@ class Avatar(models.Model):
 
 
 class Background(models.Model):
+    DEFAULT_PMC_ID = '001'
+
     pmc_id = models.CharField(max_length=10, unique=True)
     src = models.URLField()
     category_label = models.CharField(max_length=25)
@@ -1494,11 +2185,208 @@ class PinnedAward(models.Model):
                 pin.save(update_fields=['position'])
 
 
+class BackgroundJob(models.Model):
+    """A unit of deferred work, run by the run_jobs command.
+
+    Handlers are registered by name in pmc.jobs. At most one job per key can
+    be queued at a time, which makes enqueueing idempotent; it waits for a
+    running job of the same key to finish before it starts.
+    """
+    class StatusOptions(models.IntegerChoices):
+        QUEUED = (0, _('Queued'))
+        RUNNING = (1, _('Running'))
+        SUCCEEDED = (2, _('Succeeded'))
+        FAILED = (3, _('Failed'))
+
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=200)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.IntegerField(
+        choices=StatusOptions.choices, default=StatusOptions.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(
+        max_length=100, default=None, null=True, blank=True)
+    locked_at = models.DateTimeField(default=None, null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        default=None, null=True, blank=True,
+        help_text=_('Refreshed by the worker while the job runs'))
+    progress_current = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=None, null=True, blank=True)
+    last_error = models.TextField(default=None, null=True, blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(default=None, null=True, blank=True)
+
+    class Meta:
+        ordering = ('run_after', 'id')
+        constraints = [
+            UniqueConstraint(
+                fields=['key'],
+                condition=Q(status=0),
+                name='unique_queued_background_job_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
+
+    def set_progress(self, current, total=None):
+        self.progress_current = current
+        if total is not None:
+            self.progress_total = total
+        BackgroundJob.objects.filter(pk=self.pk).update(
+            progress_current=self.progress_current,
+            progress_total=self.progress_total)
+
+    def heartbeat(self):
+        """Record that the worker holding this job is still running it."""
+        self.heartbeat_at = timezone.now()
+        return BackgroundJob.objects.filter(
+            pk=self.pk, status=BackgroundJob.StatusOptions.RUNNING,
+            locked_by=self.locked_by
+        ).update(heartbeat_at=self.heartbeat_at)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'key': self.key,
+            'status': self.StatusOptions(self.status).label.lower(),
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'progress': {
+                'current': self.progress_current,
+                'total': self.progress_total,
+            },
+            'last_error': self.last_error,
+            'created_on': self.created_on.isoformat() if self.created_on else None,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'finished_on': self.finished_on.isoformat() if self.finished_on else None,
+        }
+
+
+class DirtyAwardUser(models.Model):
+    """A user whose awards may be out of date because a source they depend on changed.
+
+    Rows are added by signal receivers and consumed by
+    AwardAssignmentService.process_dirty_users. A row without a user marks
+    the source as changed for every user.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, default=None, null=True, blank=True,
+        related_name='+')
+    source = models.CharField(max_length=50)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['user', 'source'],
+                             name='unique_dirty_award_user_source'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id or "all users"} - {self.source}'
+
+
 class AwardAssignmentService():
     """
     Helper for assigning trophies to users based on their stats and trophy criteria.
     """
 
+    # Criteria read from UserStatsRollup: the rollup filters and what to
+    # total ('matches' for wins plus losses, otherwise a rollup field).
+    STATS_ROLLUP_CRITERIA = {
+        AwardBase.CriteriaTypeOptions.event_matches: ({}, 'matches'),
+        AwardBase.CriteriaTypeOptions.sealed_event_matches: (
+            {'format__name__icontains': 'Sealed'}, 'matches'),
+        AwardBase.CriteriaTypeOptions.archon_event_matches: (
+            {'format__name__icontains': 'Archon'}, 'matches'),
+        AwardBase.CriteriaTypeOptions.alliance_event_matches: (
+            {'format__name__icontains': 'Alliance'}, 'matches'),
+        AwardBase.CriteriaTypeOptions.adaptive_event_matches: (
+            {'format__name__icontains': 'Adaptive'}, 'matches'),
+        AwardBase.CriteriaTypeOptions.tournament_match_wins: (
+            {'is_casual': False}, 'match_wins'),
+        AwardBase.CriteriaTypeOptions.sealed_tournament_match_wins: (
+            {'is_casual': False, 'format__name__icontains': 'Sealed'}, 'match_wins'),
+        AwardBase.CriteriaTypeOptions.archon_tournament_match_wins: (
+            {'is_casual': False, 'format__name__icontains': 'Archon'}, 'match_wins'),
+        AwardBase.CriteriaTypeOptions.alliance_tournament_match_wins: (
+            {'is_casual': False, 'format__name__icontains': 'Alliance'}, 'match_wins'),
+        AwardBase.CriteriaTypeOptions.adaptive_tournament_match_wins: (
+            {'is_casual': False, 'format__name__icontains': 'Adaptive'}, 'match_wins'),
+        AwardBase.CriteriaTypeOptions.win_a_tournament_3_to_5: (
+            {'is_casual': False}, 'wins_3_to_5'),
+        AwardBase.CriteriaTypeOptions.win_a_tournament_6_plus: (
+            {'is_casual': False}, 'wins_6_plus'),
+        AwardBase.CriteriaTypeOptions.events: ({}, 'events'),
+        AwardBase.CriteriaTypeOptions.second_place_a_tournament_6_plus: (
+            {'is_casual': False}, 'seconds_6_plus'),
+        AwardBase.CriteriaTypeOptions.third_place_a_tournament_6_plus: (
+            {'is_casual': False}, 'thirds_6_to_10'),
+        AwardBase.CriteriaTypeOptions.top_four_a_tournament_11_plus: (
+            {'is_casual': False}, 'top_four_11_plus'),
+        AwardBase.CriteriaTypeOptions.top_eight_a_tournament_11_plus: (
+            {'is_casual': False}, 'top_eight_11_plus'),
+    }
+
+    # Criteria counted directly from a user's event results, with the
+    # extra result filters
+    EVENT_RESULT_CRITERIA = {
+        AwardBase.CriteriaTypeOptions.store_champion: {
+            'event__is_casual': False,
+            'finishing_position': 1,
+            'event__tags__slug': 'store-championship',
+        },
+        AwardBase.CriteriaTypeOptions.participate_in_premier_tournament: {
+            'event__is_casual': False,
+            'event__playgroup_events__playgroup__name': 'Premier Tournaments',
+        },
+    }
+
+    # Leaderboard placement criteria: (leaderboard name, playgroup boards,
+    # inclusive rank range, minimum players ranked in the period)
+    LEADERBOARD_CRITERIA = {
+        AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_first_place: ('Season', True, (1, 1), 1),
+        AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_second_place: ('Season', True, (2, 2), 1),
+        AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_third_place: ('Season', True, (3, 3), 1),
+        AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_top_five: ('Season', True, (4, 5), 10),
+        AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_top_ten: ('Season', True, (6, 10), 20),
+        AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_first_place: ('Month', False, (1, 1), None),
+        AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_ten: ('Month', False, (2, 10), None),
+        AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_twenty_five: ('Month', False, (11, 25), None),
+        AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_fifty: ('Month', False, (26, 50), None),
+        AwardBase.CriteriaTypeOptions.global_leaderboard_season_first_place: ('Season', False, (1, 1), None),
+        AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_ten: ('Season', False, (2, 10), None),
+        AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_fifty: ('Season', False, (11, 50), None),
+        AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_one_hundred: ('Season', False, (51, 100), None),
+    }
+
+    # Championship criteria, won by finishing first at an event with the tag
+    CHAMPION_TAG_SLUGS = {
+        AwardBase.CriteriaTypeOptions.kfc_open_champion: 'kfc-open',
+        AwardBase.CriteriaTypeOptions.vault_warrior: 'vault-tour',
+        AwardBase.CriteriaTypeOptions.world_champion: 'world-championship',
+        AwardBase.CriteriaTypeOptions.national_champion_belgium: 'national-championship-belgium',
+        AwardBase.CriteriaTypeOptions.national_champion_brazil: 'national-championship-brazil',
+        AwardBase.CriteriaTypeOptions.national_champion_canada: 'national-championship-canada',
+        AwardBase.CriteriaTypeOptions.national_champion_china: 'national-championship-china',
+        AwardBase.CriteriaTypeOptions.national_champion_denmark: 'national-championship-denmark',
+        AwardBase.CriteriaTypeOptions.national_champion_italy: 'national-championship-italy',
+        AwardBase.CriteriaTypeOptions.national_champion_netherlands: 'national-championship-netherlands',
+        AwardBase.CriteriaTypeOptions.national_champion_poland: 'national-championship-poland',
+        AwardBase.CriteriaTypeOptions.national_champion_portugal: 'national-championship-portugal',
+        AwardBase.CriteriaTypeOptions.national_champion_south_korea: 'national-championship-south-korea',
+        AwardBase.CriteriaTypeOptions.national_champion_sweden: 'national-championship-sweden',
+        AwardBase.CriteriaTypeOptions.national_champion_taiwan: 'national-championship-taiwan',
+        AwardBase.CriteriaTypeOptions.national_champion_united_kingdom: 'national-championship-united-kingdom',
+        AwardBase.CriteriaTypeOptions.national_champion_united_states: 'national-championship-united-states',
+        AwardBase.CriteriaTypeOptions.national_champion_france: 'national-championship-france',
+        AwardBase.CriteriaTypeOptions.national_champion_chile: 'national-championship-chile',
+        AwardBase.CriteriaTypeOptions.national_champion_germany: 'national-championship-germany',
+        AwardBase.CriteriaTypeOptions.national_champion_greece: 'national-championship-greece',
+    }
+
     @staticmethod
     def refresh_trophy(pmc_id):
         trophy = Trophy.objects.filter(pmc_id=pmc_id).first()
@@ -1507,18 +2395,8 @@ class AwardAssignmentService():
         if trophy.criteria == AwardBase.CriteriaTypeOptions.manually_awarded:
             return
 
-        UserTrophy.objects.filter(trophy=trophy).delete()
-        users = User.objects.all()
-        for user in users:
-            value = AwardAssignmentService.get_user_criteria_value(
-                user, trophy)
-            amount = value // trophy.criteria_value if trophy.criteria_value else 0
-            if amount > 0:
-                UserTrophy.objects.update_or_create(
-                    user=user,
-                    trophy=trophy,
-                    defaults={'amount': amount}
-                )
+        return AwardAssignmentService.apply_award_changes(
+            AwardAssignmentService.get_user_trophy_changes([trophy]))
 
     @staticmethod
     def refresh_achievement(pmc_id):
@@ -1526,75 +2404,258 @@ class AwardAssignmentService():
         if not achievement:
             return
 
-        UserAchievementTier.objects.filter(
-            achievement_tier__achievement=achievement
-        ).delete()
-        tiers = achievement.tiers.all()
-        users = User.objects.all()
-        for user in users:
-            user_value = AwardAssignmentService.get_user_criteria_value(
-                user, achievement)
-            for tier in tiers:
-                if user_value >= tier.criteria_value:
-                    UserAchievementTier.objects.update_or_create(
-                        user=user,
-                        achievement_tier=tier
-                    )
+        return AwardAssignmentService.apply_award_changes(
+            AwardAssignmentService.get_user_achievement_tier_changes([achievement]))
 
     @staticmethod
     def refresh_all_user_trophies():
         """
         Refreshes all user trophies by re-evaluating the criteria for each trophy.
         """
-        UserTrophy.objects.exclude(
-            trophy__criteria=AwardBase.CriteriaTypeOptions.manually_awarded
-        ).delete()
         trophies = Trophy.objects.exclude(
             criteria=AwardBase.CriteriaTypeOptions.manually_awarded
         )
-        users = User.objects.all()
-        for user in users:
-            for trophy in trophies:
-                value = AwardAssignmentService.get_user_criteria_value(
-                    user, trophy)
-                amount = value // trophy.criteria_value if trophy.criteria_value else 0
-                if amount > 0:
-                    UserTrophy.objects.update_or_create(
-                        user=user,
-                        trophy=trophy,
-                        defaults={'amount': amount}
-                    )
+        return AwardAssignmentService.apply_award_changes(
+            AwardAssignmentService.get_user_trophy_changes(trophies))
 
     @staticmethod
     def refresh_user_achievements(
         pmc_id_min=None,
         pmc_id_max=None
     ):
-        qs = UserAchievementTier.objects.all()
-        if pmc_id_min is not None:
-            qs = qs.filter(
-                achievement_tier__achievement__pmc_id__gte=pmc_id_min)
-        if pmc_id_max is not None:
-            qs = qs.filter(
-                achievement_tier__achievement__pmc_id__lte=pmc_id_max)
-        qs.delete()
-        users = User.objects.all()
         achievements = Achievement.objects.all()
         if pmc_id_min is not None:
             achievements = achievements.filter(pmc_id__gte=pmc_id_min)
         if pmc_id_max is not None:
             achievements = achievements.filter(pmc_id__lte=pmc_id_max)
+        return AwardAssignmentService.apply_award_changes(
+            AwardAssignmentService.get_user_achievement_tier_changes(achievements))
+
+    @staticmethod
+    def get_user_trophy_changes(trophies, user_ids=None, get_values=None):
+        """
+        Compare the UserTrophy rows of the given trophies with what their
+        criteria currently award. get_values(award, user_ids) evaluates the
+        criteria and defaults to get_criteria_values.
+
+        Returns:
+            Dict with unsaved UserTrophy rows to 'create', existing rows with a
+            new amount to 'update' and rows that are no longer earned to 'delete'
+        """
+        get_values = get_values or AwardAssignmentService.get_criteria_values
+        trophies = list(trophies)
+        expected = {}
+        for trophy in trophies:
+            if not trophy.criteria_value:
+                continue
+            values = get_values(trophy, user_ids)
+            for user_id, value in values.items():
+                amount = value // trophy.criteria_value
+                if amount > 0:
+                    expected[(user_id, trophy.id)] = amount
+
+        existing = UserTrophy.objects.filter(trophy__in=trophies)
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+
+        changes = {'create': [], 'update': [], 'delete': []}
+        for user_trophy in existing:
+            amount = expected.pop(
+                (user_trophy.user_id, user_trophy.trophy_id), None)
+            if amount is None:
+                changes['delete'].append(user_trophy)
+            elif amount != user_trophy.amount:
+                user_trophy.amount = amount
+                changes['update'].append(user_trophy)
+        changes['create'] = [
+            UserTrophy(user_id=user_id, trophy_id=trophy_id, amount=amount)
+            for (user_id, trophy_id), amount in expected.items()
+        ]
+        return changes
+
+    @staticmethod
+    def get_user_achievement_tier_changes(achievements, user_ids=None, get_values=None):
+        """
+        Compare the UserAchievementTier rows of the given achievements with the
+        tiers their criteria currently award. get_values is as for
+        get_user_trophy_changes.
+
+        Returns:
+            Dict with unsaved rows to 'create', an empty 'update' list and rows
+            that are no longer earned to 'delete'
+        """
+        get_values = get_values or AwardAssignmentService.get_criteria_values
+        achievements = list(achievements)
+        tiers_by_achievement = {}
+        for tier in AchievementTier.objects.filter(achievement__in=achievements):
+            tiers_by_achievement.setdefault(tier.achievement_id, []).append(tier)
+
+        all_user_ids = None
+        expected = set()
         for achievement in achievements:
-            tiers = achievement.tiers.all()
-            for user in users:
-                user_value = AwardAssignmentService.get_user_criteria_value(
-                    user, achievement)
-                for tier in tiers:
-                    if user_value >= tier.criteria_value:
-                        UserAchievementTier.objects.update_or_create(
-                            user=user,
-                            achievement_tier=tier
-                        )
+            tiers = tiers_by_achievement.get(achievement.id, [])
+            if not tiers:
+                continue
+            values = get_values(achievement, user_ids)
+            for tier in tiers:
+                if tier.criteria_value <= 0:
+                    # Every user meets a zero threshold, even without a value
+                    if all_user_ids is None:
+                        all_user_ids = AwardAssignmentService._get_user_ids(user_ids)
+                    qualified = all_user_ids
+                else:
+                    qualified = [
+                        user_id for user_id, value in values.items()
+                        if value >= tier.criteria_value
+                    ]
+                expected.update((user_id, tier.id) for user_id in qualified)
+
+        existing = UserAchievementTier.objects.filter(
+            achievement_tier__achievement__in=achievements)
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+
+        changes = {'create': [], 'update': [], 'delete': []}
+        for user_tier in existing:
+            key = (user_tier.user_id, user_tier.achievement_tier_id)
+            if key in expected:
+                expected.discard(key)
+            else:
+                changes['delete'].append(user_tier)
+        changes['create'] = [
+            UserAchievementTier(user_id=user_id, achievement_tier_id=tier_id)
+            for user_id, tier_id in expected
+        ]
+        return changes
+
+    @staticmethod
+    def apply_award_changes(changes, batch_size=500):
+        """
+        Write the changes returned by get_user_trophy_changes or
+        get_user_achievement_tier_changes with bulk queries.
+
+        Returns:
+            Dict with the number of rows 'created', 'updated' and 'deleted'
+        """
+        for rows in changes.values():
+            if rows:
+                model = type(rows[0])
+                break
+        else:
+            return {'created': 0, 'updated': 0, 'deleted': 0}
+
+        if changes['delete']:
+            model.objects.filter(
+                id__in=[row.id for row in changes['delete']]).delete()
+        if changes['update']:
+            model.objects.bulk_update(
+                changes['update'], ['amount'], batch_size=batch_size)
+        if changes['create']:
+            model.objects.bulk_create(changes['create'], batch_size=batch_size)
+        return {
+            'created': len(changes['create']),
+            'updated': len(changes['update']),
+            'deleted': len(changes['delete']),
+        }
+
+    @staticmethod
+    def get_criteria_sources(criteria_type):
+        """
+        Labels of the models whose rows feed a criteria type's value.
+
+        Matches the sources recorded on DirtyAwardUser by the receivers at
+        the end of this module.
+        """
+        sources = {'pmc.awardcredit'}
+        if criteria_type in AwardAssignmentService.LEADERBOARD_CRITERIA:
+            # Only locked periods count, so ranks matter once a period locks
+            sources.add('pmc.playerrank')
+        elif (criteria_type in AwardAssignmentService.STATS_ROLLUP_CRITERIA
+              or criteria_type in AwardAssignmentService.EVENT_RESULT_CRITERIA
+              or criteria_type in AwardAssignmentService.CHAMPION_TAG_SLUGS
+              or criteria_type == AwardBase.CriteriaTypeOptions.events_at_group_in_calendar_month):
+            sources.update({'pmc.eventresult', 'pmc.event'})
+        elif criteria_type == AwardBase.CriteriaTypeOptions.level:
+            sources.update({'pmc.eventresult', 'pmc.event', 'pmc.levelbreakpoint'})
+        elif criteria_type in [
+            AwardBase.CriteriaTypeOptions.tournament_match_wins_with_house,
+            AwardBase.CriteriaTypeOptions.sets_with_ten_tournament_match_wins,
+        ]:
+            sources.update({
+                'pmc.eventresult', 'pmc.event', 'pmc.eventresultdeck', 'decks.deck'})
+        return sources
+
+    @staticmethod
+    def mark_users_dirty(user_ids, source):
+        """
+        Queue users for award re-evaluation because source changed.
+
+        Pass None as user_ids when the change affects every user.
+        """
+        if user_ids is None:
+            entries = [DirtyAwardUser(user_id=None, source=source)]
+        else:
+            entries = [DirtyAwardUser(user_id=user_id, source=source)
+                       for user_id in set(user_ids) if user_id is not None]
+        DirtyAwardUser.objects.bulk_create(entries, ignore_conflicts=True)
+
+    @staticmethod
+    def process_dirty_users(batch_size=1000):
+        """
+        Re-evaluate the awards of queued users, limited to the awards whose
+        criteria read a source that changed for them.
+
+        Returns:
+            Dict with the number of queue 'entries' consumed and the rows
+            'created', 'updated' and 'deleted'
+        """
+        stats = {'entries': 0, 'created': 0, 'updated': 0, 'deleted': 0}
+        with transaction.atomic():
+            entries = list(
+                DirtyAwardUser.objects.select_for_update(skip_locked=True)
+                .order_by('id')[:batch_size]
+            )
+            if not entries:
+                return stats
+            DirtyAwardUser.objects.filter(
+                id__in=[entry.id for entry in entries]).delete()
+            stats['entries'] = len(entries)
+
+            user_ids_by_source = {}
+            for entry in entries:
+                user_ids = user_ids_by_source.setdefault(entry.source, set())
+                if user_ids is None or entry.user_id is None:
+                    user_ids_by_source[entry.source] = None
+                else:
+                    user_ids.add(entry.user_id)
+
+            trophies = {}
+            achievements = {}
+            for award_model, awards in [(Trophy, trophies), (Achievement, achievements)]:
+                candidates = award_model.objects.exclude(
+                    criteria=AwardBase.CriteriaTypeOptions.manually_awarded)
+                for award in candidates:
+                    user_ids = set()
+                    for source in AwardAssignmentService.get_criteria_sources(award.criteria):
+                        if source not in user_ids_by_source:
+                            continue
+                        if user_ids_by_source[source] is None:
+                            user_ids = None
+                            break
+                        user_ids |= user_ids_by_source[source]
+                    if user_ids is None or user_ids:
+                        key = None if user_ids is None else frozenset(user_ids)
+                        awards.setdefault(key, []).append(award)
+
+            for key, awarded in trophies.items():
+                changes = AwardAssignmentService.get_user_trophy_changes(awarded, key)
+                for name, count in AwardAssignmentService.apply_award_changes(changes).items():
+                    stats[name] += count
+            for key, awarded in achievements.items():
+                changes = AwardAssignmentService.get_user_achievement_tier_changes(awarded, key)
+                for name, count in AwardAssignmentService.apply_award_changes(changes).items():
+                    stats[name] += count
+        return stats
 
     @staticmethod
     def refresh_user_badges():
@@ -1610,116 +2671,51 @@ class AwardAssignmentService():
             for user in users_with_mv_username:
                 UserBadge.objects.update_or_create(user=user, badge=badge)
 
+    @staticmethod
+    def _get_mode_filters(mode):
+        """
+        Event mode filters for an award, as (EventResult filter,
+        EventResultDeck filter).
+        """
+        if mode == AwardBase.ModeOptions.IN_PERSON:
+            return (models.Q(event__is_digital=False),
+                    models.Q(event_result__event__is_digital=False))
+        if mode == AwardBase.ModeOptions.ONLINE:
+            return (models.Q(event__is_digital=True),
+                    models.Q(event_result__event__is_digital=True))
+        return models.Q(), models.Q()
+
+    @staticmethod
+    def _get_rollup_mode_filter(mode):
+        """Event mode filter for an award's UserStatsRollup rows."""
+        if mode == AwardBase.ModeOptions.IN_PERSON:
+            return models.Q(is_digital=False)
+        if mode == AwardBase.ModeOptions.ONLINE:
+            return models.Q(is_digital=True)
+        return models.Q()
+
     @staticmethod
     def get_user_criteria_value(user, award):
         criteria_type = award.criteria
         value = 0
 
-        event_result_mode_filter = models.Q()
-        event_result_event_mode_filter = models.Q()
-        if award.mode == AwardBase.ModeOptions.IN_PERSON:
-            event_result_mode_filter = models.Q(event__is_digital=False)
-            event_result_event_mode_filter = models.Q(
-                event_result__event__is_digital=False)
-        elif award.mode == AwardBase.ModeOptions.ONLINE:
-            event_result_mode_filter = models.Q(event__is_digital=True)
-            event_result_event_mode_filter = models.Q(
-                event_result__event__is_digital=True)
+        event_result_mode_filter, event_result_event_mode_filter = \
+            AwardAssignmentService._get_mode_filters(award.mode)
 
         qs = EventResult.objects.filter(
             user=user).filter(event_result_mode_filter)
 
-        if criteria_type == AwardBase.CriteriaTypeOptions.event_matches:
-            value = qs.aggregate(
-                total=Coalesce(Sum('num_wins'), 0) +
-                Coalesce(Sum('num_losses'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.sealed_event_matches:
-            value = qs.filter(event__format__name__icontains='Sealed').aggregate(
-                total=Coalesce(Sum('num_wins'), 0) +
-                Coalesce(Sum('num_losses'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.archon_event_matches:
-            value = qs.filter(event__format__name__icontains='Archon').aggregate(
-                total=Coalesce(Sum('num_wins'), 0) +
-                Coalesce(Sum('num_losses'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.alliance_event_matches:
-            value = qs.filter(event__format__name__icontains='Alliance').aggregate(
-                total=Coalesce(Sum('num_wins'), 0) +
-                Coalesce(Sum('num_losses'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.adaptive_event_matches:
-            value = qs.filter(event__format__name__icontains='Adaptive').aggregate(
-                total=Coalesce(Sum('num_wins'), 0) +
-                Coalesce(Sum('num_losses'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.tournament_match_wins:
-            value = qs.filter(event__is_casual=False).aggregate(
-                total=Coalesce(Sum('num_wins'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.sealed_tournament_match_wins:
-            value = qs.filter(event__is_casual=False, event__format__name__icontains="Sealed").aggregate(
-                total=Coalesce(Sum('num_wins'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.archon_tournament_match_wins:
-            value = qs.filter(event__is_casual=False, event__format__name__icontains="Archon").aggregate(
-                total=Coalesce(Sum('num_wins'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.alliance_tournament_match_wins:
-            value = qs.filter(event__is_casual=False, event__format__name__icontains="Alliance").aggregate(
-                total=Coalesce(Sum('num_wins'), 0)
-            )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.adaptive_tournament_match_wins:
-            value = qs.filter(event__is_casual=False, event__format__name__icontains="Adaptive").aggregate(
-                total=Coalesce(Sum('num_wins'), 0)
+        if criteria_type in AwardAssignmentService.STATS_ROLLUP_CRITERIA:
+            filters, total = AwardAssignmentService.STATS_ROLLUP_CRITERIA[criteria_type]
+            value = user.stats_rollups.filter(
+                AwardAssignmentService._get_rollup_mode_filter(award.mode),
+                **filters
+            ).aggregate(
+                total=AwardAssignmentService._get_total_expression(total)
             )['total']
-        elif criteria_type == AwardBase.CriteriaTypeOptions.win_a_tournament_3_to_5:
+        elif criteria_type in AwardAssignmentService.EVENT_RESULT_CRITERIA:
             value = qs.filter(
-                finishing_position=1,
-                event__is_casual=False,
-                event__is_excluded_from_global_rankings=False,
-                event__player_count__range=(3, 5)
-            ).count()
-        elif criteria_type == AwardBase.CriteriaTypeOptions.win_a_tournament_6_plus:
-            value = qs.filter(
-                finishing_position=1,
-                event__is_casual=False,
-                event__is_excluded_from_global_rankings=False,
-                event__player_count__gte=6
-            ).count()
-        elif criteria_type == AwardBase.CriteriaTypeOptions.events:
-            value = qs.count()
-        elif criteria_type == AwardBase.CriteriaTypeOptions.second_place_a_tournament_6_plus:
-            value = qs.filter(
-                finishing_position=2,
-                event__is_casual=False,
-                event__player_count__gte=6
-            ).count()
-        elif criteria_type == AwardBase.CriteriaTypeOptions.third_place_a_tournament_6_plus:
-            value = qs.filter(
-                finishing_position=3,
-                event__is_casual=False,
-                event__player_count__range=(6, 10)
-            ).count()
-        elif criteria_type == AwardBase.CriteriaTypeOptions.top_four_a_tournament_11_plus:
-            value = qs.filter(
-                finishing_position__range=(3, 4),
-                event__is_casual=False,
-                event__player_count__gte=11
-            ).count()
-        elif criteria_type == AwardBase.CriteriaTypeOptions.top_eight_a_tournament_11_plus:
-            value = qs.filter(
-                finishing_position__range=(5, 8),
-                event__is_casual=False,
-                event__player_count__gte=11
-            ).count()
-        elif criteria_type == AwardBase.CriteriaTypeOptions.store_champion:
-            value = qs.filter(
-                event__is_casual=False,
-                finishing_position=1,
-                event__tags__slug='store-championship'
-            ).count()
+                **AwardAssignmentService.EVENT_RESULT_CRITERIA[criteria_type]).count()
         elif criteria_type == AwardBase.CriteriaTypeOptions.level:
             current_level = user.pmc_profile.get_level()
             value = current_level.level if current_level else 0
@@ -1777,146 +2773,15 @@ class AwardAssignmentService():
                 .count()
             )
             value = sets_with_10_wins
-        elif criteria_type in [
-            AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_first_place,
-            AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_second_place,
-            AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_third_place,
-            AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_top_five,
-            AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_top_ten
-        ]:
-            rank_min_max = (1, 1)
-            min_players = 1
-            if criteria_type == AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_second_place:
-                rank_min_max = (2, 2)
-            elif criteria_type == AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_third_place:
-                rank_min_max = (3, 3)
-            elif criteria_type == AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_top_five:
-                rank_min_max = (4, 5)
-                min_players = 10
-            elif criteria_type == AwardBase.CriteriaTypeOptions.playgroup_leaderboard_season_top_ten:
-                rank_min_max = (6, 10)
-                min_players = 20
-            player_count_subquery = PlayerRank.objects.filter(
-                playgroup=OuterRef('playgroup'),
-                leaderboard=OuterRef('leaderboard'),
-                period=OuterRef('period'),
-            ).values('playgroup', 'leaderboard', 'period').annotate(
-                cnt=Count('id')
-            ).values('cnt')
-            value = PlayerRank.objects.filter(
-                period__is_locked=True,
-                user=user,
-                rank__gte=rank_min_max[0],
-                rank__lte=rank_min_max[1],
-                playgroup__isnull=False,
-                leaderboard__name='Season'
-            ).exclude(
-                playgroup__name='Premier Tournaments'
-            ).annotate(
-                players_in_period=Subquery(player_count_subquery)
-            ).filter(
-                players_in_period__gte=min_players
-            ).count()
-        elif criteria_type in [
-            AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_first_place,
-            AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_ten,
-            AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_twenty_five,
-            AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_fifty
-        ]:
-            rank_min_max = (1, 1)
-            if criteria_type == AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_ten:
-                rank_min_max = (2, 10)
-            elif criteria_type == AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_twenty_five:
-                rank_min_max = (11, 25)
-            elif criteria_type == AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_top_fifty:
-                rank_min_max = (26, 50)
-            value = PlayerRank.objects.filter(
-                period__is_locked=True,
-                user=user,
-                rank__gte=rank_min_max[0],
-                rank__lte=rank_min_max[1],
-                playgroup__isnull=True,
-                leaderboard__name='Month'
-            ).count()
-        elif criteria_type in [
-            AwardBase.CriteriaTypeOptions.global_leaderboard_season_first_place,
-            AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_ten,
-            AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_fifty,
-            AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_one_hundred
-        ]:
-            rank_min_max = (1, 1)
-            if criteria_type == AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_ten:
-                rank_min_max = (2, 10)
-            elif criteria_type == AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_fifty:
-                rank_min_max = (11, 50)
-            elif criteria_type == AwardBase.CriteriaTypeOptions.global_leaderboard_season_top_one_hundred:
-                rank_min_max = (51, 100)
-            value = PlayerRank.objects.filter(
-                period__is_locked=True,
-                user=user,
-                rank__gte=rank_min_max[0],
-                rank__lte=rank_min_max[1],
-                playgroup__isnull=True,
-                leaderboard__name='Season'
-            ).count()
-        elif criteria_type == AwardBase.CriteriaTypeOptions.participate_in_premier_tournament:
+        elif criteria_type in AwardAssignmentService.LEADERBOARD_CRITERIA:
+            value = AwardAssignmentService._get_leaderboard_placements(
+                criteria_type).filter(user=user).count()
+        elif criteria_type in AwardAssignmentService.CHAMPION_TAG_SLUGS:
             value = qs.filter(
                 event__is_casual=False,
-                event__playgroup_events__playgroup__name='Premier Tournaments',
+                finishing_position=1,
+                event__tags__slug=AwardAssignmentService.CHAMPION_TAG_SLUGS[criteria_type]
             ).count()
-        elif criteria_type in [
-            AwardBase.CriteriaTypeOptions.kfc_open_champion,
-            AwardBase.CriteriaTypeOptions.vault_warrior,
-            AwardBase.CriteriaTypeOptions.world_champion,
-            AwardBase.CriteriaTypeOptions.national_champion_belgium,
-            AwardBase.CriteriaTypeOptions.national_champion_brazil,
-            AwardBase.CriteriaTypeOptions.national_champion_canada,
-            AwardBase.CriteriaTypeOptions.national_champion_china,
-            AwardBase.CriteriaTypeOptions.national_champion_denmark,
-            AwardBase.CriteriaTypeOptions.national_champion_italy,
-            AwardBase.CriteriaTypeOptions.national_champion_netherlands,
-            AwardBase.CriteriaTypeOptions.national_champion_poland,
-            AwardBase.CriteriaTypeOptions.national_champion_portugal,
-            AwardBase.CriteriaTypeOptions.national_champion_south_korea,
-            AwardBase.CriteriaTypeOptions.national_champion_sweden,
-            AwardBase.CriteriaTypeOptions.national_champion_taiwan,
-            AwardBase.CriteriaTypeOptions.national_champion_united_kingdom,
-            AwardBase.CriteriaTypeOptions.national_champion_united_states,
-            AwardBase.CriteriaTypeOptions.national_champion_france,
-            AwardBase.CriteriaTypeOptions.national_champion_chile,
-            AwardBase.CriteriaTypeOptions.national_champion_germany,
-            AwardBase.CriteriaTypeOptions.national_champion_greece
-
-        ]:
-            tag_slug = {
-                AwardBase.CriteriaTypeOptions.kfc_open_champion: 'kfc-open',
-                AwardBase.CriteriaTypeOptions.vault_warrior: 'vault-tour',
-                AwardBase.CriteriaTypeOptions.world_champion: 'world-championship',
-                AwardBase.CriteriaTypeOptions.national_champion_belgium: 'national-championship-belgium',
-                AwardBase.CriteriaTypeOptions.national_champion_brazil: 'national-championship-brazil',
-                AwardBase.CriteriaTypeOptions.national_champion_canada: 'national-championship-canada',
-                AwardBase.CriteriaTypeOptions.national_champion_china: 'national-championship-china',
-                AwardBase.CriteriaTypeOptions.national_champion_denmark: 'national-championship-denmark',
-                AwardBase.CriteriaTypeOptions.national_champion_italy: 'national-championship-italy',
-                AwardBase.CriteriaTypeOptions.national_champion_netherlands: 'national-championship-netherlands',
-                AwardBase.CriteriaTypeOptions.national_champion_poland: 'national-championship-poland',
-                AwardBase.CriteriaTypeOptions.national_champion_portugal: 'national-championship-portugal',
-                AwardBase.CriteriaTypeOptions.national_champion_south_korea: 'national-championship-south-korea',
-                AwardBase.CriteriaTypeOptions.national_champion_sweden: 'national-championship-sweden',
-                AwardBase.CriteriaTypeOptions.national_champion_taiwan: 'national-championship-taiwan',
-                AwardBase.CriteriaTypeOptions.national_champion_united_kingdom: 'national-championship-united-kingdom',
-                AwardBase.CriteriaTypeOptions.national_champion_united_states: 'national-championship-united-states',
-                AwardBase.CriteriaTypeOptions.national_champion_france: 'national-championship-france',
-                AwardBase.CriteriaTypeOptions.national_champion_chile: 'national-championship-chile',
-                AwardBase.CriteriaTypeOptions.national_champion_germany: 'national-championship-germany',
-                AwardBase.CriteriaTypeOptions.national_champion_greece: 'national-championship-greece'
-            }.get(criteria_type, None)
-            if tag_slug:
-                value = qs.filter(
-                    event__is_casual=False,
-                    finishing_position=1,
-                    event__tags__slug=tag_slug
-                ).count()
 
         value += AwardCredit.objects.filter(
             user=user,
@@ -1924,3 +2789,309 @@ class AwardAssignmentService():
         ).aggregate(total=Coalesce(Sum('amount'), 0))['total'] or 0
 
         return value
+
+    @staticmethod
+    def get_criteria_values(award, user_ids=None):
+        """
+        Set-based counterpart of get_user_criteria_value.
+
+        Evaluates the award's criteria for every user, or only for user_ids,
+        with one grouped query per criterion rather than one per user.
+
+        Returns:
+            Dict of user id to criteria value. Users whose value is 0 may be
+            left out.
+        """
+        criteria_type = award.criteria
+        values = {}
+
+        event_result_mode_filter, event_result_event_mode_filter = \
+            AwardAssignmentService._get_mode_filters(award.mode)
+
+        qs = EventResult.objects.filter(event_result_mode_filter)
+        if user_ids is not None:
+            qs = qs.filter(user_id__in=user_ids)
+
+        if criteria_type in AwardAssignmentService.STATS_ROLLUP_CRITERIA:
+            filters, total = AwardAssignmentService.STATS_ROLLUP_CRITERIA[criteria_type]
+            rollups = UserStatsRollup.objects.filter(
+                AwardAssignmentService._get_rollup_mode_filter(award.mode),
+                **filters
+            )
+            if user_ids is not None:
+                rollups = rollups.filter(user_id__in=user_ids)
+            values = dict(
+                rollups
+                .order_by()
+                .values('user')
+                .annotate(total=AwardAssignmentService._get_total_expression(total))
+                .values_list('user', 'total')
+            )
+        elif criteria_type in AwardAssignmentService.EVENT_RESULT_CRITERIA:
+            values = dict(
+                qs.filter(**AwardAssignmentService.EVENT_RESULT_CRITERIA[criteria_type])
+                .order_by()
+                .values('user')
+                .annotate(total=Count('id'))
+                .values_list('user', 'total')
+            )
+        elif criteria_type == AwardBase.CriteriaTypeOptions.level:
+            values = AwardAssignmentService._get_user_levels(user_ids)
+        elif criteria_type == AwardBase.CriteriaTypeOptions.events_at_group_in_calendar_month:
+            from django.db.models.functions import TruncMonth
+            qualifying_months = (
+                qs
+                .filter(event__playgroups__isnull=False)
+                .annotate(
+                    month=TruncMonth('event__start_date'),
+                    playgroup_id=F('event__playgroups')
+                )
+                .order_by()
+                .values('user', 'month', 'playgroup_id')
+                .annotate(event_count=Count('id'))
+                .filter(event_count__gte=4)
+            )
+            for row in qualifying_months:
+                values[row['user']] = values.get(row['user'], 0) + 1
+        elif criteria_type == AwardBase.CriteriaTypeOptions.tournament_match_wins_with_house:
+            if not getattr(award, 'house', None):
+                return {}
+            house = award.house
+            event_results = (
+                qs
+                .filter(
+                    event__is_casual=False,
+                    event_result_decks__was_played=True
+                )
+                .filter(
+                    models.Q(event_result_decks__deck__house_1=house) |
+                    models.Q(event_result_decks__deck__house_2=house) |
+                    models.Q(event_result_decks__deck__house_3=house)
+                )
+                .order_by()
+                .values('id', 'user', 'num_wins')
+                .distinct()
+            )
+            for er in event_results:
+                values[er['user']] = values.get(er['user'], 0) + (er['num_wins'] or 0)
+        elif criteria_type == AwardBase.CriteriaTypeOptions.sets_with_ten_tournament_match_wins:
+            decks = EventResultDeck.objects.filter(
+                event_result__event__is_casual=False,
+                was_played=True,
+                deck__set__isnull=False
+            ).filter(event_result_event_mode_filter)
+            if user_ids is not None:
+                decks = decks.filter(event_result__user_id__in=user_ids)
+            sets_with_10_wins = (
+                decks
+                .order_by()
+                .values('event_result__user', 'deck__set')
+                .annotate(total_wins=Sum('event_result__num_wins'))
+                .filter(total_wins__gte=10)
+            )
+            for row in sets_with_10_wins:
+                user_id = row['event_result__user']
+                values[user_id] = values.get(user_id, 0) + 1
+        elif criteria_type in AwardAssignmentService.LEADERBOARD_CRITERIA:
+            placements = AwardAssignmentService._get_leaderboard_placements(
+                criteria_type)
+            if user_ids is not None:
+                placements = placements.filter(user_id__in=user_ids)
+            for user_id in placements.values_list('user', flat=True):
+                values[user_id] = values.get(user_id, 0) + 1
+        elif criteria_type in AwardAssignmentService.CHAMPION_TAG_SLUGS:
+            values = dict(
+                qs.filter(
+                    event__is_casual=False,
+                    finishing_position=1,
+                    event__tags__slug=AwardAssignmentService.CHAMPION_TAG_SLUGS[criteria_type]
+                )
+                .order_by()
+                .values('user')
+                .annotate(total=Count('id'))
+                .values_list('user', 'total')
+            )
+
+        credits = AwardCredit.objects.filter(criteria=criteria_type)
+        if user_ids is not None:
+            credits = credits.filter(user_id__in=user_ids)
+        for user_id, amount in (
+            credits.order_by().values('user')
+            .annotate(total=Sum('amount')).values_list('user', 'total')
+        ):
+            values[user_id] = values.get(user_id, 0) + (amount or 0)
+
+        return values
+
+    @staticmethod
+    def _get_total_expression(total):
+        """Aggregate of UserStatsRollup rows for a STATS_ROLLUP_CRITERIA total."""
+        if total == 'matches':
+            return Coalesce(Sum('match_wins'), 0) + Coalesce(Sum('match_losses'), 0)
+        return Coalesce(Sum(total), 0)
+
+    @staticmethod
+    def _get_leaderboard_placements(criteria_type):
+        """PlayerRank rows that count towards a leaderboard placement criteria."""
+        leaderboard_name, is_playgroup, rank_min_max, min_players = \
+            AwardAssignmentService.LEADERBOARD_CRITERIA[criteria_type]
+        placements = PlayerRank.objects.filter(
+            period__is_locked=True,
+            rank__gte=rank_min_max[0],
+            rank__lte=rank_min_max[1],
+            playgroup__isnull=not is_playgroup,
+            leaderboard__name=leaderboard_name
+        )
+        if not is_playgroup:
+            return placements
+
+        player_count_subquery = PlayerRank.objects.filter(
+            playgroup=OuterRef('playgroup'),
+            leaderboard=OuterRef('leaderboard'),
+            period=OuterRef('period'),
+        ).values('playgroup', 'leaderboard', 'period').annotate(
+            cnt=Count('id')
+        ).values('cnt')
+        return placements.exclude(
+            playgroup__name='Premier Tournaments'
+        ).annotate(
+            players_in_period=Subquery(player_count_subquery)
+        ).filter(
+            players_in_period__gte=min_players
+        )
+
+    @staticmethod
+    def _get_user_ids(user_ids=None):
+        users = User.objects.all()
+        if user_ids is not None:
+            users = users.filter(id__in=user_ids)
+        return list(users.values_list('id', flat=True))
+
+    @staticmethod
+    def _get_user_levels(user_ids=None):
+        """Current level of each user with a profile, as PmcProfile.get_level."""
+        rollups = UserStatsRollup.objects.all()
+        profiles = PmcProfile.objects.all()
+        if user_ids is not None:
+            rollups = rollups.filter(user_id__in=user_ids)
+            profiles = profiles.filter(user_id__in=user_ids)
+
+        total_xp = dict(
+            rollups.order_by().values('user')
+            .annotate(total=Sum('xp')).values_list('user', 'total'))
+
+        levels = {}
+        for user_id in profiles.values_list('user_id', flat=True):
+            current_level = LevelBreakpoint.get_for_xp(total_xp.get(user_id, 0))[0]
+            levels[user_id] = current_level.level if current_level else 0
+        return levels
+
+
+AVATARS = reference_data.register(
+    ModelReferenceTable('pmc.avatars', Avatar, key='pmc_id'))
+BACKGROUNDS = reference_data.register(
+    ModelReferenceTable('pmc.backgrounds', Background, key='pmc_id'))
+EVENT_FORMATS = reference_data.register(
+    ModelReferenceTable('pmc.event_formats', EventFormat))
+LEVEL_BREAKPOINTS = reference_data.register(
+    ReferenceTable('pmc.level_breakpoints', [LevelBreakpoint], LevelBreakpoint.build_table))
+VENUE_INDEX = reference_data.register(ReferenceTable(
+    'pmc.venue_index',
+    [Venue, PlaygroupVenue, Playgroup, PlaygroupType],
+    PlaygroupFinderService.build_index))
+
+
+@receiver(post_save, sender=EventResult)
+@receiver(post_delete, sender=EventResult)
+def rebuild_stats_rollup_for_event_result(sender, instance, **kwargs):
+    UserStatsRollup.rebuild([instance.user_id])
+
+
+@receiver(post_save, sender=Event)
+def rebuild_stats_rollup_for_event(sender, instance, created, **kwargs):
+    if not created:
+        UserStatsRollup.rebuild(
+            EventResult.objects.filter(event=instance).values_list('user_id', flat=True))
+
+
+@receiver(pre_delete, sender=EventFormat)
+def collect_stats_rollup_users_for_format(sender, instance, **kwargs):
+    # Events are moved to no format after the rollup rows are deleted
+    instance._stats_rollup_user_ids = list(
+        UserStatsRollup.objects.filter(format=instance).values_list('user_id', flat=True))
+
+
+@receiver(post_delete, sender=EventFormat)
+def rebuild_stats_rollup_for_format(sender, instance, **kwargs):
+    UserStatsRollup.rebuild(getattr(instance, '_stats_rollup_user_ids', []))
+
+
+def _mark_event_users_dirty(event_id):
+    AwardAssignmentService.mark_users_dirty(
+        EventResult.objects.filter(event_id=event_id).values_list('user_id', flat=True),
+        'pmc.event')
+
+
+@receiver(post_save, sender=EventResult)
+@receiver(post_delete, sender=EventResult)
+def mark_awards_dirty_for_event_result(sender, instance, **kwargs):
+    AwardAssignmentService.mark_users_dirty([instance.user_id], 'pmc.eventresult')
+
+
+@receiver(post_save, sender=Event)
+def mark_awards_dirty_for_event(sender, instance, created, **kwargs):
+    if not created:
+        _mark_event_users_dirty(instance.pk)
+
+
+@receiver(post_save, sender=PlaygroupEvent)
+@receiver(post_delete, sender=PlaygroupEvent)
+def mark_awards_dirty_for_playgroup_event(sender, instance, **kwargs):
+    _mark_event_users_dirty(instance.event_id)
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+def mark_awards_dirty_for_event_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _mark_event_users_dirty(instance.pk)
+    elif pk_set:
+        for event_id in pk_set:
+            _mark_event_users_dirty(event_id)
+
+
+@receiver(post_save, sender=EventResultDeck)
+@receiver(post_delete, sender=EventResultDeck)
+def mark_awards_dirty_for_event_result_deck(sender, instance, **kwargs):
+    AwardAssignmentService.mark_users_dirty(
+        EventResult.objects.filter(pk=instance.event_result_id).values_list('user_id', flat=True),
+        'pmc.eventresultdeck')
+
+
+@receiver(post_save, sender=Deck)
+def mark_awards_dirty_for_deck(sender, instance, created, **kwargs):
+    if not created:
+        AwardAssignmentService.mark_users_dirty(
+            EventResult.objects.filter(event_result_decks__deck=instance).values_list(
+                'user_id', flat=True),
+            'decks.deck')
+
+
+@receiver(post_save, sender=LeaderboardSeasonPeriod)
+def mark_awards_dirty_for_period(sender, instance, **kwargs):
+    AwardAssignmentService.mark_users_dirty(
+        PlayerRank.objects.filter(period=instance).values_list('user_id', flat=True),
+        'pmc.playerrank')
+
+
+@receiver(post_save, sender=LevelBreakpoint)
+@receiver(post_delete, sender=LevelBreakpoint)
+def mark_awards_dirty_for_level_breakpoint(sender, instance, **kwargs):
+    AwardAssignmentService.mark_users_dirty(None, 'pmc.levelbreakpoint')
+
+
+@receiver(post_save, sender=AwardCredit)
+@receiver(post_delete, sender=AwardCredit)
+def mark_awards_dirty_for_award_credit(sender, instance, **kwargs):
+    AwardAssignmentService.mark_users_dirty([instance.user_id], 'pmc.awardcredit')
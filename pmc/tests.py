@@ -1,17 +1,44 @@
-from django.test import TestCase
-from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.contrib.auth.models import AnonymousUser, User
 from datetime import date, timedelta
 from .models import (
     Event, EventResult, RankingPoints, Leaderboard, LeaderboardSeason,
     LeaderboardSeasonPeriod, PlayerRank, Playgroup, PlaygroupEvent,
     RankingPointsMapVersion, RankingPointsMap, RankingPointsService,
     EventFormat, AwardBase, Achievement, Trophy, AwardAssignmentService,
-    EventResultDeck, AwardCredit, LevelBreakpoint, AchievementTier
+    EventResultDeck, AwardCredit, LevelBreakpoint, AchievementTier,
+    UserTrophy, UserAchievementTier, DirtyAwardUser, EventTag, BackgroundJob,
+    LeaderboardLog, UserStatsRollup, PmcProfile, PlaygroupMember, Avatar,
+    Background, EVENT_FORMATS, LEVEL_BREAKPOINTS, PlaygroupFinderService, PlaygroupVenue,
+    Venue, VENUE_INDEX
 )
+from django.core.management import call_command
+from django.utils import timezone
+from io import StringIO
+from unittest import mock
+import json
+import os
+from .geo import KDTree, encode_geohash, get_geohashes_for_bbox, haversine_km
+from .middleware import get_request_playgroup
+from .views import is_pg_member, is_pg_staff
+from .jobs import claim_next_job, enqueue_job, requeue_stale_jobs, run_job, run_next_job
+from django.db import DatabaseError, connection, transaction
+from django.core.cache import cache, caches
+from django.core.exceptions import PermissionDenied
+from django.test.utils import CaptureQueriesContext
+from common.reference_data import VERSION_CHECK_INTERVAL, reference_data
 from decks.models import House, Set, Deck
+import time
 import uuid
 
 
+# Page renders need storages that work without a collected static manifest
+use_test_storages = override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
 class TopNPerMonthRankingTest(TestCase):
     """
     Tests for the top_n_per_month ranking calculation.
@@ -308,6 +335,103 @@ class TopNPerMonthRankingTest(TestCase):
         self.assertEqual(playgroup_rank.num_results, 4)
 
 
+    def test_rankings_are_computed_per_playgroup_in_one_pass(self):
+        """
+        Playgroup ranks are partitioned in the database, so extra playgroups
+        add no queries and only playgroups with points get rows.
+        """
+        other_playgroup = Playgroup.objects.create(name='Other', slug='other')
+        self.create_event_and_result(self.user_a, 1, date(2025, 1, 5), 100)
+        self.create_event_and_result(self.user_b, 1, date(2025, 1, 6), 100)
+        _, result = self.create_event_and_result(self.user_b, 2, date(2025, 1, 7), 80)
+        PlaygroupEvent.objects.create(playgroup=other_playgroup, event=result.event)
+        period = self.leaderboard.get_period_for_date(date(2025, 1, 15))
+        RankingPointsService.assign_points_for_leaderboard(self.leaderboard, period)
+
+        with CaptureQueriesContext(connection) as queries:
+            RankingPointsService.assign_points_for_leaderboard(self.leaderboard, period)
+        for slug in range(5):
+            Playgroup.objects.create(name=f'Idle {slug}', slug=f'idle-{slug}')
+        with self.assertNumQueries(len(queries)):
+            RankingPointsService.assign_points_for_leaderboard(self.leaderboard, period)
+
+        self.assertEqual(
+            sorted(PlayerRank.objects.filter(period=period).values_list(
+                'playgroup__slug', 'user__username', 'rank', 'total_points'), key=str),
+            sorted([
+                (None, 'user_b', 1, 180), (None, 'user_a', 2, 100),
+                ('test-playgroup', 'user_b', 1, 180), ('test-playgroup', 'user_a', 2, 100),
+                ('other', 'user_b', 1, 80),
+            ], key=str))
+
+
+    def test_repeated_assignment_only_writes_changed_rows(self):
+        self.create_event_and_result(self.user_a, 1, date(2025, 1, 5), 100)
+        _, result = self.create_event_and_result(self.user_b, 2, date(2025, 1, 6), 80)
+        period = self.leaderboard.get_period_for_date(date(2025, 1, 15))
+
+        changes = RankingPointsService.assign_points_for_leaderboard(self.leaderboard, period)
+        self.assertEqual(changes, {'created': 4, 'updated': 0, 'deleted': 0, 'unchanged': 0})
+        ids = set(PlayerRank.objects.values_list('id', flat=True))
+
+        changes = RankingPointsService.assign_points_for_leaderboard(self.leaderboard, period)
+        self.assertEqual(changes, {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 4})
+
+        result.ranking_points.update(points=120)
+        changes = RankingPointsService.assign_points_for_leaderboard(self.leaderboard, period)
+        self.assertEqual(changes, {'created': 0, 'updated': 4, 'deleted': 0, 'unchanged': 0})
+        self.assertEqual(set(PlayerRank.objects.values_list('id', flat=True)), ids)
+        self.assertEqual(
+            PlayerRank.objects.get(user=self.user_b, playgroup=None).rank, 1)
+
+        result.delete()
+        changes = RankingPointsService.assign_points_for_leaderboard(self.leaderboard, period)
+        self.assertEqual(changes, {'created': 0, 'updated': 2, 'deleted': 2, 'unchanged': 0})
+
+
+    def test_refresh_all_leaderboards_matches_single_refreshes(self):
+        season_board = Leaderboard.objects.create(
+            name='Season', sort_order=2,
+            period_frequency=LeaderboardSeasonPeriod.FrequencyOptions.SEASON)
+        all_time_board = Leaderboard.objects.create(
+            name='All Time', sort_order=3,
+            period_frequency=LeaderboardSeasonPeriod.FrequencyOptions.ALL_TIME)
+        LeaderboardSeasonPeriod.objects.create(
+            name='All Time', start_date=date(2020, 1, 1),
+            season=LeaderboardSeason.objects.create(name='All Time'),
+            frequency=LeaderboardSeasonPeriod.FrequencyOptions.ALL_TIME)
+        today = date.today()
+        for days_ago, user, position, points in [
+            (0, self.user_a, 1, 100), (1, self.user_b, 1, 100), (3, self.user_a, 2, 80),
+            (9, self.user_b, 3, 60), (12, self.user_a, 1, 100), (45, self.user_b, 1, 100),
+            (400, self.user_a, 2, 80),
+        ]:
+            self.create_event_and_result(user, position, today - timedelta(days=days_ago), points)
+        excluded, _ = self.create_event_and_result(self.user_b, 1, today, 100)
+        excluded.is_excluded_from_global_rankings = True
+        excluded.save()
+
+        def snapshot():
+            return sorted(PlayerRank.objects.values_list(
+                'leaderboard', 'period', 'user', 'playgroup', 'rank', 'total_points',
+                'num_results', 'average_points'), key=str)
+
+        for leaderboard in [self.leaderboard, season_board, all_time_board]:
+            RankingPointsService.refresh_leaderboard(leaderboard)
+        expected = snapshot()
+        PlayerRank.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            changes = RankingPointsService.refresh_all_leaderboards()
+        self.assertEqual(snapshot(), expected)
+        self.assertEqual(changes['created'], len(expected))
+        self.assertEqual(
+            len([q for q in queries if 'FROM "pmc_rankingpoints"' in q['sql']]), 1)
+
+        self.assertEqual(
+            RankingPointsService.refresh_all_leaderboards()['unchanged'], len(expected))
+
+
 class DummyAward:
     """Helper class to test criteria without needing actual Award objects."""
     def __init__(self, criteria, mode=AwardBase.ModeOptions.ANY, house=None):
@@ -320,6 +444,9 @@ class AwardCriteriaTestBase(TestCase):
     """Base class with common setup for award criteria tests."""
 
     def setUp(self):
+        # Level breakpoints are cached across tests
+        cache.clear()
+        reference_data.reset()
         self.user = User.objects.create_user(
             username='testuser',
             email='test@example.com'
@@ -372,7 +499,11 @@ class AwardCriteriaTestBase(TestCase):
     def get_criteria_value(self, criteria_type, mode=AwardBase.ModeOptions.ANY, house=None):
         """Helper to get criteria value for the test user."""
         award = DummyAward(criteria_type, mode, house)
-        return AwardAssignmentService.get_user_criteria_value(self.user, award)
+        value = AwardAssignmentService.get_user_criteria_value(self.user, award)
+        # The set-based engine must agree with the per-user path
+        self.assertEqual(
+            AwardAssignmentService.get_criteria_values(award).get(self.user.id, 0), value)
+        return value
 
 
 class BasicMatchAndEventCountingTests(AwardCriteriaTestBase):
@@ -1104,6 +1235,841 @@ class AwardCreditTests(AwardCriteriaTestBase):
         self.assertEqual(value, 8)
 
 
+class AwardRefreshTests(AwardCriteriaTestBase):
+    """Tests for the set-based trophy and achievement refresh."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_user = User.objects.create_user(
+            username='otheruser', email='other@example.com')
+        self.idle_user = User.objects.create_user(
+            username='idleuser', email='idle@example.com')
+
+        for i, (fmt, is_casual) in enumerate([
+            ('Archon', False), ('Sealed', False), ('Archon', True), ('Alliance', False),
+        ]):
+            event = self.create_event(
+                date(2025, 1, 1) + timedelta(days=7 * i), format_name=fmt,
+                is_casual=is_casual, playgroup=self.playgroup)
+            self.create_result(event, finishing_position=1, num_wins=4, num_losses=1)
+            self.create_result(event, user=self.other_user, finishing_position=2,
+                               num_wins=2, num_losses=3)
+        AwardCredit.objects.create(
+            user=self.idle_user, criteria=AwardBase.CriteriaTypeOptions.events, amount=2)
+
+        self.trophy = Trophy.objects.create(
+            pmc_id='T01', name='Match Wins',
+            criteria=AwardBase.CriteriaTypeOptions.tournament_match_wins,
+            criteria_value=4, mode=AwardBase.ModeOptions.ANY)
+        self.manual_trophy = Trophy.objects.create(
+            pmc_id='T02', name='Manual',
+            criteria=AwardBase.CriteriaTypeOptions.manually_awarded)
+        self.achievement = Achievement.objects.create(
+            pmc_id='A01', name='Events',
+            criteria=AwardBase.CriteriaTypeOptions.events,
+            mode=AwardBase.ModeOptions.ANY)
+        self.bronze = AchievementTier.objects.create(
+            achievement=self.achievement, tier=AchievementTier.TierOptions.BRONZE,
+            criteria_value=2)
+        self.silver = AchievementTier.objects.create(
+            achievement=self.achievement, tier=AchievementTier.TierOptions.SILVER,
+            criteria_value=4)
+
+    def test_criteria_values_match_per_user_path_for_every_user(self):
+        users = [self.user, self.other_user, self.idle_user]
+        for criteria_type in AwardBase.CriteriaTypeOptions.values:
+            for mode in AwardBase.ModeOptions.values:
+                award = DummyAward(criteria_type, mode)
+                values = AwardAssignmentService.get_criteria_values(award)
+                for user in users:
+                    self.assertEqual(
+                        values.get(user.id, 0),
+                        AwardAssignmentService.get_user_criteria_value(user, award),
+                        f'criteria {criteria_type}, mode {mode}, user {user}')
+
+    def test_refresh_trophies_creates_expected_rows(self):
+        AwardAssignmentService.refresh_all_user_trophies()
+        self.assertEqual(
+            dict(UserTrophy.objects.values_list('user__username', 'amount')),
+            {'testuser': 3, 'otheruser': 1})
+
+    def test_refresh_trophies_only_writes_changes(self):
+        AwardAssignmentService.refresh_all_user_trophies()
+        kept = UserTrophy.objects.get(user=self.user)
+        UserTrophy.objects.filter(user=self.other_user).update(amount=7)
+        UserTrophy.objects.create(user=self.idle_user, trophy=self.trophy, amount=1)
+        manual = UserTrophy.objects.create(
+            user=self.idle_user, trophy=self.manual_trophy, amount=1)
+
+        changes = AwardAssignmentService.refresh_all_user_trophies()
+
+        self.assertEqual(changes, {'created': 0, 'updated': 1, 'deleted': 1})
+        self.assertEqual(UserTrophy.objects.get(user=self.user).pk, kept.pk)
+        self.assertEqual(UserTrophy.objects.get(user=self.other_user).amount, 1)
+        self.assertTrue(UserTrophy.objects.filter(pk=manual.pk).exists())
+
+    def test_refresh_achievements_diffs_tiers(self):
+        UserAchievementTier.objects.create(user=self.idle_user, achievement_tier=self.silver)
+
+        changes = AwardAssignmentService.refresh_user_achievements()
+
+        self.assertEqual(changes, {'created': 5, 'updated': 0, 'deleted': 1})
+        self.assertEqual(
+            set(UserAchievementTier.objects.values_list('user__username', 'achievement_tier')),
+            {('testuser', self.bronze.id), ('testuser', self.silver.id),
+             ('otheruser', self.bronze.id), ('otheruser', self.silver.id),
+             ('idleuser', self.bronze.id)})
+
+    def test_refresh_queries_do_not_scale_with_users(self):
+        with CaptureQueriesContext(connection) as baseline:
+            AwardAssignmentService.refresh_user_achievements()
+        UserAchievementTier.objects.all().delete()
+        for i in range(10):
+            User.objects.create_user(username=f'extra{i}', email=f'extra{i}@example.com')
+        with CaptureQueriesContext(connection) as queries:
+            AwardAssignmentService.refresh_user_achievements()
+        self.assertEqual(len(queries), len(baseline))
+
+
+class AwardQueueTests(AwardCriteriaTestBase):
+    """Tests for incremental award re-evaluation through the dirty user queue."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_user = User.objects.create_user(
+            username='otheruser', email='other@example.com')
+        self.trophy = Trophy.objects.create(
+            pmc_id='T01', name='Match Wins',
+            criteria=AwardBase.CriteriaTypeOptions.tournament_match_wins,
+            criteria_value=3, mode=AwardBase.ModeOptions.ANY)
+        self.leaderboard_trophy = Trophy.objects.create(
+            pmc_id='T02', name='Monthly Winner',
+            criteria=AwardBase.CriteriaTypeOptions.global_leaderboard_monthly_first_place,
+            mode=AwardBase.ModeOptions.ANY)
+        DirtyAwardUser.objects.all().delete()
+
+    def test_event_result_queues_its_user(self):
+        event = self.create_event(date(2025, 1, 1))
+        self.create_result(event, num_wins=3)
+        self.assertEqual(
+            set(DirtyAwardUser.objects.values_list('user', 'source')),
+            {(self.user.id, 'pmc.eventresult')})
+
+    def test_event_changes_queue_its_players(self):
+        event = self.create_event(date(2025, 1, 1))
+        self.create_result(event)
+        self.create_result(event, user=self.other_user)
+        DirtyAwardUser.objects.all().delete()
+
+        event.tags.add(EventTag.objects.create(name='Store Championship', slug='store-championship'))
+        self.assertEqual(
+            set(DirtyAwardUser.objects.values_list('user', 'source')),
+            {(self.user.id, 'pmc.event'), (self.other_user.id, 'pmc.event')})
+
+    def test_process_only_touches_queued_users(self):
+        event = self.create_event(date(2025, 1, 1))
+        self.create_result(event, num_wins=6)
+        # A stale row for a user that was not queued stays as it is
+        UserTrophy.objects.create(user=self.other_user, trophy=self.trophy, amount=5)
+
+        stats = AwardAssignmentService.process_dirty_users()
+
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(UserTrophy.objects.get(user=self.user, trophy=self.trophy).amount, 2)
+        self.assertEqual(UserTrophy.objects.get(user=self.other_user).amount, 5)
+        self.assertFalse(DirtyAwardUser.objects.exists())
+
+    def test_process_skips_awards_with_unrelated_criteria(self):
+        AwardAssignmentService.mark_users_dirty([self.user.id], 'pmc.playerrank')
+        with CaptureQueriesContext(connection) as queries:
+            AwardAssignmentService.process_dirty_users()
+        self.assertFalse(any(
+            'pmc_eventresult' in query['sql'] for query in queries.captured_queries))
+
+    def test_level_breakpoints_queue_every_user(self):
+        LevelBreakpoint.objects.create(level=1, required_xp=0)
+        entry = DirtyAwardUser.objects.get()
+        self.assertIsNone(entry.user)
+
+        Trophy.objects.create(
+            pmc_id='T03', name='Level', criteria=AwardBase.CriteriaTypeOptions.level,
+            mode=AwardBase.ModeOptions.ANY)
+        AwardAssignmentService.process_dirty_users()
+        self.assertEqual(
+            UserTrophy.objects.filter(trophy__pmc_id='T03').count(), User.objects.count())
+
+    def test_command_drains_queue(self):
+        event = self.create_event(date(2025, 1, 1))
+        self.create_result(event, num_wins=3)
+        call_command('process_award_queue', batch_size=1, stdout=StringIO())
+        self.assertFalse(DirtyAwardUser.objects.exists())
+        self.assertTrue(UserTrophy.objects.filter(user=self.user, trophy=self.trophy).exists())
+
+    def test_job_worker_drains_queue(self):
+        event = self.create_event(date(2025, 1, 1))
+        self.create_result(event, num_wins=3)
+        call_command('run_jobs', award_batch_size=1, stdout=StringIO())
+        self.assertFalse(DirtyAwardUser.objects.exists())
+        self.assertTrue(UserTrophy.objects.filter(user=self.user, trophy=self.trophy).exists())
+
+    @use_test_storages
+    def test_uploaded_results_queue_their_users(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        PlaygroupMember.objects.create(playgroup=self.playgroup, user=self.user, is_staff=True)
+        self.client.force_login(self.user)
+        results_file = SimpleUploadedFile(
+            'results.csv',
+            b'user,finishing_position,num_wins,num_losses\n'
+            b'testuser,1,3,0\n'
+            b'otheruser,2,2,1\n')
+
+        response = self.client.post('/pmc/pg/test-playgroup/events/new/', {
+            'name': 'Uploaded Event',
+            'start_date': '2025-01-01',
+            'is_casual': 'False',
+            'is_digital': 'False',
+            'player_count': 2,
+            'results_file': results_file,
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(EventResult.objects.filter(event__name='Uploaded Event').count(), 2)
+        self.assertEqual(
+            set(DirtyAwardUser.objects.values_list('user', 'source')),
+            {(self.user.id, 'pmc.eventresult'), (self.other_user.id, 'pmc.eventresult')})
+
+
+class AwardCriteriaReportTests(AwardCriteriaTestBase):
+    """Tests for the award_criteria_report dry-run command."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_user = User.objects.create_user(
+            username='otheruser', email='other@example.com')
+        event = self.create_event(date(2025, 1, 1))
+        self.create_result(event, num_wins=4)
+        self.trophy = Trophy.objects.create(
+            pmc_id='T01', name='Match Wins',
+            criteria=AwardBase.CriteriaTypeOptions.tournament_match_wins,
+            criteria_value=2, mode=AwardBase.ModeOptions.ANY)
+        UserTrophy.objects.create(user=self.other_user, trophy=self.trophy, amount=1)
+
+    def _report(self, *args):
+        out = StringIO()
+        call_command('award_criteria_report', '--format', 'json', *args, stdout=out)
+        return {row['criteria']: row for row in json.loads(out.getvalue())}
+
+    def test_reports_pending_changes_without_saving(self):
+        row = self._report()[AwardBase.CriteriaTypeOptions.tournament_match_wins]
+        self.assertEqual(row['awards'], 1)
+        self.assertEqual((row['created'], row['updated'], row['deleted']), (1, 0, 1))
+        self.assertGreater(row['queries'], 0)
+        self.assertIsNone(row['mismatched_users'])
+        self.assertEqual(
+            list(UserTrophy.objects.values_list('user__username', 'amount')),
+            [('otheruser', 1)])
+
+    def test_compare_engines(self):
+        set_row = self._report('--compare')[AwardBase.CriteriaTypeOptions.tournament_match_wins]
+        per_user_row = self._report(
+            '--engine', 'per-user')[AwardBase.CriteriaTypeOptions.tournament_match_wins]
+        self.assertEqual(set_row['mismatched_users'], 0)
+        self.assertLess(set_row['queries'], per_user_row['queries'])
+
+        out = StringIO()
+        call_command('award_criteria_report', '--compare', stdout=out)
+        self.assertIn('0 mismatched user values', out.getvalue())
+
+
+class UserStatsRollupTests(AwardCriteriaTestBase):
+    """Tests for the per-user stats rollup kept in step with event results."""
+
+    ROLLUP_FIELDS = [
+        'is_digital', 'is_casual', 'format', 'events', 'match_wins', 'match_losses',
+        'match_ties', 'events_won', 'wins_3_to_5', 'wins_6_plus', 'seconds_6_plus',
+        'thirds_6_to_10', 'top_four_11_plus', 'top_eight_11_plus', 'xp',
+    ]
+
+    def get_rollups(self):
+        return sorted(
+            UserStatsRollup.objects.filter(user=self.user).values_list(*self.ROLLUP_FIELDS),
+            key=str)
+
+    def test_result_changes_update_the_rollup(self):
+        event = self.create_event(date(2025, 1, 1), player_count=4, format_name='Sealed')
+        result = self.create_result(event, num_wins=3, num_losses=1)
+        rollup = UserStatsRollup.objects.get(user=self.user)
+        self.assertEqual(rollup.format.name, 'Sealed')
+        self.assertEqual((rollup.events, rollup.match_wins, rollup.wins_3_to_5, rollup.xp),
+                         (1, 3, 1, 60))
+
+        result.finishing_position = 2
+        result.save()
+        rollup = UserStatsRollup.objects.get(user=self.user)
+        self.assertEqual((rollup.events_won, rollup.wins_3_to_5), (0, 0))
+
+        result.delete()
+        self.assertFalse(UserStatsRollup.objects.filter(user=self.user).exists())
+
+    def test_event_changes_update_the_rollup(self):
+        event = self.create_event(date(2025, 1, 1), player_count=12)
+        self.create_result(event, finishing_position=4)
+        self.assertEqual(UserStatsRollup.objects.get(user=self.user).top_four_11_plus, 1)
+
+        event.is_digital = True
+        event.player_count = 8
+        event.save()
+        rollup = UserStatsRollup.objects.get(user=self.user)
+        self.assertTrue(rollup.is_digital)
+        self.assertEqual(rollup.top_four_11_plus, 0)
+
+    def test_deleting_a_format_keeps_the_totals(self):
+        event = self.create_event(date(2025, 1, 1), format_name='Archon')
+        self.create_result(event, num_wins=2)
+        EventFormat.objects.get(name='Archon').delete()
+        rollup = UserStatsRollup.objects.get(user=self.user)
+        self.assertIsNone(rollup.format)
+        self.assertEqual(rollup.match_wins, 2)
+
+    def test_rebuild_matches_incremental_updates(self):
+        self.create_result(self.create_event(date(2025, 1, 1), player_count=6))
+        self.create_result(self.create_event(
+            date(2025, 1, 2), player_count=11, format_name='Archon'), finishing_position=6)
+        self.create_result(self.create_event(
+            date(2025, 1, 3), is_casual=True, is_digital=True), finishing_position=None)
+        incremental = self.get_rollups()
+
+        UserStatsRollup.objects.all().delete()
+        call_command('rebuild_stats_rollup', stdout=StringIO())
+        self.assertEqual(self.get_rollups(), incremental)
+
+    def test_profile_stats_match_results(self):
+        first = self.create_result(self.create_event(date(2025, 1, 1)), num_wins=4)
+        second = self.create_result(self.create_event(
+            date(2025, 1, 2), is_digital=True), finishing_position=3, num_wins=1)
+        excluded = self.create_event(date(2025, 1, 3))
+        excluded.is_excluded_from_xp = True
+        excluded.save()
+        self.create_result(excluded, num_wins=2)
+
+        profile = self.user.pmc_profile
+        self.assertEqual(profile.get_total_xp(), first.get_xp() + second.get_xp())
+        self.assertEqual(profile.get_num_match_wins(), 7)
+        self.assertEqual(profile.get_num_events_won(), profile.get_events_won().count())
+
+
+class XpExpressionTests(AwardCriteriaTestBase):
+    """Tests for computing XP and level progress in the database."""
+
+    def test_expression_matches_get_xp(self):
+        cases = [
+            {},
+            {'is_digital': True},
+            {'is_casual': True},
+            {'is_casual': True, 'is_digital': True},
+            {'player_count': 1},
+        ]
+        for index, event_kwargs in enumerate(cases):
+            event = self.create_event(date(2025, 1, 1) + timedelta(days=index), **event_kwargs)
+            self.create_result(event, num_wins=index, num_losses=1)
+        long_event = self.create_event(date(2025, 2, 1))
+        self.create_result(long_event, num_wins=9, num_losses=4)
+        excluded = self.create_event(date(2025, 2, 2))
+        excluded.is_excluded_from_xp = True
+        excluded.save()
+        self.create_result(excluded)
+
+        results = EventResult.objects.annotate(xp=EventResult.get_xp_expression())
+        self.assertEqual(
+            {result.id: result.xp for result in results},
+            {result.id: result.get_xp() for result in EventResult.objects.all()})
+        self.assertIn(100, {result.xp for result in results})
+
+    def test_level_up_info_query_count_is_constant(self):
+        LevelBreakpoint.objects.create(level=1, required_xp=0)
+        LevelBreakpoint.objects.create(level=2, required_xp=200)
+        for day in range(5):
+            self.create_result(self.create_event(date(2025, 1, 1) + timedelta(days=day)))
+
+        profile = User.objects.get(pk=self.user.pk).pmc_profile
+        LEVEL_BREAKPOINTS.get_version()
+        # Total XP, plus the breakpoint table on a cold cache
+        with self.assertNumQueries(2):
+            info = profile.level_up_info
+            profile.get_percent_level_up()
+            profile.get_level_increment()
+        self.assertEqual(info['total_xp'], 5 * 65)
+        self.assertEqual(info['current_level'].level, 2)
+        self.assertIsNone(info['next_level'])
+
+
+@use_test_storages
+class XpLeaderboardTests(AwardCriteriaTestBase):
+    """Tests for ranking users by their precomputed total XP."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_user = User.objects.create_user(
+            username='otheruser', email='other@example.com')
+        self.third_user = User.objects.create_user(
+            username='thirduser', email='third@example.com')
+        LevelBreakpoint.objects.create(level=1, required_xp=0)
+        LevelBreakpoint.objects.create(level=2, required_xp=100)
+
+    def test_total_xp_follows_results(self):
+        event = self.create_event(date(2025, 1, 1))
+        result = self.create_result(event)
+        self.assertEqual(User.objects.get(pk=self.user.pk).pmc_profile.total_xp, result.get_xp())
+
+        result.delete()
+        self.assertEqual(User.objects.get(pk=self.user.pk).pmc_profile.total_xp, 0)
+
+    def test_rankings_share_tied_ranks(self):
+        event = self.create_event(date(2025, 1, 1))
+        self.create_result(event, num_wins=4)
+        self.create_result(event, user=self.other_user, num_wins=1)
+        self.create_result(event, user=self.third_user, num_wins=1)
+
+        rankings = PmcProfile.get_xp_rankings()
+        self.assertEqual(
+            [(profile.user.username, profile.rank) for profile in rankings],
+            [('testuser', 1), ('otheruser', 2), ('thirduser', 2)])
+
+    def test_playgroup_rankings_only_include_visible_members(self):
+        event = self.create_event(date(2025, 1, 1))
+        for user in [self.user, self.other_user, self.third_user]:
+            self.create_result(event, user=user)
+        PlaygroupMember.objects.create(playgroup=self.playgroup, user=self.user)
+        PlaygroupMember.objects.create(
+            playgroup=self.playgroup, user=self.other_user, is_hidden=True)
+
+        rankings = PmcProfile.get_xp_rankings(self.playgroup)
+        self.assertEqual([profile.user_id for profile in rankings], [self.user.id])
+
+    def test_level_lookup_uses_cached_breakpoints(self):
+        LevelBreakpoint.get_table()
+        with self.assertNumQueries(0):
+            self.assertEqual(LevelBreakpoint.get_for_xp(99)[0].level, 1)
+            self.assertEqual(LevelBreakpoint.get_for_xp(99)[1].level, 2)
+            current_level, next_level = LevelBreakpoint.get_for_xp(100)
+        self.assertEqual((current_level.level, next_level), (2, None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LevelBreakpoint.objects.create(level=3, required_xp=150)
+        self.assertEqual(LevelBreakpoint.get_for_xp(100)[1].level, 3)
+
+    def test_profile_saves_keep_total_xp(self):
+        self.create_result(self.create_event(date(2025, 1, 1)))
+        self.user.save()
+        self.assertGreater(User.objects.get(pk=self.user.pk).pmc_profile.total_xp, 0)
+
+    def test_view_lists_ranked_players(self):
+        self.create_result(self.create_event(date(2025, 1, 1)), num_wins=4)
+        self.client.force_login(self.user)
+        response = self.client.get('/pmc/leaderboard/xp/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(profile.user_id, profile.level.level)
+             for profile in response.context['rankings_page']],
+            [(self.user.id, 1)])
+
+
+class ReferenceDataTests(TestCase):
+    """Tests for the in-memory reference data tables."""
+
+    def setUp(self):
+        # Loaded tables outlive each test, so start every test from fresh ones
+        reference_data.reset()
+        self.user = User.objects.create_user(username='player', email='player@example.com')
+        self.avatar = Avatar.objects.create(
+            pmc_id='001', src='https://example.com/001.png', category_label='Default',
+            name='Default', banner_bg_color='000000', banner_stroke_color='ffffff')
+        self.background = Background.objects.create(
+            pmc_id='001', src='https://example.com/001.png', category_label='Default',
+            name='Default')
+
+    def test_default_avatar_and_background_are_read_from_memory(self):
+        profile = User.objects.get(pk=self.user.pk).pmc_profile
+        reference_data.warm_up()
+        with self.assertNumQueries(0):
+            self.assertEqual(profile.get_avatar(), self.avatar)
+            self.assertEqual(profile.get_background(), self.background)
+
+    def test_saving_a_row_reloads_the_table(self):
+        profile = User.objects.get(pk=self.user.pk).pmc_profile
+        self.assertEqual(profile.get_avatar().name, 'Default')
+        self.avatar.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.avatar.save()
+        self.assertEqual(profile.get_avatar().name, 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.avatar.delete()
+        self.assertIsNone(profile.get_avatar())
+
+    def test_uncommitted_change_is_not_loaded(self):
+        self.assertEqual(EVENT_FORMATS.all(), [])
+        try:
+            with transaction.atomic():
+                EventFormat.objects.create(name='Archon')
+                # Still the committed rows until the change commits
+                self.assertEqual(EVENT_FORMATS.all(), [])
+                raise DatabaseError('rolled back')
+        except DatabaseError:
+            pass
+        self.assertEqual(EVENT_FORMATS.all(), [])
+
+    def test_new_version_stamp_reloads_the_table(self):
+        self.assertEqual(len(EVENT_FORMATS.all()), 0)
+        # bulk_create sends no signals, like a change made in another process
+        EventFormat.objects.bulk_create([EventFormat(name='Archon')])
+        self.assertEqual(len(EVENT_FORMATS.all()), 0)
+        caches['shared'].set(EVENT_FORMATS.version_key, 'stamp-from-another-process')
+        self.assertEqual(len(EVENT_FORMATS.all()), 0)
+        later = time.monotonic() + VERSION_CHECK_INTERVAL
+        with mock.patch('common.reference_data.time.monotonic', return_value=later):
+            self.assertEqual([f.name for f in EVENT_FORMATS.all()], ['Archon'])
+
+    def test_committed_change_writes_a_shared_stamp(self):
+        version = EVENT_FORMATS.get_version()
+        self.assertEqual(caches['shared'].get(EVENT_FORMATS.version_key), version)
+        with self.captureOnCommitCallbacks(execute=True):
+            EventFormat.objects.create(name='Archon')
+        self.assertNotEqual(EVENT_FORMATS.get_version(), version)
+        self.assertEqual(
+            caches['shared'].get(EVENT_FORMATS.version_key), EVENT_FORMATS.get_version())
+        self.assertEqual([f.name for f in EVENT_FORMATS.all()], ['Archon'])
+
+    def test_deck_hydration_reads_sets_and_houses_from_memory(self):
+        deck_set = Set.objects.create(id=341, name='Call of the Archons', src='https://example.com/s.png')
+        houses = [
+            House.objects.create(mv_id=f'house-{i}', name=f'House {i}', src='https://example.com/h.png')
+            for i in range(3)
+        ]
+        deck = Deck(id=uuid.uuid4())
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'data': {
+            'name': 'Test Deck',
+            'expansion': 341,
+            '_links': {'houses': [house.mv_id for house in houses]},
+        }}
+        reference_data.warm_up()
+        with mock.patch('decks.models.get', return_value=response), self.assertNumQueries(0):
+            deck.hydrate_from_master_vault(save=False)
+        self.assertEqual(deck.set, deck_set)
+        self.assertEqual([deck.house_1, deck.house_2, deck.house_3], houses)
+
+        response.json.return_value['data']['expansion'] = 999
+        with mock.patch('decks.models.get', return_value=response):
+            with self.assertRaises(Set.DoesNotExist):
+                deck.hydrate_from_master_vault(save=False)
+
+
+@use_test_storages
+class RequestPlaygroupTests(TestCase):
+    """Tests for resolving the request's playgroup and membership once."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='member', email='member@example.com')
+        self.other_user = User.objects.create_user(username='visitor', email='visitor@example.com')
+        self.playgroup = Playgroup.objects.create(name='Test Playgroup', slug='test-playgroup')
+        self.member = PlaygroupMember.objects.create(
+            playgroup=self.playgroup, user=self.user, is_staff=True)
+
+    def get_request(self, user, path='/pmc/pg/test-playgroup/'):
+        request = self.factory.get(path)
+        request.user = user
+        return request
+
+    def test_member_and_playgroup_load_in_one_query(self):
+        request = self.get_request(self.user)
+        with self.assertNumQueries(1):
+            request_playgroup = get_request_playgroup(request)
+            self.assertEqual(request_playgroup.playgroup, self.playgroup)
+            self.assertEqual(request_playgroup.member, self.member)
+            self.assertTrue(request_playgroup.is_staff)
+            self.assertEqual(request_playgroup.member.playgroup.slug, 'test-playgroup')
+            self.assertIs(get_request_playgroup(request), request_playgroup)
+
+    def test_non_member_and_anonymous_users_have_no_membership(self):
+        for user in [self.other_user, AnonymousUser()]:
+            request_playgroup = get_request_playgroup(self.get_request(user))
+            self.assertEqual(request_playgroup.playgroup, self.playgroup)
+            self.assertFalse(request_playgroup.is_member)
+
+    def test_unknown_slug_and_non_playgroup_paths(self):
+        request_playgroup = get_request_playgroup(
+            self.get_request(self.user, '/pmc/pg/missing/'))
+        self.assertEqual(request_playgroup.slug, 'missing')
+        self.assertIsNone(request_playgroup.playgroup)
+        self.assertIsNone(get_request_playgroup(
+            self.get_request(self.user, '/pmc/leaderboard/')).slug)
+
+    def test_page_render_looks_up_the_playgroup_once(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/pmc/pg/test-playgroup/leaderboard/xp/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['playgroup'], self.playgroup)
+        self.assertEqual(response.context['playgroup_member'], self.member)
+        self.assertEqual(
+            len([q for q in queries if 'FROM "pmc_playgroup"' in q['sql']]), 1)
+
+    def test_decorators_check_the_resolved_membership(self):
+        view = is_pg_staff(lambda request, slug: slug)
+        request = self.get_request(self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(view(request, slug='test-playgroup'), 'test-playgroup')
+            self.assertEqual(
+                is_pg_member(view)(request, slug='test-playgroup'), 'test-playgroup')
+        with self.assertRaises(PermissionDenied):
+            view(self.get_request(self.other_user), slug='test-playgroup')
+
+    def test_invalid_manage_post_keeps_the_saved_playgroup(self):
+        Playgroup.objects.create(name='Beta', slug='beta')
+        self.client.force_login(self.user)
+        response = self.client.post('/pmc/pg/test-playgroup/manage/', {
+            'name': 'Renamed',
+            'slug': 'beta',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors)
+        self.assertEqual(response.context['playgroup'].slug, 'test-playgroup')
+        self.assertEqual(response.context['playgroup'].name, 'Test Playgroup')
+        self.assertNotContains(response, '/pmc/pg/beta/')
+        self.playgroup.refresh_from_db()
+        self.assertEqual(self.playgroup.slug, 'test-playgroup')
+
+
+@use_test_storages
+class LeaderboardPaginationTests(TestCase):
+    """Tests for reading leaderboard pages by seeking on rank."""
+
+    def setUp(self):
+        self.leaderboard = Leaderboard.objects.create(
+            name='Monthly Rankings', sort_order=1,
+            period_frequency=LeaderboardSeasonPeriod.FrequencyOptions.MONTH)
+        self.season = LeaderboardSeason.objects.create(name='Season 1')
+        self.period = LeaderboardSeasonPeriod.objects.create(
+            name='January', start_date=date(2025, 1, 1), season=self.season,
+            frequency=LeaderboardSeasonPeriod.FrequencyOptions.MONTH)
+        self.users = [
+            User.objects.create_user(username=f'player{i:02}', email=f'p{i}@example.com')
+            for i in range(40)
+        ]
+        # Competition ranks with ties of several sizes
+        totals = sorted([100 - (i // 3) * 5 - (i % 7 == 0) for i in range(40)], reverse=True)
+        player_ranks = []
+        for position, (user, total) in enumerate(zip(self.users, totals), start=1):
+            rank = position if position == 1 or total != totals[position - 2] else player_ranks[-1].rank
+            player_ranks.append(PlayerRank(
+                user=user, rank=rank, total_points=total, num_results=position % 4 + 1,
+                average_points=total, leaderboard=self.leaderboard, period=self.period))
+        RankingPointsService.apply_player_ranks(self.leaderboard, self.period, player_ranks)
+        self.rankings = PlayerRank.objects.filter(
+            leaderboard=self.leaderboard, period=self.period, playgroup=None)
+
+    def test_slices_match_offset_pagination(self):
+        expected = list(self.rankings.order_by(*PlayerRank.BOARD_ORDERING))
+        for offset in range(len(expected) + 1):
+            self.assertEqual(
+                PlayerRank.get_board_slice(self.rankings, offset, 6),
+                expected[offset:offset + 6])
+
+    def test_board_count_is_cached_until_rows_change(self):
+        self.assertEqual(PlayerRank.get_board_count(self.leaderboard.pk, self.period.pk), 40)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(PlayerRank.get_board_count(self.leaderboard.pk, self.period.pk), 40)
+        self.assertFalse(any('FROM "pmc_playerrank"' in q['sql'] for q in queries))
+
+        remaining = list(self.rankings[:30])
+        with self.captureOnCommitCallbacks(execute=True):
+            RankingPointsService.apply_player_ranks(self.leaderboard, self.period, remaining)
+        # Dropped from the cache every process reads, not just this one's
+        self.assertIsNone(caches['shared'].get(
+            PlayerRank.get_board_counts_cache_key(self.leaderboard.pk, self.period.pk)))
+        self.assertEqual(PlayerRank.get_board_count(self.leaderboard.pk, self.period.pk), 30)
+
+    def test_view_reads_a_deep_page_without_counting_or_per_row_queries(self):
+        self.client.force_login(self.users[0])
+        url = f'/pmc/leaderboard/{self.leaderboard.pk}/?season={self.season.pk}&period={self.period.pk}'
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url + '&page=2')
+        self.assertEqual(
+            [player_rank.user_id for player_rank in response.context['rankings_page']],
+            [player_rank.user_id for player_rank in
+             self.rankings.order_by(*PlayerRank.BOARD_ORDERING)[25:40]])
+        self.assertEqual(response.context['rankings_page'].paginator.num_pages, 2)
+        rank_queries = [q['sql'] for q in queries if 'FROM "pmc_playerrank"' in q['sql']]
+        self.assertEqual(len(rank_queries), 2)
+        self.assertFalse(any('COUNT(' in sql for sql in rank_queries))
+        # Only the session user is loaded; ranked players come with their rows
+        self.assertEqual(len([q for q in queries if 'FROM "auth_user"' in q['sql']]), 1)
+
+    def test_offsets_follow_board_ordering(self):
+        expected = list(self.rankings.order_by(*PlayerRank.BOARD_ORDERING))
+        for offset, player_rank in enumerate(expected):
+            self.assertEqual(PlayerRank.get_board_offset(self.rankings, player_rank), offset)
+
+    def test_find_me_opens_the_page_with_the_current_user(self):
+        me = self.rankings.order_by(*PlayerRank.BOARD_ORDERING)[30].user
+        self.client.force_login(me)
+        response = self.client.get(
+            f'/pmc/leaderboard/{self.leaderboard.pk}/?season={self.season.pk}'
+            f'&period={self.period.pk}&page=me')
+        self.assertEqual(response.context['rankings_page'].number, 2)
+        self.assertIn(me.id, [player_rank.user_id for player_rank in response.context['rankings_page']])
+
+    def test_neighbors_fragment_lists_nearby_ranks(self):
+        ordered = list(self.rankings.order_by(*PlayerRank.BOARD_ORDERING))
+        me = ordered[20]
+        in_range = [row for row in ordered if abs(row.rank - me.rank) <= 5]
+        index = in_range.index(me)
+        self.client.force_login(me.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/pmc/leaderboard/neighbors/')
+        self.assertEqual(response.context['neighbors'], in_range[max(0, index - 5):index + 6])
+        self.assertIn(me, response.context['neighbors'])
+        self.assertEqual(
+            len([q for q in queries if 'FROM "pmc_playerrank"' in q['sql']]), 2)
+
+        self.client.force_login(ordered[1].user)
+        response = self.client.get(f'/pmc/leaderboard/{self.leaderboard.pk}/neighbors/')
+        self.assertEqual(
+            response.context['neighbors'], [row for row in ordered[:7] if row.rank <= ordered[1].rank + 5])
+
+        self.client.force_login(User.objects.create_user(username='unranked'))
+        response = self.client.get('/pmc/leaderboard/neighbors/')
+        self.assertIsNone(response.context['my_rank'])
+        self.assertContains(response, 'Not ranked')
+
+
+class PlaygroupFinderTests(TestCase):
+    """Tests for the spatial index behind the playgroup finder."""
+
+    # (name, latitude, longitude)
+    LOCATIONS = [
+        ('Amsterdam', 52.3676, 4.9041),
+        ('Berlin', 52.5200, 13.4050),
+        ('Copenhagen', 55.6761, 12.5683),
+        ('Dublin', 53.3498, -6.2603),
+        ('Edinburgh', 55.9533, -3.1883),
+        ('Fiji', -17.7134, 178.0650),
+        ('Honolulu', 21.3069, -157.8583),
+        ('Hamburg', 53.5511, 9.9937),
+    ]
+
+    def setUp(self):
+        # Tiles live in the cache and the loaded index outlives each test
+        cache.clear()
+        reference_data.reset()
+        self.playgroups = {}
+        for name, latitude, longitude in self.LOCATIONS:
+            playgroup = Playgroup.objects.create(name=name, slug=name.lower())
+            venue = Venue.objects.create(
+                name=f'{name} Games', slug=f'{name.lower()}-games', address=name,
+                latitude=latitude, longitude=longitude)
+            PlaygroupVenue.objects.create(playgroup=playgroup, venue=venue)
+            self.playgroups[name] = playgroup
+
+    def get_finder_data(self, **params):
+        response = self.client.get('/pmc/api/finder/', params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_geohash_matches_reference_encoding(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(Venue.objects.get(name='Berlin Games').geohash,
+                         encode_geohash(52.52, 13.405))
+
+    def test_bbox_cells_cover_the_antimeridian(self):
+        cells = get_geohashes_for_bbox(-20, 170, -10, -170, max_cells=16)
+        self.assertLessEqual(len(cells), 16)
+        for latitude, longitude in [(-17.7, 178.0), (-15, -175), (-19.9, 170.1)]:
+            self.assertTrue(any(encode_geohash(latitude, longitude).startswith(cell) for cell in cells))
+
+    def test_kd_tree_matches_brute_force(self):
+        points = [
+            ((i * 37) % 180 - 90 + 0.5, (i * 91) % 360 - 180 + 0.25, i)
+            for i in range(200)
+        ]
+        tree = KDTree(points)
+        for latitude, longitude in [(0, 0), (52, 4), (-89, 179), (10, -179.9)]:
+            expected = sorted(
+                points, key=lambda p: haversine_km(latitude, longitude, p[0], p[1]))[:7]
+            self.assertEqual(tree.nearest(latitude, longitude, 7), [p[2] for p in expected])
+
+    def test_nearest_playgroups_are_ranked_by_distance(self):
+        data = self.get_finder_data(near='52.37,4.90', limit=3)
+        self.assertEqual(
+            [pg['name'] for pg in data['playgroups']], ['Amsterdam', 'Hamburg', 'Berlin'])
+        self.assertLess(data['playgroups'][0]['distance_km'], 1)
+        self.assertEqual(data['total_count'], len(self.LOCATIONS))
+        self.assertTrue(data['capped'])
+
+    def test_nearest_respects_filters(self):
+        data = self.get_finder_data(near='52.37,4.90', search='Ham')
+        self.assertEqual([pg['name'] for pg in data['playgroups']], ['Hamburg'])
+        self.assertEqual(data['total_count'], 1)
+
+    def test_bbox_returns_only_venues_inside(self):
+        data = self.get_finder_data(bbox='50,-10,56,10')
+        self.assertEqual(
+            {pg['name'] for pg in data['playgroups']},
+            {'Amsterdam', 'Dublin', 'Edinburgh', 'Hamburg'})
+
+        data = self.get_finder_data(bbox='-30,170,30,-150', near='-17,178')
+        self.assertEqual([pg['name'] for pg in data['playgroups']], ['Fiji', 'Honolulu'])
+
+    def test_playgroup_with_several_venues_is_listed_once(self):
+        second = Venue.objects.create(
+            name='Amsterdam Annex', slug='amsterdam-annex', address='Amsterdam',
+            latitude=52.37, longitude=4.91)
+        PlaygroupVenue.objects.create(playgroup=self.playgroups['Amsterdam'], venue=second)
+        data = self.get_finder_data(near='52.37,4.90', limit=2)
+        self.assertEqual([pg['name'] for pg in data['playgroups']], ['Amsterdam', 'Hamburg'])
+        self.assertEqual(len(data['playgroups'][0]['venues']), 2)
+
+    def test_moving_a_venue_refreshes_the_tiles(self):
+        self.assertEqual(len(self.get_finder_data(bbox='50,-10,56,10')['playgroups']), 4)
+        venue = Venue.objects.get(name='Berlin Games')
+        with self.captureOnCommitCallbacks(execute=True):
+            venue.longitude = 6.0
+            venue.save(update_fields=['longitude'])
+        venue.refresh_from_db()
+        self.assertEqual(venue.geohash, encode_geohash(52.52, 6.0))
+        self.assertIn('Berlin', {
+            pg['name'] for pg in self.get_finder_data(bbox='50,-10,56,10')['playgroups']})
+
+    def test_membership_changes_keep_the_index(self):
+        user = User.objects.create_user(username='member', email='member@example.com')
+        version = VENUE_INDEX.get_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            PlaygroupMember.objects.create(playgroup=self.playgroups['Amsterdam'], user=user)
+        self.assertEqual(VENUE_INDEX.get_version(), version)
+
+        data = self.get_finder_data(near='52.37,4.90', limit=2)
+        self.assertEqual(
+            [(pg['name'], pg['member_count']) for pg in data['playgroups']],
+            [('Amsterdam', 1), ('Hamburg', 0)])
+
+    def test_spatial_queries_do_not_hit_the_database(self):
+        PlaygroupFinderService.get_in_bbox(50, -10, 56, 10)
+        with self.assertNumQueries(0):
+            PlaygroupFinderService.get_in_bbox(50, -10, 56, 10)
+            PlaygroupFinderService.get_nearest(52.37, 4.90, 5)
+
+    def test_listing_does_not_query_per_playgroup(self):
+        self.get_finder_data()
+        # The filtered playgroups, and the member counts of those returned
+        with self.assertNumQueries(2):
+            data = self.get_finder_data()
+        self.assertEqual(data['total_count'], len(self.LOCATIONS))
+        self.assertFalse(data['capped'])
+
+
 class LeaderboardPeriodLockingTest(TestCase):
 
     def setUp(self):
@@ -1309,3 +2275,152 @@ class LeaderboardPeriodLockingTest(TestCase):
 
         end_date = period.get_end_date()
         self.assertEqual(end_date, date.today() + timedelta(days=1))
+
+
+@mock.patch.dict(os.environ, {'PMC_RATINGS_API_KEY': 'test-key'})
+class BackgroundJobTests(TestCase):
+    """Tests for the database-backed job queue behind the refresh endpoints."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='jobuser', email='job@example.com')
+        self.trophy = Trophy.objects.create(
+            pmc_id='T01', name='Events',
+            criteria=AwardBase.CriteriaTypeOptions.events,
+            criteria_value=1, mode=AwardBase.ModeOptions.ANY)
+        event = Event.objects.create(name='Event', start_date=date(2025, 1, 1), player_count=4)
+        EventResult.objects.create(event=event, user=self.user, finishing_position=1)
+
+    def test_endpoint_enqueues_instead_of_running(self):
+        response = self.client.post('/pmc/refresh-trophies/', HTTP_X_API_KEY='test-key')
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data['status'], 'queued')
+        self.assertTrue(data['created'])
+        self.assertFalse(UserTrophy.objects.exists())
+
+        status = self.client.get(data['status_url'], HTTP_X_API_KEY='test-key').json()
+        self.assertEqual(status['id'], data['id'])
+
+    def test_enqueue_is_idempotent_while_active(self):
+        first, created = enqueue_job('refresh_trophies')
+        self.assertTrue(created)
+        second, created = enqueue_job('refresh_trophies')
+        self.assertFalse(created)
+        self.assertEqual(first.pk, second.pk)
+
+        run_next_job()
+        third, created = enqueue_job('refresh_trophies')
+        self.assertTrue(created)
+        self.assertNotEqual(third.pk, first.pk)
+
+    def test_running_job_gets_one_follow_up_run(self):
+        first, _ = enqueue_job('refresh_trophies')
+        self.assertEqual(claim_next_job('worker-1').pk, first.pk)
+
+        follow_up, created = enqueue_job('refresh_trophies')
+        self.assertTrue(created)
+        self.assertNotEqual(follow_up.pk, first.pk)
+        again, created = enqueue_job('refresh_trophies')
+        self.assertFalse(created)
+        self.assertEqual(again.pk, follow_up.pk)
+        # The follow-up waits until the running job of its key finishes
+        self.assertIsNone(claim_next_job('worker-2'))
+
+    def test_failure_with_a_follow_up_queued_is_not_retried(self):
+        background_job, _ = enqueue_job('refresh_leaderboard', {'leaderboard_id': 0})
+        claimed = claim_next_job('worker-1')
+        follow_up, _ = enqueue_job('refresh_leaderboard', {'leaderboard_id': 0})
+
+        with self.assertLogs('pmc.jobs', level='ERROR'):
+            run_job(claimed)
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.StatusOptions.FAILED)
+        self.assertEqual(claim_next_job('worker-1').pk, follow_up.pk)
+
+    def test_worker_runs_job_and_reports_progress(self):
+        background_job, _ = enqueue_job('refresh_trophies')
+        call_command('run_jobs', stdout=StringIO())
+
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.StatusOptions.SUCCEEDED)
+        self.assertEqual(background_job.progress_current, 1)
+        self.assertEqual(background_job.progress_total, 1)
+        self.assertEqual(UserTrophy.objects.get(user=self.user).amount, 1)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        background_job, _ = enqueue_job('refresh_leaderboard', {'leaderboard_id': 0})
+
+        run_next_job()
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.StatusOptions.QUEUED)
+        self.assertEqual(background_job.attempts, 1)
+        self.assertIn('DoesNotExist', background_job.last_error)
+        self.assertGreater(background_job.run_after, timezone.now())
+        # Not runnable until the backoff has passed
+        self.assertIsNone(run_next_job())
+
+        for attempt in range(2):
+            BackgroundJob.objects.filter(pk=background_job.pk).update(run_after=timezone.now())
+            run_next_job()
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.StatusOptions.FAILED)
+        self.assertEqual(background_job.attempts, 3)
+
+    def test_leaderboard_job_refreshes_rankings(self):
+        leaderboard = Leaderboard.objects.create(
+            name='Month', period_frequency=LeaderboardSeasonPeriod.FrequencyOptions.MONTH)
+        response = self.client.post(
+            f'/pmc/refresh-leaderboard/{leaderboard.pk}/', HTTP_X_API_KEY='test-key')
+        run_next_job()
+
+        background_job = BackgroundJob.objects.get(pk=response.json()['id'])
+        self.assertEqual(background_job.status, BackgroundJob.StatusOptions.SUCCEEDED)
+        self.assertEqual(background_job.progress_current, background_job.progress_total)
+        self.assertTrue(LeaderboardLog.objects.filter(leaderboard=leaderboard).exists())
+
+    def test_concurrency_limit_per_job_name(self):
+        enqueue_job('refresh_achievements', {'pmc_id': 'A01'})
+        enqueue_job('refresh_achievements', {'pmc_id': 'A02'})
+        self.assertIsNotNone(claim_next_job('worker-1'))
+        self.assertIsNone(claim_next_job('worker-2'))
+
+    def test_concurrency_limit_does_not_block_other_names(self):
+        enqueue_job('refresh_achievements', {'pmc_id': 'A01'})
+        enqueue_job('refresh_achievements', {'pmc_id': 'A02'})
+        enqueue_job('refresh_badges')
+        self.assertEqual(claim_next_job('worker-1').name, 'refresh_achievements')
+        self.assertEqual(claim_next_job('worker-2').name, 'refresh_badges')
+        self.assertIsNone(claim_next_job('worker-3'))
+
+    def test_running_job_with_recent_heartbeat_is_kept(self):
+        background_job, _ = enqueue_job('refresh_badges')
+        claimed = claim_next_job('worker-1')
+        BackgroundJob.objects.filter(pk=background_job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(claimed.heartbeat(), 1)
+
+        self.assertEqual(requeue_stale_jobs(), 0)
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.StatusOptions.RUNNING)
+
+    def test_heartbeat_is_sent_while_a_job_runs(self):
+        import time
+        background_job, _ = enqueue_job('refresh_badges')
+        with mock.patch('pmc.jobs.HEARTBEAT_INTERVAL', timedelta(milliseconds=10)), \
+                mock.patch.object(BackgroundJob, 'heartbeat') as heartbeat, \
+                mock.patch('pmc.models.AwardAssignmentService.refresh_user_badges',
+                           side_effect=lambda: time.sleep(0.2)):
+            run_next_job('worker-1')
+        self.assertGreater(heartbeat.call_count, 0)
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.StatusOptions.SUCCEEDED)
+
+    def test_stale_running_jobs_are_requeued(self):
+        background_job, _ = enqueue_job('refresh_badges')
+        claim_next_job('worker-1')
+        BackgroundJob.objects.filter(pk=background_job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=10))
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.StatusOptions.QUEUED)
@@ -41,6 +41,8 @@ urlpatterns = [
          views.playgroup_leaderboard, name='pmc-pg-leaderboard'),
     path('pg/<slug:slug>/leaderboard/<int:pk>/',
          views.playgroup_leaderboard, name='pmc-pg-leaderboard'),
+    path('pg/<slug:slug>/leaderboard/xp/',
+         views.playgroup_xp_leaderboard, name='pmc-pg-xp-leaderboard'),
     path('pg/<slug:slug>/events/',
          views.PlaygroupEventsList.as_view(), name='pmc-pg-events'),
     path('pg/<slug:slug>/events/new/',
@@ -70,12 +72,18 @@ urlpatterns = [
     path('api/finder/', views.playgroup_finder_data, name='pmc-finder-data'),
     path('leaderboard/', views.global_leaderboard, name='pmc-leaderboard'),
     path('leaderboard/<int:pk>/', views.global_leaderboard, name='pmc-leaderboard'),
+    path('leaderboard/xp/', views.xp_leaderboard, name='pmc-xp-leaderboard'),
+    path('leaderboard/neighbors/', views.leaderboard_neighbors,
+         name='pmc-leaderboard-neighbors'),
+    path('leaderboard/<int:pk>/neighbors/', views.leaderboard_neighbors,
+         name='pmc-leaderboard-neighbors'),
     path('typography/', views.typography),
     path('about/', views.about, name='pmc-about'),
     path('about-ranking-points/', views.about_ranking_points,
          name='pmc-about-ranking-points'),
     path('attributions/', views.attributions, name='pmc-attributions'),
     path('refresh-leaderboard/<int:pk>/', views.refresh_leaderboard),
+    path('refresh-leaderboards/', views.refresh_all_leaderboards),
 
     path('@me/awards/trophies/<int:pk>/', views.my_trophy_detail,
          name='pmc-my-trophy-detail'),
@@ -95,6 +103,7 @@ urlpatterns = [
     path('refresh-trophies/', views.refresh_trophies),
     path('refresh-achievements/', views.refresh_achievements),
     path('refresh-badges/', views.refresh_badges),
+    path('api/jobs/<int:pk>/', views.job_status, name='pmc-job-status'),
     path('hydrate-result-decks/', views.hydrate_result_decks),
 
     # Common to all hosts
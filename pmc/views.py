@@ -1,4 +1,5 @@
 from http import HTTPStatus
+import copy
 import json
 import os
 import csv
@@ -10,7 +11,7 @@ from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.core.exceptions import PermissionDenied
 from django.db import IntegrityError, transaction
 from django.db.models import Exists, OuterRef, Sum, Count, Q
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.urls import reverse
 from django.views import generic
 from django.template import loader
@@ -45,18 +46,23 @@ from .models import RankingPointsMap, RankingPointsMapVersion
 from .models import AwardAssignmentService
 from .models import Venue, PlaygroupVenue, PlaygroupType, EventFormat
 from .models import exclude_upcoming_event_results
+from .models import BackgroundJob
+from .models import UserStatsRollup
+from .models import LevelBreakpoint, PmcProfile
+from .models import EVENT_FORMATS
+from .models import PlaygroupFinderService
+from .jobs import enqueue_job
+from .middleware import get_request_playgroup
 
 
 def is_pg_member(view):
     def decorator(view_func):
         def wrapper(request, *args, **kwargs):
-            playgroup = Playgroup.objects.filter(slug=kwargs['slug']).first()
-            if playgroup and playgroup.is_global:
+            request_playgroup = get_request_playgroup(request, kwargs['slug'])
+            if request_playgroup.playgroup and request_playgroup.playgroup.is_global:
                 return view_func(request, *args, **kwargs)
 
-            is_member = PlaygroupMember.objects.filter(
-                user=request.user, playgroup__slug=kwargs['slug']).exists()
-            if is_member:
+            if request_playgroup.is_member:
                 return view_func(request, *args, **kwargs)
             raise PermissionDenied
         return wrapper
@@ -66,15 +72,20 @@ def is_pg_member(view):
 def is_pg_staff(view):
     def decorator(view_func):
         def wrapper(request, *args, **kwargs):
-            is_member = PlaygroupMember.objects.filter(
-                user=request.user, playgroup__slug=kwargs['slug'], is_staff=True).exists()
-            if is_member:
+            if get_request_playgroup(request, kwargs['slug']).is_staff:
                 return view_func(request, *args, **kwargs)
             raise PermissionDenied
         return wrapper
     return decorator(view)
 
 
+def get_playgroup_or_404(request, slug):
+    playgroup = get_request_playgroup(request, slug).playgroup
+    if playgroup is None:
+        raise Http404
+    return playgroup
+
+
 def api_key_required(view):
     def decorator(view_func):
         def wrapper(request, *args, **kwargs):
@@ -146,7 +157,7 @@ def playgroup_join_request(request, slug):
                 return HttpResponseRedirect(reverse('pmc-pg-join', kwargs={'slug': slug}))
         else:
             if form.is_valid():
-                playgroup = Playgroup.objects.get(slug=slug)
+                playgroup = get_playgroup_or_404(request, slug)
                 playgroup_join_request = form.save(commit=False)
                 playgroup_join_request.playgroup = playgroup
                 playgroup_join_request.user = request.user
@@ -224,9 +235,11 @@ def playgroup_join_request_manage(request, slug, pk):
 @login_required
 @is_pg_staff
 def manage_playgroup(request, slug):
-    playgroup = get_object_or_404(Playgroup, slug=slug)
+    playgroup = get_playgroup_or_404(request, slug)
     if request.method == 'POST':
-        form = PlaygroupForm(request.POST, instance=playgroup)
+        # Validation writes the posted values onto the instance; keep them off
+        # the request's playgroup, which the header and links render from
+        form = PlaygroupForm(request.POST, instance=copy.copy(playgroup))
         if form.is_valid():
             pg = form.save()
             return HttpResponseRedirect(reverse('pmc-pg-detail', kwargs={'slug': pg.slug}))
@@ -248,7 +261,7 @@ def manage_playgroup(request, slug):
 @is_pg_staff
 def add_playgroup_venue(request, slug):
     from django.utils.text import slugify
-    playgroup = get_object_or_404(Playgroup, slug=slug)
+    playgroup = get_playgroup_or_404(request, slug)
     if request.method == 'POST':
         form = VenueForm(request.POST)
         if form.is_valid():
@@ -282,7 +295,7 @@ def add_playgroup_venue(request, slug):
 @login_required
 @is_pg_staff
 def remove_playgroup_venue(request, slug, venue_id):
-    playgroup = get_object_or_404(Playgroup, slug=slug)
+    playgroup = get_playgroup_or_404(request, slug)
     venue = get_object_or_404(Venue, pk=venue_id)
     PlaygroupVenue.objects.filter(playgroup=playgroup, venue=venue).delete()
     if playgroup.primary_venue == venue:
@@ -301,7 +314,7 @@ def remove_playgroup_venue(request, slug, venue_id):
 @login_required
 @is_pg_staff
 def set_playgroup_primary_venue(request, slug):
-    playgroup = get_object_or_404(Playgroup, slug=slug)
+    playgroup = get_playgroup_or_404(request, slug)
     venue_id = request.POST.get('venue_id')
     if venue_id:
         venue = get_object_or_404(Venue, pk=venue_id)
@@ -335,17 +348,15 @@ def my_results(request):
 @login_required
 def my_keychain(request):
     profile = request.user.pmc_profile
-    current_level = profile.get_level()
-    next_level = profile.get_next_level()
-    level_up_info = profile._get_level_up_info()
+    level_up_info = profile.level_up_info
     my_results = profile.get_events(exclude_upcoming=True)
 
     return render(request, 'pmc/g-my-keychain.html', {
         'my_results': my_results,
         'events_won': my_results.filter(finishing_position=1),
         'num_game_wins': my_results.aggregate(Sum('num_wins'))['num_wins__sum'],
-        'current_level': current_level,
-        'next_level': next_level,
+        'current_level': level_up_info['current_level'],
+        'next_level': level_up_info['next_level'],
         'percent_level_up': level_up_info['percent_level_up'],
         'level_increment': level_up_info['level_increment'],
         'level_increment_progress': level_up_info['level_increment_progress'],
@@ -361,9 +372,7 @@ def my_keychain(request):
 def user_profile(request, username):
     user = get_object_or_404(get_user_model(), username=username)
     profile = user.pmc_profile
-    current_level = profile.get_level()
-    next_level = profile.get_next_level()
-    level_up_info = profile._get_level_up_info()
+    level_up_info = profile.level_up_info
     playgroup_memberships = PlaygroupMember.objects.filter(user=user)
 
     context = {
@@ -372,8 +381,8 @@ def user_profile(request, username):
         'badges': Badge.with_user_badges(user).filter(user_badge_id__isnull=False),
         'achievements': Achievement.with_highest_user_achievements_tier(user).filter(user_achievement_tier__isnull=False),
         'trophies': Trophy.with_user_trophies(user).filter(user_trophy_amount__isnull=False),
-        'current_level': current_level,
-        'next_level': next_level,
+        'current_level': level_up_info['current_level'],
+        'next_level': level_up_info['next_level'],
         'percent_level_up': level_up_info['percent_level_up'],
         'level_increment': level_up_info['level_increment'],
         'level_increment_progress': level_up_info['level_increment_progress'],
@@ -418,7 +427,7 @@ class PlaygroupMembersList(LoginRequiredMixin, generic.ListView):
     @method_decorator(login_required)
     @method_decorator(is_pg_member)
     def dispatch(self, request, *args, **kwargs):
-        playgroup = Playgroup.objects.filter(slug=self.kwargs['slug']).first()
+        playgroup = get_request_playgroup(request, self.kwargs['slug']).playgroup
         if playgroup and playgroup.is_global:
             return HttpResponseRedirect(reverse('pmc-pg-detail', kwargs={'slug': self.kwargs['slug']}))
         return super().dispatch(request, *args, **kwargs)
@@ -426,11 +435,7 @@ class PlaygroupMembersList(LoginRequiredMixin, generic.ListView):
 
 @login_required
 def playgroup_member_detail(request, slug, username):
-    is_pg_member = PlaygroupMember.objects.filter(
-        playgroup__slug=slug,
-        user=request.user
-    ).count() > 0
-    if not is_pg_member:
+    if not get_request_playgroup(request, slug).is_member:
         return redirect_to(request, reverse('pmc-user-profile', kwargs={'username': username}))
     return user_profile(request, username)
 
@@ -518,8 +523,8 @@ class EventDetail(generic.DetailView):
         if user.is_authenticated:
             context['is_registered'] = EventResult.objects.filter(
                 event=self.object, user=user).exists()
-            context['is_member'] = PlaygroupMember.objects.filter(
-                user=user, playgroup__slug=self.kwargs['slug']).exists()
+            context['is_member'] = get_request_playgroup(
+                self.request, self.kwargs['slug']).is_member
             context['my_result'] = EventResult.objects.filter(
                 event=self.object, user=user).first()
             has_own_result = context['my_result'] is not None
@@ -654,7 +659,7 @@ def delete_event(request, slug, pk):
 @login_required
 @is_pg_member
 def playgroup_leaderboard(request, slug, pk=None):
-    playgroup = get_object_or_404(Playgroup, slug=slug)
+    playgroup = get_playgroup_or_404(request, slug)
 
     leaderboards = Leaderboard.objects.exclude(
         leaderboard_settings__playgroup=playgroup,
@@ -682,37 +687,17 @@ def playgroup_leaderboard(request, slug, pk=None):
         except (ValueError, TypeError):
             pass
 
-    rank_filters = {
-        'leaderboard': pk,
-        'playgroup__slug': slug
-    }
-
     form_data = request.GET if request.GET else None
     season_period_form = LeaderboardSeasonPeriodForm(leaderboard, form_data)
+    rank_filters = _get_rank_filters(leaderboard, season_period_form, playgroup)
 
-    try:
-        rank_filters['period__season'] = season_period_form.data.get(
-            'season') or season_period_form.fields['season'].initial
-        rank_filters['period'] = season_period_form.data.get(
-            'period') or season_period_form.fields['period'].initial
-    except KeyError:
-        pass
-
-    rankings = PlayerRank.objects.filter(**rank_filters)
-    paginator = Paginator(rankings, 25)
-    page_number = request.GET.get('page', 1)
-    try:
-        rankings_page = paginator.page(page_number)
-    except PageNotAnInteger:
-        rankings_page = paginator.page(1)
-    except EmptyPage:
-        rankings_page = paginator.page(paginator.num_pages)
+    rankings_page = _get_rankings_page(request, rank_filters, playgroup.pk)
 
     return render(request, 'pmc/pg-leaderboard.html', {
         'leaderboards': leaderboards,
         'season_period_form': season_period_form,
         'rankings_page': rankings_page,
-        'total_count': rankings.count(),
+        'total_count': rankings_page.paginator.count,
         'pk': pk,
     })
 
@@ -739,12 +724,65 @@ def global_leaderboard(request, pk=None):
         except (ValueError, TypeError):
             pass
 
-    rank_filters = {
-        'leaderboard': pk,
-        'playgroup': None
-    }
     season_period_form = LeaderboardSeasonPeriodForm(
         leaderboard, request.GET or None)
+    rank_filters = _get_rank_filters(leaderboard, season_period_form)
+
+    rankings_page = _get_rankings_page(request, rank_filters, None)
+
+    return render(request, 'pmc/g-leaderboard.html', {
+        'leaderboards': Leaderboard.objects.all(),
+        'season_period_form': season_period_form,
+        'rankings_page': rankings_page,
+        'total_count': rankings_page.paginator.count,
+        'pk': pk,
+    })
+
+
+class PlayerRankPaginator(Paginator):
+    """
+    Paginator that reads pages with PlayerRank.get_board_slice, so deep
+    pages cost the same as the first. count may be passed in to skip the
+    COUNT query.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        rows = PlayerRank.get_board_slice(
+            self.object_list, (number - 1) * self.per_page, self.per_page)
+        return self._get_page(rows, number, self)
+
+
+@login_required
+def leaderboard_neighbors(request, pk=None):
+    """Players ranked just above and below the current user, for the KeyChain home page."""
+    if pk is None:
+        leaderboard = Leaderboard.objects.first()
+        if leaderboard is None:
+            raise Http404
+    else:
+        leaderboard = get_object_or_404(Leaderboard, pk=pk)
+
+    rankings = _get_rankings(_get_rank_filters(
+        leaderboard, LeaderboardSeasonPeriodForm(leaderboard)))
+    my_rank = rankings.filter(user=request.user).first()
+    return render(request, 'pmc/_leaderboard-neighbors.html', {
+        'leaderboard': leaderboard,
+        'my_rank': my_rank,
+        'neighbors': PlayerRank.get_neighbors(rankings, my_rank) if my_rank else [],
+    })
+
+
+def _get_rank_filters(leaderboard, season_period_form, playgroup=None):
+    rank_filters = {
+        'leaderboard': leaderboard.pk,
+        'playgroup': playgroup
+    }
     try:
         rank_filters['period__season'] = season_period_form.data.get(
             'season') or season_period_form.fields['season'].initial
@@ -752,8 +790,43 @@ def global_leaderboard(request, pk=None):
             'period') or season_period_form.fields['period'].initial
     except KeyError:
         pass
+    return rank_filters
 
-    rankings = PlayerRank.objects.filter(**rank_filters)
+
+def _get_rankings(rank_filters):
+    return PlayerRank.objects.filter(**rank_filters).select_related(
+        'user', 'user__pmc_profile', 'user__pmc_profile__avatar')
+
+
+def _get_rankings_page(request, rank_filters, playgroup_id):
+    rankings = _get_rankings(rank_filters)
+    count = None
+    period = rank_filters.get('period')
+    if period is not None:
+        try:
+            count = PlayerRank.get_board_count(
+                int(rank_filters['leaderboard']), int(getattr(period, 'pk', period)),
+                playgroup_id)
+        except (ValueError, TypeError):
+            pass
+    paginator = PlayerRankPaginator(rankings, 25, count=count)
+    page_number = request.GET.get('page', 1)
+    if page_number == 'me':
+        # Jump to the page holding the current user's row
+        my_rank = rankings.filter(user=request.user).first()
+        page_number = 1
+        if my_rank:
+            page_number = PlayerRank.get_board_offset(
+                rankings, my_rank) // paginator.per_page + 1
+    try:
+        return paginator.page(page_number)
+    except PageNotAnInteger:
+        return paginator.page(1)
+    except EmptyPage:
+        return paginator.page(paginator.num_pages)
+
+
+def _get_xp_rankings_page(request, rankings):
     paginator = Paginator(rankings, 25)
     page_number = request.GET.get('page', 1)
     try:
@@ -763,12 +836,35 @@ def global_leaderboard(request, pk=None):
     except EmptyPage:
         rankings_page = paginator.page(paginator.num_pages)
 
-    return render(request, 'pmc/g-leaderboard.html', {
+    for profile in rankings_page:
+        profile.level = LevelBreakpoint.get_for_xp(profile.total_xp)[0]
+    return rankings_page
+
+
+@login_required
+def xp_leaderboard(request):
+    rankings_page = _get_xp_rankings_page(request, PmcProfile.get_xp_rankings())
+    return render(request, 'pmc/g-xp-leaderboard.html', {
         'leaderboards': Leaderboard.objects.all(),
-        'season_period_form': season_period_form,
         'rankings_page': rankings_page,
-        'total_count': rankings.count(),
-        'pk': pk,
+        'total_count': rankings_page.paginator.count,
+    })
+
+
+@login_required
+@is_pg_member
+def playgroup_xp_leaderboard(request, slug):
+    playgroup = get_playgroup_or_404(request, slug)
+    leaderboards = Leaderboard.objects.exclude(
+        leaderboard_settings__playgroup=playgroup,
+        leaderboard_settings__is_leaderboard_hidden=True
+    )
+    rankings_page = _get_xp_rankings_page(
+        request, PmcProfile.get_xp_rankings(playgroup))
+    return render(request, 'pmc/pg-xp-leaderboard.html', {
+        'leaderboards': leaderboards,
+        'rankings_page': rankings_page,
+        'total_count': rankings_page.paginator.count,
     })
 
 
@@ -782,7 +878,7 @@ def submit_event_results(request, slug):
         if form.is_valid():
             event = form.save()
             PlaygroupEvent.objects.create(
-                playgroup=Playgroup.objects.get(slug=slug),
+                playgroup=get_playgroup_or_404(request, slug),
                 event=event
             )
             event_results = []
@@ -834,6 +930,11 @@ def submit_event_results(request, slug):
             if not form_errors:
                 if event_results:
                     results = EventResult.objects.bulk_create(event_results)
+                    # bulk_create skips the result signals
+                    user_ids = [result.user_id for result in results]
+                    UserStatsRollup.rebuild(user_ids)
+                    AwardAssignmentService.mark_users_dirty(
+                        user_ids, 'pmc.eventresult')
                     RankingPointsService.assign_points_for_results(
                         results,
                         event.player_count or len(results)
@@ -850,7 +951,7 @@ def submit_event_results(request, slug):
     else:
         form = EventForm(
             user=request.user,
-            playgroup=Playgroup.objects.get(slug=slug)
+            playgroup=get_playgroup_or_404(request, slug)
         )
     return render(request, 'pmc/pg-submit-event-results.html', {
         'form_errors': form_errors,
@@ -959,7 +1060,7 @@ def manage_event_result(request, slug, pk):
         messages.success(request, _('Result removed.'))
         if request.htmx:
             context = {
-                'playgroup': Playgroup.objects.get(slug=slug),
+                'playgroup': get_playgroup_or_404(request, slug),
                 'object': result.event,
             }
             return render(request, 'pmc/pg-event-manage.html#results-table', context)
@@ -976,7 +1077,7 @@ def manage_event_result(request, slug, pk):
         messages.success(request, _('Result updated.'))
         if request.htmx:
             context = {
-                'playgroup': Playgroup.objects.get(slug=slug),
+                'playgroup': get_playgroup_or_404(request, slug),
                 'object': result.event,
             }
             return render(request, 'pmc/pg-event-manage.html#results-table', context)
@@ -1018,7 +1119,7 @@ def add_event_result(request, slug, pk):
             status = HTTPStatus.INTERNAL_SERVER_ERROR
         if request.htmx:
             context = {
-                'playgroup': Playgroup.objects.get(slug=slug),
+                'playgroup': get_playgroup_or_404(request, slug),
                 'object': event,
             }
             return render(
@@ -1051,41 +1152,32 @@ def toggle_event_registration(request, slug, pk):
 @csrf_exempt
 @require_POST
 @api_key_required
-@transaction.atomic
 def refresh_leaderboard(request, pk):
-    leaderboard = Leaderboard.objects.get(pk=pk)
-    period = leaderboard.get_period_for_date(date.today())
-    if leaderboard.period_frequency == LeaderboardSeasonPeriod.FrequencyOptions.MONTH:
-        order_by = 'total_points'
-    elif leaderboard.period_frequency == LeaderboardSeasonPeriod.FrequencyOptions.SEASON:
-        order_by = 'total_points'
-    elif leaderboard.period_frequency == LeaderboardSeasonPeriod.FrequencyOptions.ALL_TIME:
-        order_by = 'total_points'
-    else:
-        raise ValueError('Invalid leaderboard period frequency')
+    leaderboard = get_object_or_404(Leaderboard, pk=pk)
+    return _enqueue_job_response(
+        request, 'refresh_leaderboard', {'leaderboard_id': leaderboard.pk})
 
-    if not period.is_locked:
-        RankingPointsService.assign_points_for_leaderboard(
-            leaderboard,
-            period,
-            order_by=order_by
-        )
 
-    last_week_period = leaderboard.get_period_for_date(
-        date.today() - timedelta(days=7))
-    if last_week_period.pk != period.pk and not last_week_period.is_locked:
-        RankingPointsService.assign_points_for_leaderboard(
-            leaderboard,
-            last_week_period,
-            order_by=order_by
-        )
+@csrf_exempt
+@require_POST
+@api_key_required
+def refresh_all_leaderboards(request):
+    return _enqueue_job_response(request, 'refresh_all_leaderboards')
+
 
-    LeaderboardSeasonPeriod.objects.update_all_lock_statuses()
+def _enqueue_job_response(request, name, params=None):
+    background_job, created = enqueue_job(name, params)
+    data = background_job.to_dict()
+    data['created'] = created
+    data['status_url'] = request.build_absolute_uri(
+        reverse('pmc-job-status', args=[background_job.pk]))
+    return JsonResponse(data, status=HTTPStatus.ACCEPTED)
 
-    LeaderboardLog.objects.create(
-        leaderboard=leaderboard
-    ).save()
-    return HttpResponse('Done.', content_type='text/plain')
+
+@api_key_required
+def job_status(request, pk):
+    background_job = get_object_or_404(BackgroundJob, pk=pk)
+    return JsonResponse(background_job.to_dict())
 
 
 @login_required
@@ -1158,7 +1250,7 @@ def add_pg_member_by_qrcode(request, slug):
         mv_id = message_data['id']
         User = get_user_model()
         member, _created = PlaygroupMember.objects.get_or_create(
-            playgroup=Playgroup.objects.get(slug=slug),
+            playgroup=get_playgroup_or_404(request, slug),
             user=User.objects.get(pmc_profile__mv_id=mv_id)
         )
         href_member_detail = reverse('pmc-pg-member-detail', kwargs={
@@ -1212,7 +1304,7 @@ def add_pg_member_by_username(request, slug):
     try:
         User = get_user_model()
         member, created = PlaygroupMember.objects.get_or_create(
-            playgroup=Playgroup.objects.get(slug=slug),
+            playgroup=get_playgroup_or_404(request, slug),
             user=User.objects.get(username=username)
         )
         href_member_detail = reverse('pmc-pg-member-detail', kwargs={
@@ -1226,7 +1318,7 @@ def add_pg_member_by_username(request, slug):
             messages.success(request, mark_safe(msg))
             context = {
                 'member': member,
-                'playgroup': Playgroup.objects.get(slug=slug),
+                'playgroup': get_playgroup_or_404(request, slug),
             }
             return render(request, 'pmc/pg-members.html#member-list-item', context)
         else:
@@ -1407,87 +1499,86 @@ def list_refreshable_achievements(request):
 @csrf_exempt
 @require_POST
 @api_key_required
-@transaction.atomic
 def refresh_trophy(request, pmc_id):
-    AwardAssignmentService.refresh_trophy(pmc_id)
-    return HttpResponse('Done.', content_type='text/plain')
+    return _enqueue_job_response(request, 'refresh_trophies', {'pmc_id': pmc_id})
 
 
 @csrf_exempt
 @require_POST
 @api_key_required
-@transaction.atomic
 def refresh_achievement(request, pmc_id):
-    AwardAssignmentService.refresh_achievement(pmc_id)
-    return HttpResponse('Done.', content_type='text/plain')
+    return _enqueue_job_response(request, 'refresh_achievements', {'pmc_id': pmc_id})
 
 
 @csrf_exempt
 @require_POST
 @api_key_required
-@transaction.atomic
 def refresh_trophies(request):
-    AwardAssignmentService.refresh_all_user_trophies()
-    return HttpResponse('Done.', content_type='text/plain')
+    return _enqueue_job_response(request, 'refresh_trophies')
 
 
 @csrf_exempt
 @require_POST
 @api_key_required
-@transaction.atomic
 def refresh_achievements(request):
-    pmc_id_min = request.GET.get('pmc_id_min')
-    pmc_id_max = request.GET.get('pmc_id_max')
-    AwardAssignmentService.refresh_user_achievements(
-        pmc_id_min=pmc_id_min,
-        pmc_id_max=pmc_id_max
-    )
-    return HttpResponse('Done.', content_type='text/plain')
+    params = {}
+    if request.GET.get('pmc_id_min') is not None:
+        params['pmc_id_min'] = request.GET['pmc_id_min']
+    if request.GET.get('pmc_id_max') is not None:
+        params['pmc_id_max'] = request.GET['pmc_id_max']
+    return _enqueue_job_response(request, 'refresh_achievements', params)
 
 
 @csrf_exempt
 @require_POST
 @api_key_required
-@transaction.atomic
 def refresh_badges(request):
-    AwardAssignmentService.refresh_user_badges()
-    return HttpResponse('Done.', content_type='text/plain')
+    return _enqueue_job_response(request, 'refresh_badges')
 
 
 @csrf_exempt
 @require_POST
 @api_key_required
 def hydrate_result_decks(request):
-    results = EventResult.objects.filter(
-        uploaded_deck_link__isnull=False,
-        uploaded_deck_lookup_attempts__lt=EventResult.max_deck_lookup_attempts
-    )[:20]
-    for result in results:
-        try:
-            result.add_deck_by_uploaded_link()
-        except Exception:
-            pass
-    return HttpResponse('Done.', content_type='text/plain')
+    return _enqueue_job_response(request, 'hydrate_result_decks')
 
 
 def playgroup_finder(request):
-    event_formats = EventFormat.objects.all()
+    event_formats = EVENT_FORMATS.all()
     return render(request, 'pmc/g-finder.html', {
         'event_formats': event_formats,
     })
 
 
+def _parse_coordinates(value, count):
+    try:
+        coordinates = [float(part) for part in value.split(',')]
+    except ValueError:
+        return None
+    if len(coordinates) != count:
+        return None
+    for latitude, longitude in zip(coordinates[::2], coordinates[1::2]):
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return None
+    return coordinates
+
+
 def playgroup_finder_data(request):
-    playgroups_with_venues = Playgroup.objects.filter(
-        venues__latitude__isnull=False,
-        venues__longitude__isnull=False,
-    ).distinct().annotate(
-        member_count=Count('members', distinct=True)
-    ).prefetch_related('venues', 'playgroup_venues')
+    """
+    Playgroups with a geocoded venue, as JSON for the finder map.
+
+    Accepts near=lat,lng for the closest playgroups and
+    bbox=south,west,north,east for the playgroups within a map view. Both
+    are answered from the in-memory venue index; the search and event
+    filters only narrow which playgroups it may return.
+    """
+    playgroups = Playgroup.objects.all()
+    is_filtered = False
 
     search = request.GET.get('search', '').strip()
     if search:
-        playgroups_with_venues = playgroups_with_venues.filter(
+        is_filtered = True
+        playgroups = playgroups.filter(
             Q(name__icontains=search) |
             Q(venues__city__icontains=search) |
             Q(venues__state_province__icontains=search)
@@ -1495,6 +1586,7 @@ def playgroup_finder_data(request):
 
     upcoming_only = request.GET.get('upcoming_events')
     if upcoming_only == '1':
+        is_filtered = True
         cutoff = date.today() - timedelta(days=1)
         upcoming_events = Event.objects.filter(
             playgroups=OuterRef('pk'),
@@ -1502,65 +1594,52 @@ def playgroup_finder_data(request):
         ).exclude(
             results__finishing_position__isnull=False,
         )
-        playgroups_with_venues = playgroups_with_venues.filter(
+        playgroups = playgroups.filter(
             Exists(upcoming_events)
         )
 
     event_format = request.GET.get('event_format')
     if event_format == 'other':
-        playgroups_with_venues = playgroups_with_venues.filter(
+        is_filtered = True
+        playgroups = playgroups.filter(
             events__format__isnull=True
         )
     elif event_format:
         try:
-            playgroups_with_venues = playgroups_with_venues.filter(
+            playgroups = playgroups.filter(
                 events__format_id=int(event_format)
             )
+            is_filtered = True
         except ValueError:
             pass
 
-    max_results = 10
-    total_count = playgroups_with_venues.count()
-    playgroups_with_venues = playgroups_with_venues[:max_results]
-
-    results = []
-    for pg in playgroups_with_venues:
-        venues_data = []
-        for pv in pg.playgroup_venues.select_related('venue').all():
-            venue = pv.venue
-            if not venue.has_coordinates():
-                continue
-            venues_data.append({
-                'id': venue.id,
-                'name': venue.name,
-                'latitude': float(venue.latitude),
-                'longitude': float(venue.longitude),
-                'city': venue.city or '',
-                'state_province': venue.state_province or '',
-                'is_primary': pg.primary_venue_id == venue.id,
-            })
-
-        if not venues_data:
-            continue
-
-        primary = next(
-            (v for v in venues_data if v['is_primary']), venues_data[0])
-
-        results.append({
-            'id': pg.id,
-            'name': pg.name,
-            'slug': pg.slug,
-            'member_count': pg.member_count,
-            'type': pg.type.name if pg.type else None,
-            'logo_src': pg.get_logo_src(),
-            'url': reverse('pmc-pg-detail', args=[pg.slug]),
-            'primary_latitude': primary['latitude'],
-            'primary_longitude': primary['longitude'],
-            'venues': venues_data,
-        })
+    try:
+        max_results = min(max(int(request.GET.get('limit', 10)), 1), 100)
+    except ValueError:
+        max_results = 10
+
+    playgroup_ids = None
+    if is_filtered:
+        playgroup_ids = set(playgroups.values_list('pk', flat=True))
+
+    near = _parse_coordinates(request.GET.get('near', ''), 2)
+    bbox = _parse_coordinates(request.GET.get('bbox', ''), 4)
+    if bbox:
+        results = PlaygroupFinderService.get_in_bbox(
+            *bbox, near=near, playgroup_ids=playgroup_ids)
+    elif near:
+        results = PlaygroupFinderService.get_nearest(
+            *near, max_results, playgroup_ids=playgroup_ids)
+    else:
+        ordered_ids = playgroups.values_list('pk', flat=True).distinct()
+        results = PlaygroupFinderService.get_payloads(ordered_ids)
 
+    if near and not bbox:
+        total_count = PlaygroupFinderService.get_count(playgroup_ids)
+    else:
+        total_count = len(results)
     return JsonResponse({
-        'playgroups': results,
+        'playgroups': PlaygroupFinderService.add_member_counts(results[:max_results]),
         'total_count': total_count,
         'capped': total_count > max_results,
     })
@@ -0,0 +1,13 @@
+"""
+Settings for the benchmark_pairings command: the project settings with a
+throwaway in-memory SQLite database in place of the real one.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
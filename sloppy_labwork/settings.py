@@ -82,6 +82,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'pmc.middleware.PlaygroupMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -157,6 +158,22 @@ DATABASES = {
 
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The default cache is per process. The shared one lives in the database so
+# every web and worker process reads the same entries; keep it to small
+# values such as version stamps. Its table is made by createcachetable.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'shared_cache',
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -230,6 +247,10 @@ FT_USE_POSTS = os.environ['FT_USE_POSTS'] == 'True'
 FT_USE_EVENTS = os.environ['FT_USE_EVENTS'] == 'True'
 FT_USE_TOURNEYS = os.environ['FT_USE_TOURNEYS'] == 'True'
 
+# Seconds a tourney live update poll may wait for a change before answering.
+# Every waiting poll holds a worker, so keep this at 0 on sync workers.
+TOURNEY_LIVE_UPDATE_WAIT = int(os.environ.get('TOURNEY_LIVE_UPDATE_WAIT', '0'))
+
 # Bootstrap Heroku settings
 MAX_CONN_AGE = 600
 if "DATABASE_URL" in os.environ:
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sloppy_labwork.settings')
 
 application = get_wsgi_application()
+
+from common.reference_data import reference_data  # noqa: E402
+
+reference_data.warm_up()
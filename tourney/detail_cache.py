@@ -0,0 +1,76 @@
+"""
+Versioned cache for tournament detail page fragments.
+
+Fragments are keyed on the tournament's revision, which is bumped by every
+write that affects the detail pages (see the revision receivers in models).
+A changed revision simply makes the old keys unreachable; they expire on
+their own.
+
+Fragments and the hit/miss counters live in the default cache, which is
+local to each process: every web worker builds its own copy of a fragment,
+and the metrics describe only the process that answers the request.
+"""
+
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+
+FRAGMENT_TIMEOUT = 60 * 60
+HITS_KEY = 'tourney:detail-cache:hits'
+MISSES_KEY = 'tourney:detail-cache:misses'
+
+
+class TournamentDetailCache:
+
+    @staticmethod
+    def get_key(tournament, fragment, variant='public'):
+        # The code guards against reused ids (e.g. after a rollback)
+        return (f'tourney:detail:{tournament.id}-{tournament.code}:'
+                f'{tournament.revision}:{fragment}:{variant}')
+
+    @staticmethod
+    def get_or_build(tournament, fragment, build, variant='public'):
+        """
+        Return the cached value of a fragment for the tournament's current
+        revision, calling build() to create and store it on a miss.
+        """
+        key = TournamentDetailCache.get_key(tournament, fragment, variant)
+        value = cache.get(key)
+        if value is not None:
+            TournamentDetailCache._count(HITS_KEY)
+            return value
+
+        TournamentDetailCache._count(MISSES_KEY)
+        value = build()
+        cache.set(key, value, FRAGMENT_TIMEOUT)
+        return value
+
+    @staticmethod
+    def get_or_render(tournament, fragment, render, variant='public'):
+        """get_or_build for rendered HTML, returned marked safe."""
+        return mark_safe(TournamentDetailCache.get_or_build(
+            tournament, fragment, lambda: str(render()), variant))
+
+    @staticmethod
+    def get_metrics():
+        hits = cache.get(HITS_KEY, 0)
+        misses = cache.get(MISSES_KEY, 0)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else None,
+        }
+
+    @staticmethod
+    def reset_metrics():
+        cache.delete_many([HITS_KEY, MISSES_KEY])
+
+    @staticmethod
+    def _count(key):
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Evicted between add() and incr()
+                cache.set(key, 1, None)
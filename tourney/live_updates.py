@@ -0,0 +1,74 @@
+"""
+Revision-gated live updates for the tournament detail pages.
+
+Open detail pages poll with the revision they last rendered. While it is
+unchanged the answer comes from a short-lived revision lookup, so idle polls
+neither render nor prefetch anything. The lookup lives in the default cache,
+which is local to each process: the listeners served by one worker share it,
+and every worker reads the revision once per REVISION_CACHE_TIMEOUT. Once it
+changes, fragments are served through TournamentDetailCache, so each change
+is rendered once per process and reused by that process's listeners.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from .models import Tournament
+
+
+REVISION_CACHE_TIMEOUT = 1
+POLL_INTERVAL = 1
+
+
+class TournamentLiveUpdates:
+
+    @staticmethod
+    def get_revision(tournament_id):
+        """
+        The tournament's current revision, shared between the listeners of
+        this process for up to REVISION_CACHE_TIMEOUT seconds.
+        """
+        return cache.get_or_set(
+            f'tourney:live:revision:{tournament_id}',
+            lambda: Tournament.objects.filter(pk=tournament_id).values_list(
+                'revision', flat=True).first(),
+            REVISION_CACHE_TIMEOUT)
+
+    @staticmethod
+    def wait_for_change(tournament_id, revision, timeout=0):
+        """
+        Return the current revision as soon as it differs from revision, or
+        the unchanged revision once timeout seconds have passed.
+        """
+        deadline = time.monotonic() + timeout
+        current_revision = TournamentLiveUpdates.get_revision(tournament_id)
+        while current_revision == revision and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            current_revision = TournamentLiveUpdates.get_revision(tournament_id)
+        return current_revision
+
+    @staticmethod
+    def get_digest(html):
+        return hashlib.sha1(str(html).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def get_changed_fragments(renderers, known_digests):
+        """
+        Render each fragment and keep the ones the client does not have yet.
+
+        Args:
+            renderers: Dict of fragment name to a callable returning its HTML
+            known_digests: Mapping of fragment name to the digest the client has
+
+        Returns:
+            Dict of fragment name to {'html', 'digest'} for changed fragments
+        """
+        fragments = {}
+        for name, render in renderers.items():
+            html = str(render())
+            digest = TournamentLiveUpdates.get_digest(html)
+            if known_digests.get(name) != digest:
+                fragments[name] = {'html': html, 'digest': digest}
+        return fragments
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from tourney.pairing_benchmark import (
+    BENCHMARK_FIELDS, BENCHMARK_SETTINGS_MODULE, create_memory_schema,
+    get_benchmark_strategy_names, run_pairing_benchmark)
+
+
+class Command(BaseCommand):
+    help = 'Simulate tournaments for each pairing strategy and report per-round timing and pairing quality'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--players', type=int, nargs='+', default=[8, 16, 32, 64],
+            help='Field sizes to simulate')
+        parser.add_argument(
+            '--rounds', type=int, default=5,
+            help='Maximum number of rounds per simulated tournament')
+        parser.add_argument(
+            '--strategy', dest='strategies', action='append', default=None,
+            help='Strategy to benchmark, may be repeated (default: all automatic strategies)')
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Seed for reproducible pairings and results')
+        parser.add_argument(
+            '--database', default=None,
+            help='Configured database alias to simulate in, inside a rolled back '
+                 'transaction (default: a throwaway in-memory SQLite database)')
+        parser.add_argument(
+            '--format', choices=['json', 'csv'], default='json',
+            help='Output format')
+        parser.add_argument(
+            '--output', default=None,
+            help='Write results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        strategy_names = options['strategies']
+        if strategy_names:
+            available = get_benchmark_strategy_names()
+            unknown = [name for name in strategy_names if name not in available]
+            if unknown:
+                raise CommandError(
+                    f'Unknown or self-scheduled strategies: {", ".join(unknown)}. '
+                    f'Available: {", ".join(available)}')
+
+        database = options['database']
+        if database is None:
+            results = self._run_in_memory(options)
+        elif database in connections:
+            if settings.SETTINGS_MODULE == BENCHMARK_SETTINGS_MODULE:
+                create_memory_schema(database)
+            rows = run_pairing_benchmark(
+                options['players'], options['rounds'], strategy_names,
+                options['seed'], using=database)
+            buffer = io.StringIO()
+            self._write_rows(rows, options['format'], buffer)
+            results = buffer.getvalue()
+        else:
+            raise CommandError(f'Unknown database alias: {database}')
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.write(results)
+            self.stdout.write(self.style.SUCCESS(
+                f'Wrote benchmark results to {options["output"]}'))
+        else:
+            self.stdout.write(results, ending='')
+
+    def _run_in_memory(self, options):
+        """
+        Re-run this command in a child process with BENCHMARK_SETTINGS_MODULE,
+        so the simulation never sees the configured databases.
+        """
+        arguments = ['--players', *map(str, options['players']),
+                     '--rounds', str(options['rounds']),
+                     '--format', options['format']]
+        for strategy_name in options['strategies'] or []:
+            arguments += ['--strategy', strategy_name]
+        if options['seed'] is not None:
+            arguments += ['--seed', str(options['seed'])]
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'django', 'benchmark_pairings', *arguments,
+             '--database', DEFAULT_DB_ALIAS,
+             '--settings', BENCHMARK_SETTINGS_MODULE,
+             '--pythonpath', settings.BASE_DIR],
+            capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(f'Benchmark process failed:\n{result.stderr}')
+        return result.stdout
+
+    def _write_rows(self, rows, output_format, output):
+        if output_format == 'json':
+            output.write(json.dumps(rows, indent=2) + '\n')
+            return
+
+        writer = csv.DictWriter(output, fieldnames=BENCHMARK_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict(
+                row, bye_recipient_scores=';'.join(str(s) for s in row['bye_recipient_scores'])))
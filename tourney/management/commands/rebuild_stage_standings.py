@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from tourney.models import Stage, StandingMaterializer
+
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized stage standings and verify them against a full recompute'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tournament', dest='tournament_code', default=None,
+            help='Only process stages of the tournament with this code')
+        parser.add_argument(
+            '--verify-only', action='store_true',
+            help='Report mismatches without rewriting any rows')
+
+    def handle(self, *args, **options):
+        stages = Stage.objects.select_related('tournament').order_by(
+            'tournament_id', 'order')
+        if options['tournament_code']:
+            stages = stages.filter(
+                tournament__code=options['tournament_code'])
+
+        num_stages = 0
+        num_mismatched_stages = 0
+        for stage in stages:
+            num_stages += 1
+            mismatches = StandingMaterializer.verify_stage(stage)
+            if mismatches:
+                num_mismatched_stages += 1
+                self.stdout.write(self.style.WARNING(
+                    f'{stage}: {len(mismatches)} mismatched values'))
+                for stage_player, field, stored, expected in mismatches:
+                    if field is None:
+                        self.stdout.write(f'  {stage_player}: missing row')
+                    else:
+                        self.stdout.write(
+                            f'  {stage_player}: {field} is {stored}, expected {expected}')
+
+            if not options['verify_only']:
+                StandingMaterializer.rebuild_stage(stage)
+
+        action = 'Verified' if options['verify_only'] else 'Rebuilt'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {num_stages} stages ({num_mismatched_stages} with mismatches)'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.13 on 2026-10-17 12:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourney', '0020_add_stageplayer_tiebreaker_value'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StagePlayerStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wins', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('ties', models.IntegerField(default=0)),
+                ('byes', models.IntegerField(default=0)),
+                ('total_matches', models.IntegerField(default=0)),
+                ('player_score', models.IntegerField(default=0)),
+                ('opponent_score', models.IntegerField(default=0)),
+                ('num_opponents', models.IntegerField(default=0)),
+                ('opponent_points', models.IntegerField(default=0)),
+                ('stage_player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='standing', to='tourney.stageplayer')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-17 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourney', '0021_stageplayerstanding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='revision',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Bumped on every change that affects the tournament detail pages'),
+        ),
+    ]
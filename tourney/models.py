@@ -1,7 +1,10 @@
+from collections import defaultdict
 from enum import unique
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models import UniqueConstraint
+from django.db import models, transaction
+from django.db.models import F, UniqueConstraint
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from django.db.models import Q
 from django.utils.crypto import get_random_string
@@ -47,6 +50,9 @@ class Tournament(models.Model):
     )
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
+    revision = models.PositiveIntegerField(
+        default=0, editable=False,
+        help_text="Bumped on every change that affects the tournament detail pages")
 
     class Meta:
         ordering = ['-created_on']
@@ -58,8 +64,22 @@ class Tournament(models.Model):
         # Generate code if it doesn't exist
         if not self.code:
             self.code = generate_tournament_code()
+        # The revision only moves through bump_revision(), so never write back
+        # a possibly stale in-memory value when updating an existing row.
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'revision']
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def bump_revision(**filters):
+        """
+        Advance the revision of the tournaments matching filters, which
+        invalidates their cached detail page fragments.
+        """
+        Tournament.objects.filter(**filters).update(revision=F('revision') + 1)
+
     def is_user_admin(self, user):
         if user == self.owner:
             return True
@@ -352,6 +372,9 @@ class TournamentAdmin(models.Model):
 
 
 class RankingCriterion(ABC):
+    # Standings cache field holding this criterion's value, if there is one
+    cache_field = None
+
     @abstractmethod
     def get_key(self):
         pass
@@ -368,12 +391,25 @@ class RankingCriterion(ABC):
     def calculate_value(self, stage_player, stage, standings_cache=None):
         pass
 
+    def calculate_values(self, stage_players, stage, standings_cache):
+        """
+        Values for every stage player at once, in stage_players order.
+        standings_cache must have an entry for each of them.
+        """
+        if self.cache_field:
+            field = self.cache_field
+            return [standings_cache[stage_player.id][field] for stage_player in stage_players]
+        return [self.calculate_value(stage_player, stage, standings_cache)
+                for stage_player in stage_players]
+
     @abstractmethod
     def is_descending(self):
         pass
 
 
 class WinsRankingCriterion(RankingCriterion):
+    cache_field = 'wins'
+
     def get_key(self):
         return 'wins'
 
@@ -397,6 +433,8 @@ class WinsRankingCriterion(RankingCriterion):
 
 
 class LossesRankingCriterion(RankingCriterion):
+    cache_field = 'losses'
+
     def get_key(self):
         return 'losses'
 
@@ -421,6 +459,8 @@ class LossesRankingCriterion(RankingCriterion):
 
 
 class PointsRankingCriterion(RankingCriterion):
+    cache_field = 'points'
+
     def get_key(self):
         return 'points'
 
@@ -453,6 +493,8 @@ class PointsRankingCriterion(RankingCriterion):
 
 
 class StrengthOfScheduleRankingCriterion(RankingCriterion):
+    cache_field = 'strength_of_schedule'
+
     def get_key(self):
         return 'strength_of_schedule'
 
@@ -519,11 +561,16 @@ class HeadToHeadRankingCriterion(RankingCriterion):
     def calculate_value(self, stage_player, stage, standings_cache=None):
         return 0
 
+    def calculate_values(self, stage_players, stage, standings_cache):
+        return [0] * len(stage_players)
+
     def is_descending(self):
         return True
 
 
 class SeedRankingCriterion(RankingCriterion):
+    cache_field = 'seed'
+
     def get_key(self):
         return 'seed'
 
@@ -556,11 +603,16 @@ class RandomRankingCriterion(RankingCriterion):
     def calculate_value(self, stage_player, stage, standings_cache=None):
         return stage_player.tiebreaker_value
 
+    def calculate_values(self, stage_players, stage, standings_cache):
+        return [stage_player.tiebreaker_value for stage_player in stage_players]
+
     def is_descending(self):
         return False
 
 
 class PlayerScoreRankingCriterion(RankingCriterion):
+    cache_field = 'player_score'
+
     def get_key(self):
         return 'player_score'
 
@@ -591,6 +643,8 @@ class PlayerScoreRankingCriterion(RankingCriterion):
 
 
 class OpponentScoreRankingCriterion(RankingCriterion):
+    cache_field = 'opponent_score'
+
     def get_key(self):
         return 'opponent_score'
 
@@ -648,11 +702,17 @@ class ScoreDifferentialRankingCriterion(RankingCriterion):
 
         return player_score - opponent_score
 
+    def calculate_values(self, stage_players, stage, standings_cache):
+        entries = [standings_cache[stage_player.id] for stage_player in stage_players]
+        return [entry['player_score'] - entry['opponent_score'] for entry in entries]
+
     def is_descending(self):
         return True
 
 
 class GamesPlayedRankingCriterion(RankingCriterion):
+    cache_field = 'games_played'
+
     def get_key(self):
         return 'games_played'
 
@@ -922,6 +982,71 @@ class StagePlayer(models.Model):
         return f'{self.player.get_display_name()} (Seed {self.seed}) - {self.stage}'
 
 
+class StagePlayerStanding(models.Model):
+    """
+    Materialized per-stage standing totals for a StagePlayer.
+
+    Rows are kept in step with Match and MatchResult writes by
+    StandingMaterializer, so reading standings never rescans the stage's
+    matches. Strength of schedule is stored as its inputs (the summed points
+    of every opponent faced and the number of opponents) so it stays correct
+    as opponents keep playing.
+    """
+    stage_player = models.OneToOneField(
+        StagePlayer, on_delete=models.CASCADE, related_name='standing')
+    wins = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    ties = models.IntegerField(default=0)
+    byes = models.IntegerField(default=0)
+    total_matches = models.IntegerField(default=0)
+    player_score = models.IntegerField(default=0)
+    opponent_score = models.IntegerField(default=0)
+    num_opponents = models.IntegerField(default=0)
+    opponent_points = models.IntegerField(default=0)
+
+    COUNTER_FIELDS = (
+        'wins', 'losses', 'ties', 'byes', 'total_matches', 'player_score',
+        'opponent_score', 'num_opponents', 'opponent_points',
+    )
+
+    def __str__(self):
+        return f'Standing - {self.stage_player}'
+
+    def get_points(self):
+        return self.wins * 2 + self.ties * 1
+
+    def to_cache_entry(self, stage_player):
+        """Shape this row like a StandingCalculator standings cache entry."""
+        return StagePlayerStanding.build_cache_entry(
+            {field: getattr(self, field) for field in self.COUNTER_FIELDS},
+            stage_player.seed)
+
+    @staticmethod
+    def build_cache_entry(counters, seed):
+        """
+        Build a standings cache entry from a dict of COUNTER_FIELDS values,
+        e.g. one read with values_list() without instantiating the row.
+        """
+        num_opponents = counters['num_opponents']
+        return {
+            'wins': counters['wins'],
+            'losses': counters['losses'],
+            'ties': counters['ties'],
+            'byes': counters['byes'],
+            'points': counters['wins'] * 2 + counters['ties'] * 1,
+            'total_matches': counters['total_matches'],
+            'games_played': counters['total_matches'],
+            'strength_of_schedule': (
+                counters['opponent_points'] / num_opponents
+                if num_opponents else 0),
+            'seed': seed,
+            'player_score': counters['player_score'],
+            'opponent_score': counters['opponent_score'],
+            'num_opponents': num_opponents,
+            'opponent_points': counters['opponent_points'],
+        }
+
+
 class Round(models.Model):
     order = models.PositiveIntegerField(default=1)
     stage = models.ForeignKey(
@@ -1011,30 +1136,13 @@ class StandingCalculator:
 
     @staticmethod
     def get_stage_standings(stage):
-        from django.db.models import Count, Q
-
-        stage_players = stage.stage_players.all()
+        stage_players = list(stage.stage_players.select_related('player__user'))
         if not stage_players:
             return []
 
-        standings_cache = StandingCalculator._build_standings_cache(
+        standings_cache = StandingCalculator._load_standings_cache(
             stage_players, stage)
 
-        standings = []
-        for stage_player in stage_players:
-            standing_data = {
-                'stage_player': stage_player,
-                'wins': standings_cache[stage_player.id]['wins'],
-                'losses': standings_cache[stage_player.id]['losses'],
-                'byes': standings_cache[stage_player.id]['byes'],
-                'ties': standings_cache[stage_player.id]['ties'],
-                'points': standings_cache[stage_player.id]['points'],
-                'total_matches': standings_cache[stage_player.id]['total_matches'],
-                'strength_of_schedule': standings_cache[stage_player.id]['strength_of_schedule'],
-                'seed': standings_cache[stage_player.id]['seed'],
-            }
-            standings.append(standing_data)
-
         criteria_objects = stage.get_enabled_ranking_criteria_objects()
         if not criteria_objects:
             criteria_objects = [
@@ -1044,26 +1152,30 @@ class StandingCalculator:
                 SeedRankingCriterion(),
             ]
 
-        for criterion in criteria_objects:
-            for standing in standings:
-                key = criterion.get_key()
-                standing[f'{key}_value'] = criterion.calculate_value(
-                    standing['stage_player'], stage, standings_cache
-                )
-
-        def sort_key(standing):
-            sort_values = []
-            for criterion in criteria_objects:
-                key = criterion.get_key()
-                value = standing.get(f'{key}_value', 0)
-                if criterion.is_descending():
-                    sort_values.append(-value if isinstance(value,
-                                       (int, float)) else value)
-                else:
-                    sort_values.append(value)
-            return tuple(sort_values)
+        columns = [
+            criterion.calculate_values(stage_players, stage, standings_cache)
+            for criterion in criteria_objects
+        ]
+        order = StandingCalculator._rank_by_columns(criteria_objects, columns)
 
-        standings.sort(key=sort_key)
+        standings = []
+        for index in order:
+            stage_player = stage_players[index]
+            cached = standings_cache[stage_player.id]
+            standing_data = {
+                'stage_player': stage_player,
+                'wins': cached['wins'],
+                'losses': cached['losses'],
+                'byes': cached['byes'],
+                'ties': cached['ties'],
+                'points': cached['points'],
+                'total_matches': cached['total_matches'],
+                'strength_of_schedule': cached['strength_of_schedule'],
+                'seed': cached['seed'],
+            }
+            for criterion, column in zip(criteria_objects, columns):
+                standing_data[f'{criterion.get_key()}_value'] = column[index]
+            standings.append(standing_data)
 
         StandingCalculator._resolve_head_to_head_ties(
             standings, stage, criteria_objects)
@@ -1073,6 +1185,42 @@ class StandingCalculator:
 
         return standings
 
+    @staticmethod
+    def _rank_by_columns(criteria_objects, columns):
+        """
+        Order row indexes by the criteria columns, first criterion first.
+
+        This is a lexicographic sort done as one stable sort per column from
+        the last criterion to the first, so rows tied on every criterion keep
+        their original order.
+        """
+        order = list(range(len(columns[0]) if columns else 0))
+        for criterion, column in reversed(list(zip(criteria_objects, columns))):
+            order.sort(key=column.__getitem__, reverse=criterion.is_descending())
+        return order
+
+    @staticmethod
+    def _load_standings_cache(stage_players, stage):
+        """
+        Read the standings cache from the materialized StagePlayerStanding
+        rows. Stages that were never materialized (or are missing rows) are
+        rebuilt from their matches first.
+        """
+        fields = StagePlayerStanding.COUNTER_FIELDS
+        rows = {
+            values[0]: dict(zip(fields, values[1:]))
+            for values in StagePlayerStanding.objects.filter(
+                stage_player__stage=stage).values_list('stage_player_id', *fields)
+        }
+        if any(stage_player.id not in rows for stage_player in stage_players):
+            return StandingMaterializer.rebuild_stage(stage, stage_players)
+
+        return {
+            stage_player.id: StagePlayerStanding.build_cache_entry(
+                rows[stage_player.id], stage_player.seed)
+            for stage_player in stage_players
+        }
+
     @staticmethod
     def _build_standings_cache(stage_players, stage):
         cache = {}
@@ -1090,6 +1238,8 @@ class StandingCalculator:
                 'seed': stage_player.seed,
                 'player_score': 0,
                 'opponent_score': 0,
+                'num_opponents': 0,
+                'opponent_points': 0,
             }
             opponents[stage_player.id] = []
 
@@ -1154,6 +1304,8 @@ class StandingCalculator:
                 total_opponent_points = sum(
                     cache[opponent_id]['points']
                     for opponent_id in opponent_ids if opponent_id in cache)
+                cache[stage_player.id]['num_opponents'] = len(opponent_ids)
+                cache[stage_player.id]['opponent_points'] = total_opponent_points
                 cache[stage_player.id]['strength_of_schedule'] = (
                     total_opponent_points / len(opponent_ids))
 
@@ -1161,11 +1313,18 @@ class StandingCalculator:
 
     @staticmethod
     def _resolve_head_to_head_ties(standings, stage, criteria_objects):
+        """
+        Reorder groups of players tied on every criterion before head-to-head
+        by their mini-league among themselves (see _order_by_head_to_head).
+        Players head-to-head cannot separate keep their existing order, which
+        already reflects the criteria after head-to-head.
+        """
         has_head_to_head = any(
             c.get_key() == 'head_to_head' for c in criteria_objects)
         if not has_head_to_head:
             return
 
+        win_graph = None
         i = 0
         while i < len(standings) - 1:
             tied_group = [standings[i]]
@@ -1178,21 +1337,61 @@ class StandingCalculator:
                 j += 1
 
             if len(tied_group) > 1:
+                if win_graph is None:
+                    win_graph = StandingCalculator._load_head_to_head_graph(stage)
                 head_to_head_results = StandingCalculator._calculate_head_to_head(
-                    tied_group, stage)
+                    tied_group, stage, win_graph)
 
                 for standing in tied_group:
                     standing['head_to_head_value'] = head_to_head_results.get(
                         standing['stage_player'].id, 0)
 
-                tied_group.sort(key=lambda x: head_to_head_results.get(
-                    x['stage_player'].id, 0), reverse=True)
+                tied_group = StandingCalculator._order_by_head_to_head(
+                    tied_group, win_graph, head_to_head_results)
 
                 for k, standing in enumerate(tied_group):
                     standings[i + k] = standing
 
             i = j
 
+    @staticmethod
+    def _order_by_head_to_head(tied_group, win_graph, head_to_head_results=None):
+        """
+        Order a tied group by its mini-league: each player's wins against the
+        other players in the group.
+
+        Players still level after that form a smaller tied group whose own
+        mini-league is applied in turn, e.g. in a three-way tie the two
+        players level on one win each are then split by their own match.
+        Recursion stops when a mini-league separates nobody; those players
+        keep their existing relative order.
+        """
+        if head_to_head_results is None:
+            head_to_head_results = StandingCalculator._calculate_head_to_head(
+                tied_group, None, win_graph)
+
+        def head_to_head_value(standing):
+            return head_to_head_results[standing['stage_player'].id]
+
+        ordered = sorted(tied_group, key=head_to_head_value, reverse=True)
+        if head_to_head_value(ordered[0]) == head_to_head_value(ordered[-1]):
+            return ordered
+
+        result = []
+        start = 0
+        while start < len(ordered):
+            end = start + 1
+            while (end < len(ordered) and
+                    head_to_head_value(ordered[end]) == head_to_head_value(ordered[start])):
+                end += 1
+            level_group = ordered[start:end]
+            if len(level_group) > 1:
+                level_group = StandingCalculator._order_by_head_to_head(
+                    level_group, win_graph)
+            result.extend(level_group)
+            start = end
+        return result
+
     @staticmethod
     def _are_tied_before_head_to_head(standing1, standing2, criteria_objects):
         for criterion in criteria_objects:
@@ -1209,79 +1408,73 @@ class StandingCalculator:
         return True
 
     @staticmethod
-    def _calculate_head_to_head(tied_players, stage):
-        tied_ids = {standing['stage_player'].id for standing in tied_players}
-        results = {stage_player_id: 0 for stage_player_id in tied_ids}
-
+    def _load_head_to_head_graph(stage):
+        """
+        Build the stage's win graph in a single query: a dict mapping each
+        winning stage player id to {beaten opponent id: number of wins}.
+        """
+        win_graph = defaultdict(lambda: defaultdict(int))
         match_results = MatchResult.objects.filter(
             match__round__stage=stage,
             winner__isnull=False,
-        ).values('winner_id', 'match__player_one', 'match__player_two')
+        ).values_list('winner_id', 'match__player_one', 'match__player_two')
 
-        for match_result in match_results:
-            winner_id = match_result['winner_id']
-            if winner_id not in tied_ids:
-                continue
-
-            player_one_id = match_result['match__player_one']
-            player_two_id = match_result['match__player_two']
+        for winner_id, player_one_id, player_two_id in match_results:
             opponent_id = player_two_id if winner_id == player_one_id else player_one_id
+            if opponent_id is not None:
+                win_graph[winner_id][opponent_id] += 1
 
-            if opponent_id in tied_ids:
-                results[winner_id] += 1
-
-        return results
+        return win_graph
 
     @staticmethod
-    def _get_player_total_stats(player, tournament):
-        from django.db.models import Q
-
-        stage_players = StagePlayer.objects.filter(
-            player=player,
-            stage__tournament=tournament
-        )
-
-        total_wins = 0
-        total_losses = 0
-        total_ties = 0
-        total_byes = 0
-
-        for stage_player in stage_players:
-            stage = stage_player.stage
+    def _calculate_head_to_head(tied_players, stage, win_graph=None):
+        if win_graph is None:
+            win_graph = StandingCalculator._load_head_to_head_graph(stage)
 
-            wins = MatchResult.objects.filter(
-                match__round__stage=stage,
-                winner=stage_player
-            ).count()
+        tied_ids = {standing['stage_player'].id for standing in tied_players}
+        results = {}
+        for stage_player_id in tied_ids:
+            beaten = win_graph.get(stage_player_id, {})
+            results[stage_player_id] = sum(
+                wins for opponent_id, wins in beaten.items() if opponent_id in tied_ids)
+        return results
 
-            byes = MatchResult.objects.filter(
-                match__round__stage=stage,
-                winner=stage_player,
-                match__player_two__isnull=True
-            ).count()
+    @staticmethod
+    def _get_tournament_total_stats(tournament):
+        """
+        Cross-stage win/loss/tie/bye totals for every player in a tournament.
 
-            losses = MatchResult.objects.filter(
-                Q(match__player_one=stage_player) | Q(match__player_two=stage_player),
-                match__round__stage=stage
-            ).exclude(winner=stage_player).exclude(winner=None).count()
+        Results are aggregated once per match seat (player one, player two),
+        so the cost is two grouped queries regardless of the number of
+        players or stages. Returns a dict keyed by Player id; players without
+        any results are absent.
+        """
+        from django.db.models import Count
 
-            ties = MatchResult.objects.filter(
-                Q(match__player_one=stage_player) | Q(match__player_two=stage_player),
-                match__round__stage=stage,
-                winner=None
-            ).count()
+        totals = defaultdict(
+            lambda: {'wins': 0, 'losses': 0, 'ties': 0, 'byes': 0})
+        results = MatchResult.objects.filter(
+            match__round__stage__tournament=tournament)
+
+        for seat in ('player_one', 'player_two'):
+            seat_id = f'match__{seat}_id'
+            is_winner = Q(winner_id=F(seat_id))
+            rows = results.filter(**{f'match__{seat}__isnull': False}).values(
+                f'match__{seat}__player_id'
+            ).annotate(
+                wins=Count('id', filter=is_winner),
+                losses=Count('id', filter=Q(winner__isnull=False) & ~is_winner),
+                ties=Count('id', filter=Q(winner__isnull=True)),
+                byes=Count('id', filter=is_winner & Q(
+                    match__player_two__isnull=True)),
+            )
 
-            total_wins += wins
-            total_losses += losses
-            total_ties += ties
-            total_byes += byes
+            for row in rows:
+                player_totals = totals[row[f'match__{seat}__player_id']]
+                for key in ('wins', 'losses', 'ties', 'byes'):
+                    player_totals[key] += row[key]
 
-        return {
-            'wins': total_wins,
-            'losses': total_losses,
-            'ties': total_ties,
-            'byes': total_byes,
-        }
+        return totals
 
     @staticmethod
     def get_tournament_standings(tournament):
@@ -1293,20 +1486,22 @@ class StandingCalculator:
         2. Active players rank ahead of dropped players
         3. Standing is determined by rank in highest stage achieved, or current live standings
         """
-        from django.db.models import Count, Q, Max
-
         current_stage = tournament.get_current_stage()
         if not current_stage:
             return []
 
         # Get all players registered for the tournament
-        all_players = tournament.players.all()
+        all_players = list(tournament.players.all())
         if not all_players:
             return []
 
         # Get current stage standings first (properly sorted)
         current_standings = StandingCalculator.get_stage_standings(
             current_stage)
+        enabled_criteria = current_stage.get_enabled_ranking_criteria_objects()
+        all_total_stats = StandingCalculator._get_tournament_total_stats(
+            tournament)
+        empty_stats = {'wins': 0, 'losses': 0, 'ties': 0, 'byes': 0}
 
         # Build final standings starting with current stage players
         final_standings = []
@@ -1319,8 +1514,7 @@ class StandingCalculator:
             player = current_standing['stage_player'].player
             current_stage_player_ids.add(player.id)
 
-            total_stats = StandingCalculator._get_player_total_stats(
-                player, tournament)
+            total_stats = all_total_stats.get(player.id, empty_stats)
 
             standing_data = {
                 'player': player,
@@ -1340,7 +1534,7 @@ class StandingCalculator:
             }
 
             # Add criterion values for current stage
-            for criterion in current_stage.get_enabled_ranking_criteria_objects():
+            for criterion in enabled_criteria:
                 key = criterion.get_key()
                 standing_data[f'{key}_value'] = current_standing.get(
                     f'{key}_value', None)
@@ -1355,26 +1549,30 @@ class StandingCalculator:
         final_standings.extend(current_stage_active_players)
         final_standings.extend(current_stage_dropped_players)
 
+        # Find the highest stage each remaining player achieved in one query
+        highest_stage_players = {}
+        other_stage_players = StagePlayer.objects.filter(
+            stage__tournament=tournament
+        ).exclude(
+            player_id__in=current_stage_player_ids
+        ).select_related('stage', 'player__user').order_by('-stage__order')
+        for stage_player in other_stage_players:
+            highest_stage_players.setdefault(stage_player.player_id, stage_player)
+
         # Then add players from other stages/not in current stage
         other_players = []
         for player in all_players:
             if player.id in current_stage_player_ids:
                 continue  # Already added above
 
-            # Find the highest stage this player achieved
-            player_stages = StagePlayer.objects.filter(
-                player=player,
-                stage__tournament=tournament
-            ).order_by('-stage__order')
-
-            if not player_stages:
+            highest_stage_player = highest_stage_players.get(player.id)
+            if not highest_stage_player:
                 continue
 
-            highest_stage_player = player_stages.first()
+            player = highest_stage_player.player
             highest_stage = highest_stage_player.stage
 
-            total_stats = StandingCalculator._get_player_total_stats(
-                player, tournament)
+            total_stats = all_total_stats.get(player.id, empty_stats)
 
             standing_data = {
                 'player': player,
@@ -1394,7 +1592,7 @@ class StandingCalculator:
             }
 
             # Set criterion values to None (will show as dashes)
-            for criterion in current_stage.get_enabled_ranking_criteria_objects():
+            for criterion in enabled_criteria:
                 key = criterion.get_key()
                 standing_data[f'{key}_value'] = None
 
@@ -1412,6 +1610,207 @@ class StandingCalculator:
         return final_standings
 
 
+class StandingMaterializer:
+    """
+    Keeps StagePlayerStanding rows in step with match writes.
+
+    Every Match and MatchResult change is applied as a signed delta: the old
+    state is subtracted and the new state added. Points changes are pushed to
+    the opponent_points of everyone the player has faced, so strength of
+    schedule never needs a stage-wide rescan.
+    """
+
+    @staticmethod
+    def _new_deltas():
+        return defaultdict(lambda: defaultdict(int))
+
+    @staticmethod
+    def _apply_deltas(deltas):
+        for stage_player_id, fields in deltas.items():
+            updates = {field: F(field) + value
+                       for field, value in fields.items() if value}
+            if stage_player_id is None or not updates:
+                continue
+            StagePlayerStanding.objects.filter(
+                stage_player_id=stage_player_id).update(**updates)
+
+    @staticmethod
+    def _get_opponent_ids(stage_player_ids):
+        """Map each stage player to the opponents faced, one entry per match."""
+        opponents = defaultdict(list)
+        matches = Match.objects.filter(
+            Q(player_one_id__in=stage_player_ids) |
+            Q(player_two_id__in=stage_player_ids)
+        ).values_list('player_one_id', 'player_two_id')
+
+        for player_one_id, player_two_id in matches:
+            if player_one_id in stage_player_ids and player_two_id is not None:
+                opponents[player_one_id].append(player_two_id)
+            if player_two_id in stage_player_ids:
+                opponents[player_two_id].append(player_one_id)
+
+        return opponents
+
+    @staticmethod
+    def _add_match_deltas(deltas, player_one_id, player_two_id, points, sign=1):
+        deltas[player_one_id]['total_matches'] += sign
+
+        if player_two_id is not None:
+            deltas[player_two_id]['total_matches'] += sign
+            deltas[player_one_id]['num_opponents'] += sign
+            deltas[player_two_id]['num_opponents'] += sign
+            deltas[player_one_id]['opponent_points'] += (
+                sign * points.get(player_two_id, 0))
+            deltas[player_two_id]['opponent_points'] += (
+                sign * points.get(player_one_id, 0))
+
+    @staticmethod
+    def _get_points(stage_player_ids):
+        return {
+            row.stage_player_id: row.get_points()
+            for row in StagePlayerStanding.objects.filter(
+                stage_player_id__in=stage_player_ids)
+        }
+
+    @staticmethod
+    def apply_match(player_one_id, player_two_id, sign=1):
+        """Add (or with sign=-1 remove) a pairing, ignoring any result."""
+        deltas = StandingMaterializer._new_deltas()
+        points = {}
+        if player_two_id is not None:
+            points = StandingMaterializer._get_points(
+                [player_one_id, player_two_id])
+        StandingMaterializer._add_match_deltas(
+            deltas, player_one_id, player_two_id, points, sign)
+        StandingMaterializer._apply_deltas(deltas)
+
+    @staticmethod
+    def apply_result(player_one_id, player_two_id, winner_id,
+                     player_one_score, player_two_score, sign=1):
+        """Add (or with sign=-1 remove) a result for an existing pairing."""
+        deltas = StandingMaterializer._new_deltas()
+
+        deltas[player_one_id]['player_score'] += sign * (player_one_score or 0)
+        deltas[player_one_id]['opponent_score'] += sign * (player_two_score or 0)
+        if player_two_id is not None:
+            deltas[player_two_id]['player_score'] += sign * (player_two_score or 0)
+            deltas[player_two_id]['opponent_score'] += sign * (player_one_score or 0)
+
+        if winner_id is None:
+            deltas[player_one_id]['ties'] += sign
+            if player_two_id is not None:
+                deltas[player_two_id]['ties'] += sign
+        else:
+            deltas[winner_id]['wins'] += sign
+            if player_two_id is None:
+                deltas[winner_id]['byes'] += sign
+            loser_id = player_two_id if winner_id == player_one_id else player_one_id
+            if loser_id is not None:
+                deltas[loser_id]['losses'] += sign
+
+        StandingMaterializer._apply_deltas(deltas)
+
+        point_deltas = {
+            stage_player_id: fields['wins'] * 2 + fields['ties'] * 1
+            for stage_player_id, fields in deltas.items()
+            if stage_player_id is not None
+        }
+        point_deltas = {k: v for k, v in point_deltas.items() if v}
+        if not point_deltas:
+            return
+
+        propagation = StandingMaterializer._new_deltas()
+        opponents = StandingMaterializer._get_opponent_ids(set(point_deltas))
+        for stage_player_id, points_delta in point_deltas.items():
+            for opponent_id in opponents[stage_player_id]:
+                propagation[opponent_id]['opponent_points'] += points_delta
+        StandingMaterializer._apply_deltas(propagation)
+
+    @staticmethod
+    def record_new_matches(matches):
+        """
+        Account for matches created without save signals (bulk_create): update
+        standings and bump the tournament revision.
+        """
+        if not matches:
+            return
+
+        # New pairings change no one's points, so one read serves every match
+        # and the deltas add up to a single update per player
+        points = StandingMaterializer._get_points({
+            stage_player_id
+            for match in matches
+            for stage_player_id in (match.player_one_id, match.player_two_id)
+            if stage_player_id is not None
+        })
+        deltas = StandingMaterializer._new_deltas()
+        for match in matches:
+            StandingMaterializer._add_match_deltas(
+                deltas, match.player_one_id, match.player_two_id, points)
+
+        with transaction.atomic():
+            StandingMaterializer._apply_deltas(deltas)
+            Tournament.bump_revision(stages__rounds__id=matches[0].round_id)
+
+    @staticmethod
+    def rebuild_stage(stage, stage_players=None):
+        """
+        Recompute every StagePlayerStanding row of a stage from its matches.
+
+        Returns the standings cache that was written.
+        """
+        if stage_players is None:
+            stage_players = list(stage.stage_players.all())
+
+        with transaction.atomic():
+            # Lock the stage so concurrent first reads of an unmaterialized
+            # stage rebuild one after the other instead of both inserting
+            Stage.objects.select_for_update().get(pk=stage.pk)
+            cache = StandingCalculator._build_standings_cache(stage_players, stage)
+            StagePlayerStanding.objects.filter(
+                stage_player__stage=stage).delete()
+            StagePlayerStanding.objects.bulk_create([
+                StagePlayerStanding(
+                    stage_player=stage_player,
+                    **{field: cache[stage_player.id][field]
+                       for field in StagePlayerStanding.COUNTER_FIELDS}
+                )
+                for stage_player in stage_players
+            ])
+
+        return cache
+
+    @staticmethod
+    def verify_stage(stage):
+        """
+        Compare the materialized rows of a stage against a full recompute.
+
+        Returns a list of (stage_player, field, stored, expected) mismatches.
+        A missing row is reported with field None.
+        """
+        stage_players = list(stage.stage_players.all())
+        expected = StandingCalculator._build_standings_cache(
+            stage_players, stage)
+        rows = {
+            row.stage_player_id: row
+            for row in StagePlayerStanding.objects.filter(stage_player__stage=stage)
+        }
+
+        mismatches = []
+        for stage_player in stage_players:
+            row = rows.get(stage_player.id)
+            if row is None:
+                mismatches.append((stage_player, None, None, None))
+                continue
+            for field in StagePlayerStanding.COUNTER_FIELDS:
+                stored = getattr(row, field)
+                if stored != expected[stage_player.id][field]:
+                    mismatches.append(
+                        (stage_player, field, stored, expected[stage_player.id][field]))
+
+        return mismatches
+
+
 class TournamentActionLog(models.Model):
     class ActionType(models.TextChoices):
         CREATE_TOURNAMENT = 'create_tournament', _('Create Tournament')
@@ -1454,3 +1853,128 @@ class TournamentTimer(models.Model):
 
     def __str__(self):
         return f'{self.tournament.name} - {self.timer.name}'
+
+
+@receiver(post_save, sender=StagePlayer)
+def create_stage_player_standing(sender, instance, created, **kwargs):
+    if created:
+        StagePlayerStanding.objects.get_or_create(stage_player=instance)
+
+
+@receiver(pre_save, sender=Match)
+def snapshot_match_players(sender, instance, **kwargs):
+    instance._standing_snapshot = None
+    if instance.pk and not instance._state.adding:
+        instance._standing_snapshot = Match.objects.filter(
+            pk=instance.pk).values_list('player_one_id', 'player_two_id').first()
+
+
+@receiver(post_save, sender=Match)
+def update_standings_for_match(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_standing_snapshot', None)
+    current = (instance.player_one_id, instance.player_two_id)
+    if not created and previous == current:
+        return
+
+    with transaction.atomic():
+        result = MatchResult.objects.filter(match=instance).values_list(
+            'winner_id', 'player_one_score', 'player_two_score').first()
+        if previous:
+            if result:
+                StandingMaterializer.apply_result(*previous, *result, sign=-1)
+            StandingMaterializer.apply_match(*previous, sign=-1)
+        StandingMaterializer.apply_match(*current)
+        if result:
+            StandingMaterializer.apply_result(*current, *result)
+
+
+@receiver(post_delete, sender=Match)
+def remove_standings_for_match(sender, instance, **kwargs):
+    with transaction.atomic():
+        StandingMaterializer.apply_match(
+            instance.player_one_id, instance.player_two_id, sign=-1)
+
+
+@receiver(pre_save, sender=MatchResult)
+def snapshot_match_result(sender, instance, **kwargs):
+    instance._standing_snapshot = None
+    if instance.pk and not instance._state.adding:
+        instance._standing_snapshot = MatchResult.objects.filter(
+            pk=instance.pk).values_list(
+            'winner_id', 'player_one_score', 'player_two_score').first()
+
+
+@receiver(post_save, sender=MatchResult)
+def update_standings_for_result(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_standing_snapshot', None)
+    current = (instance.winner_id, instance.player_one_score,
+               instance.player_two_score)
+    if not created and previous == current:
+        return
+
+    players = Match.objects.filter(pk=instance.match_id).values_list(
+        'player_one_id', 'player_two_id').first()
+    if players is None:
+        return
+
+    with transaction.atomic():
+        if previous:
+            StandingMaterializer.apply_result(*players, *previous, sign=-1)
+        StandingMaterializer.apply_result(*players, *current)
+
+
+@receiver(post_delete, sender=MatchResult)
+def remove_standings_for_result(sender, instance, **kwargs):
+    players = Match.objects.filter(pk=instance.match_id).values_list(
+        'player_one_id', 'player_two_id').first()
+    if players is None:
+        return
+
+    with transaction.atomic():
+        StandingMaterializer.apply_result(
+            *players, instance.winner_id, instance.player_one_score,
+            instance.player_two_score, sign=-1)
+
+
+def _is_tournament_cascade(kwargs):
+    # Rows deleted along with their tournament have nothing left to invalidate
+    return isinstance(kwargs.get('origin'), Tournament)
+
+
+@receiver(post_save, sender=Tournament)
+def bump_revision_for_tournament(sender, instance, **kwargs):
+    Tournament.bump_revision(pk=instance.pk)
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=Stage)
+@receiver(post_delete, sender=Stage)
+def bump_revision_for_tournament_child(sender, instance, **kwargs):
+    if not _is_tournament_cascade(kwargs):
+        Tournament.bump_revision(pk=instance.tournament_id)
+
+
+@receiver(post_save, sender=StagePlayer)
+@receiver(post_delete, sender=StagePlayer)
+@receiver(post_save, sender=Round)
+@receiver(post_delete, sender=Round)
+@receiver(post_save, sender=StageRankingCriteria)
+@receiver(post_delete, sender=StageRankingCriteria)
+def bump_revision_for_stage_child(sender, instance, **kwargs):
+    if not _is_tournament_cascade(kwargs):
+        Tournament.bump_revision(stages__id=instance.stage_id)
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def bump_revision_for_match(sender, instance, **kwargs):
+    if not _is_tournament_cascade(kwargs):
+        Tournament.bump_revision(stages__rounds__id=instance.round_id)
+
+
+@receiver(post_save, sender=MatchResult)
+@receiver(post_delete, sender=MatchResult)
+def bump_revision_for_match_result(sender, instance, **kwargs):
+    if not _is_tournament_cascade(kwargs):
+        Tournament.bump_revision(stages__rounds__matches__id=instance.match_id)
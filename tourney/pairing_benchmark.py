@@ -0,0 +1,238 @@
+"""
+Pairing benchmark harness.
+
+Simulates complete tournaments for registered pairing strategies and records
+per-round timing and pairing quality, so that changes to the pairing code can
+be compared numerically. Every simulation runs inside a transaction that is
+rolled back, and every query it makes is routed to the database alias it is
+given. The benchmark_pairings command runs in a child process with
+BENCHMARK_SETTINGS_MODULE by default, whose only database is a throwaway
+in-memory SQLite one, so benchmarks need not touch a real database at all.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from .models import Match, MatchResult, Player, Round, Stage, StagePlayer, Tournament
+from .pairing_strategies import get_available_strategies, get_pairing_strategy
+
+
+BENCHMARK_SETTINGS_MODULE = 'sloppy_labwork.benchmark_settings'
+
+BENCHMARK_FIELDS = [
+    'strategy', 'players', 'round', 'wall_time_ms', 'queries', 'matches',
+    'byes', 'repeat_pairings', 'score_group_mismatches', 'repeat_byes',
+    'bye_recipient_scores',
+]
+
+
+class _AliasRouter:
+    def __init__(self, alias):
+        self.alias = alias
+
+    def db_for_read(self, model, **hints):
+        return self.alias
+
+    def db_for_write(self, model, **hints):
+        return self.alias
+
+
+@contextmanager
+def use_database(alias):
+    """Route every query made inside the block to alias."""
+    if alias == DEFAULT_DB_ALIAS:
+        yield
+        return
+    with override_settings(DATABASE_ROUTERS=[_AliasRouter(alias), *settings.DATABASE_ROUTERS]):
+        yield
+
+
+def create_memory_schema(using=DEFAULT_DB_ALIAS):
+    """
+    Create every table straight from the current models, skipping
+    migrations. Only meant for the empty in-memory database of
+    BENCHMARK_SETTINGS_MODULE.
+    """
+    with connections[using].schema_editor() as schema_editor:
+        for model in apps.get_models():
+            if model._meta.managed and not model._meta.proxy:
+                schema_editor.create_model(model)
+    call_command('createcachetable', database=using, verbosity=0)
+
+
+def get_benchmark_strategy_names():
+    """
+    Names of the registered strategies that create pairings automatically.
+    """
+    return [
+        name for name, strategy_class in get_available_strategies().items()
+        if not strategy_class().is_self_scheduled()
+    ]
+
+
+def run_pairing_benchmark(player_counts, num_rounds, strategy_names=None, seed=None,
+                          favorite_win_rate=0.6, using=DEFAULT_DB_ALIAS):
+    """
+    Benchmark each strategy at each field size.
+
+    Args:
+        player_counts: Iterable of field sizes to simulate
+        num_rounds: Maximum number of rounds per simulated tournament
+        strategy_names: Strategies to benchmark, defaults to all automatic ones
+        seed: Optional seed for reproducible pairings and results
+        favorite_win_rate: Chance that the better seeded player wins a match
+        using: Database alias to simulate in
+
+    Returns:
+        List of per-round result dicts keyed by BENCHMARK_FIELDS
+    """
+    if strategy_names is None:
+        strategy_names = get_benchmark_strategy_names()
+
+    rows = []
+    for strategy_name in strategy_names:
+        for num_players in player_counts:
+            rows.extend(simulate_strategy(
+                strategy_name, num_players, num_rounds, seed, favorite_win_rate, using))
+    return rows
+
+
+def simulate_strategy(strategy_name, num_players, num_rounds, seed=None,
+                      favorite_win_rate=0.6, using=DEFAULT_DB_ALIAS):
+    """
+    Simulate one tournament and measure each round's pairing.
+
+    Wall time and query count only cover make_pairings_for_round. Results are
+    then reported with the better seeded player winning favorite_win_rate of
+    the time. The simulation stops early when the strategy cannot create
+    another round or a round produces no real match. Pairings and results
+    draw from one random.Random(seed), leaving the global generator alone.
+
+    Returns:
+        List of per-round result dicts keyed by BENCHMARK_FIELDS
+    """
+    rng = random.Random(seed)
+    connection = connections[using]
+
+    rows = []
+    with use_database(using), transaction.atomic(using=using):
+        stage = _create_benchmark_stage(strategy_name, num_players)
+        strategy = get_pairing_strategy(strategy_name)
+        strategy.rng = rng
+
+        wins = {}
+        played_pairs = set()
+        bye_recipients = set()
+
+        for round_number in range(1, num_rounds + 1):
+            if round_number > 1 and not strategy.can_create_new_round(stage):
+                break
+
+            round_obj = Round.objects.create(stage=stage, order=round_number)
+            # The query log is a bounded deque; clear it so the capture
+            # below cannot be truncated by earlier rounds.
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                strategy.make_pairings_for_round(round_obj)
+                elapsed = time.perf_counter() - start
+
+            matches = list(Match.objects.filter(round=round_obj).select_related(
+                'player_one', 'player_two', 'result'))
+            row = {
+                'strategy': strategy_name,
+                'players': num_players,
+                'round': round_number,
+                'wall_time_ms': round(elapsed * 1000, 3),
+                'queries': len(queries),
+            }
+            row.update(_measure_round(matches, wins, played_pairs, bye_recipients))
+            rows.append(row)
+
+            _report_results(matches, wins, rng, favorite_win_rate)
+            if row['matches'] == row['byes']:
+                break
+
+        transaction.set_rollback(True, using=using)
+
+    return rows
+
+
+def _create_benchmark_stage(strategy_name, num_players):
+    owner, _ = User.objects.get_or_create(username='pairing_benchmark')
+    tournament = Tournament.objects.create(
+        name=f'Pairing Benchmark ({strategy_name})', owner=owner)
+    stage = Stage.objects.create(
+        tournament=tournament, name='Benchmark Stage', order=1,
+        pairing_strategy=strategy_name)
+    stage.set_ranking_criteria([
+        {'key': 'wins', 'enabled': True},
+        {'key': 'seed', 'enabled': True},
+    ])
+
+    players = Player.objects.bulk_create([
+        Player(tournament=tournament, nickname=f'Player {i + 1}')
+        for i in range(num_players)
+    ])
+    for i, player in enumerate(players):
+        StagePlayer.objects.create(player=player, stage=stage, seed=i + 1)
+    return stage
+
+
+def _measure_round(matches, wins, played_pairs, bye_recipients):
+    """
+    Score a round's pairings against the simulation history so far, then
+    add them to that history.
+    """
+    repeat_pairings = 0
+    score_group_mismatches = 0
+    repeat_byes = 0
+    bye_recipient_scores = []
+
+    for match in matches:
+        if match.player_two_id is None:
+            bye_recipient_scores.append(wins.get(match.player_one_id, 0))
+            if match.player_one_id in bye_recipients:
+                repeat_byes += 1
+            bye_recipients.add(match.player_one_id)
+            continue
+
+        pair = frozenset((match.player_one_id, match.player_two_id))
+        if pair in played_pairs:
+            repeat_pairings += 1
+        played_pairs.add(pair)
+        if wins.get(match.player_one_id, 0) != wins.get(match.player_two_id, 0):
+            score_group_mismatches += 1
+
+    return {
+        'matches': len(matches),
+        'byes': len(bye_recipient_scores),
+        'repeat_pairings': repeat_pairings,
+        'score_group_mismatches': score_group_mismatches,
+        'repeat_byes': repeat_byes,
+        'bye_recipient_scores': bye_recipient_scores,
+    }
+
+
+def _report_results(matches, wins, rng, favorite_win_rate):
+    for match in matches:
+        if match.player_two_id is None:
+            if not match.has_result():
+                MatchResult.objects.create(match=match, winner=match.player_one)
+            wins[match.player_one_id] = wins.get(match.player_one_id, 0) + 1
+            continue
+
+        favorite, underdog = match.player_one, match.player_two
+        if underdog.seed < favorite.seed:
+            favorite, underdog = underdog, favorite
+        winner = favorite if rng.random() < favorite_win_rate else underdog
+        MatchResult.objects.create(match=match, winner=winner)
+        wins[winner.id] = wins.get(winner.id, 0) + 1
@@ -5,6 +5,7 @@ All pairing strategies must inherit from the PairingStrategy class and implement
 the required methods.
 """
 
+import random
 from abc import ABC, abstractmethod
 
 
@@ -20,6 +21,10 @@ class PairingStrategy(ABC):
     display_name = None  # Human-readable name (e.g., 'Swiss')
     description = None  # Brief description of the strategy
 
+    # Source of randomness for shuffles and draws; replace with a seeded
+    # random.Random instance for reproducible pairings
+    rng = random
+
     @abstractmethod
     def make_pairings_for_round(self, round_obj):
         """
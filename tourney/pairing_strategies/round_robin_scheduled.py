@@ -32,7 +32,7 @@ class RoundRobinScheduledPairingStrategy(PairingStrategy):
         generates the minimum number of rounds needed to complete the
         round robin with all remaining unmatched pairs.
         """
-        from tourney.models import Player, Match, Round
+        from tourney.models import Player, Match, Round, StandingMaterializer
 
         stage = round_obj.stage
         stage_players = list(stage.stage_players.filter(
@@ -72,6 +72,7 @@ class RoundRobinScheduledPairingStrategy(PairingStrategy):
 
         if matches_to_create:
             Match.objects.bulk_create(matches_to_create)
+            StandingMaterializer.record_new_matches(matches_to_create)
 
     def _generate_round_robin_schedule(self, players):
         """
@@ -30,7 +30,7 @@ class SingleEliminationPairingStrategy(PairingStrategy):
         return True
 
     def make_pairings_for_round(self, round_obj):
-        from tourney.models import Player, Match, MatchResult
+        from tourney.models import Player, Match, MatchResult, StandingMaterializer
         import math
 
         stage = round_obj.stage
@@ -80,6 +80,7 @@ class SingleEliminationPairingStrategy(PairingStrategy):
 
         # Save all matches
         Match.objects.bulk_create(matches)
+        StandingMaterializer.record_new_matches(matches)
 
         # Auto-resolve bye matches
         for match in matches:
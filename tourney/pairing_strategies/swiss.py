@@ -6,12 +6,74 @@ current standings after the first round. Uses different algorithms based on
 tournament size for optimal performance and pairing quality.
 """
 
-import random
-from django.db.models import Q
-
 from .base import PairingStrategy
 
 
+class PairingContext:
+    """
+    In-memory snapshot of a stage's match history for pairing one round.
+
+    Built once per round from a single query so the Swiss helpers (which
+    look up scores and previous opponents many times while searching) never
+    touch the database.
+    """
+
+    def __init__(self, scores=None, previous_opponents=None, bye_history=None,
+                 undefeated_player_ids=None):
+        self.scores = scores or {}
+        self.previous_opponents = previous_opponents or {}
+        self.bye_history = bye_history or set()
+        self.undefeated_player_ids = undefeated_player_ids or set()
+
+    @classmethod
+    def for_stage(cls, stage, active_players):
+        """
+        Load the context for a stage.
+
+        Args:
+            stage: The stage being paired
+            active_players: Active stage players (only they can be undefeated)
+        """
+        from tourney.models import Match
+
+        scores = {}
+        losses = {}
+        previous_opponents = {}
+        bye_history = set()
+
+        matches = Match.objects.filter(round__stage=stage).values_list(
+            'player_one_id', 'player_two_id', 'result__id', 'result__winner_id')
+
+        for player_one_id, player_two_id, result_id, winner_id in matches:
+            if player_two_id is None and player_one_id is not None:
+                bye_history.add(player_one_id)
+
+            if result_id is None:
+                continue
+
+            if winner_id is not None:
+                scores[winner_id] = scores.get(winner_id, 0) + 1
+                for participant_id in (player_one_id, player_two_id):
+                    if participant_id is not None and participant_id != winner_id:
+                        losses[participant_id] = losses.get(participant_id, 0) + 1
+
+            if player_one_id and player_two_id:
+                previous_opponents.setdefault(
+                    player_one_id, set()).add(player_two_id)
+                previous_opponents.setdefault(
+                    player_two_id, set()).add(player_one_id)
+
+        undefeated_player_ids = {
+            p.id for p in active_players
+            if scores.get(p.id, 0) > 0 and not losses.get(p.id, 0)
+        }
+
+        return cls(scores, previous_opponents, bye_history, undefeated_player_ids)
+
+    def get_score(self, stage_player):
+        return self.scores.get(stage_player.id, 0)
+
+
 class SwissPairingStrategy(PairingStrategy):
     """
     Swiss pairing strategy implementation.
@@ -27,11 +89,14 @@ class SwissPairingStrategy(PairingStrategy):
     display_name = "Swiss"
     description = "Players paired by standings after random first round"
 
+    def __init__(self):
+        self._context = PairingContext()
+
     def is_elimination_style(self):
         return False
 
     def make_pairings_for_round(self, round_obj):
-        from tourney.models import Player, Match, MatchResult
+        from tourney.models import Player, Match, MatchResult, StandingMaterializer
 
         stage = round_obj.stage
         stage_players = list(stage.stage_players.filter(
@@ -40,17 +105,14 @@ class SwissPairingStrategy(PairingStrategy):
         if len(stage_players) == 0:
             return
 
+        self._context = PairingContext.for_stage(stage, stage_players)
+
         if round_obj.order == 1:
             # First round: random pairing
-            random.shuffle(stage_players)
+            self.rng.shuffle(stage_players)
             pairings = self._create_simple_pairings(stage_players)
         else:
-            # Later rounds: use size-based algorithm
-            if len(stage_players) <= 14:
-                pairings = self._brute_force_pairing(round_obj, stage_players)
-            else:
-                pairings = self._greedy_backtrack_pairing(
-                    round_obj, stage_players)
+            pairings = self._make_later_round_pairings(round_obj, stage_players)
 
         # Create matches from pairings
         matches = []
@@ -64,6 +126,7 @@ class SwissPairingStrategy(PairingStrategy):
 
         # Save all matches
         Match.objects.bulk_create(matches)
+        StandingMaterializer.record_new_matches(matches)
 
         # Auto-resolve bye matches
         for match in matches:
@@ -73,6 +136,21 @@ class SwissPairingStrategy(PairingStrategy):
                     winner=match.player_one
                 )
 
+    def _make_later_round_pairings(self, round_obj, stage_players):
+        """
+        Pair a round after the first, using a size-based algorithm.
+
+        Args:
+            round_obj: The round being paired
+            stage_players: List of active stage players
+
+        Returns:
+            List of (player_one, player_two) tuples, with None for bye players
+        """
+        if len(stage_players) <= 16:
+            return self._brute_force_pairing(round_obj, stage_players)
+        return self._greedy_backtrack_pairing(round_obj, stage_players)
+
     def _get_sorted_players_by_standings(self, stage):
         """
         Sort players by the stage's configured ranking criteria.
@@ -129,8 +207,8 @@ class SwissPairingStrategy(PairingStrategy):
         split = len(group) // 2
         top = group[:split]
         bottom = group[split:]
-        random.shuffle(top)
-        random.shuffle(bottom)
+        self.rng.shuffle(top)
+        self.rng.shuffle(bottom)
 
         interlaced = []
         for i in range(len(bottom)):
@@ -160,8 +238,10 @@ class SwissPairingStrategy(PairingStrategy):
 
     def _brute_force_pairing(self, round_obj, stage_players):
         """
-        Brute force pairing algorithm for small tournaments (≤14 players).
-        Tries to find good pairing solution with limited search.
+        Brute force pairing algorithm for small tournaments (≤16 players).
+        Finds the best scoring pairings by exhaustive search. Fields above 8
+        players are searched in fold-interlaced order so that equally scored
+        matchings resolve to fold pairings within each score group.
 
         Args:
             round_obj: The round being paired
@@ -171,19 +251,18 @@ class SwissPairingStrategy(PairingStrategy):
             List of (player_one, player_two) tuples with optimal pairings
         """
         sorted_players = self._get_sorted_players_by_standings(round_obj.stage)
-        previous_opponents = self._get_previous_opponents(round_obj.stage)
-        undefeated_player_ids = self._get_undefeated_player_ids(round_obj.stage)
+        previous_opponents = self._context.previous_opponents
+        undefeated_player_ids = self._context.undefeated_player_ids
 
-        if len(sorted_players) <= 8:
-            return self._exhaustive_search_pairing(
-                sorted_players, previous_opponents, round_obj.order, undefeated_player_ids)
-        else:
-            return self._smart_brute_force_pairing(
-                sorted_players, previous_opponents, round_obj.order, undefeated_player_ids)
+        if len(sorted_players) > 8:
+            sorted_players = self._fold_interlace(sorted_players)
+
+        return self._exhaustive_search_pairing(
+            sorted_players, previous_opponents, round_obj.order, undefeated_player_ids)
 
     def _greedy_backtrack_pairing(self, round_obj, stage_players):
         """
-        Greedy + backtracking pairing algorithm for large tournaments (15+ players).
+        Greedy + backtracking pairing algorithm for large tournaments (17+ players).
         Provides good practical solution without exponential complexity.
 
         Args:
@@ -194,12 +273,12 @@ class SwissPairingStrategy(PairingStrategy):
             List of (player_one, player_two) tuples with good pairings
         """
         sorted_players = self._get_sorted_players_by_standings(round_obj.stage)
-        previous_opponents = self._get_previous_opponents(round_obj.stage)
-        undefeated_player_ids = self._get_undefeated_player_ids(round_obj.stage)
+        previous_opponents = self._context.previous_opponents
+        undefeated_player_ids = self._context.undefeated_player_ids
         fold_players = self._fold_interlace(sorted_players)
 
         if len(sorted_players) % 2 == 1:
-            bye_history = self._get_bye_history(round_obj.stage)
+            bye_history = self._context.bye_history
             bye_candidate_tiers = self._get_bye_candidates_by_priority(
                 sorted_players, bye_history, round_obj.order)
 
@@ -237,70 +316,117 @@ class SwissPairingStrategy(PairingStrategy):
         # Fallback to simple pairing if backtracking fails
         return self._force_pair_with_repeats(fold_players, previous_opponents)
 
-    def _generate_perfect_matchings(self, players):
-        """
-        Generate all possible perfect matchings for a list of players.
-        Uses itertools to create all combinations efficiently.
-        """
-        if len(players) == 0:
-            return [[]]
-        if len(players) == 2:
-            return [[(players[0], players[1])]]
-
-        matchings = []
-        first_player = players[0]
-
-        # Try pairing first player with each other player
-        for i in range(1, len(players)):
-            partner = players[i]
-            remaining = players[1:i] + players[i+1:]
-
-            # Get all matchings for remaining players
-            for sub_matching in self._generate_perfect_matchings(remaining):
-                matching = [(first_player, partner)] + sub_matching
-                matchings.append(matching)
-
-        return matchings
-
     def _calculate_matching_score(self, matching, previous_opponents, undefeated_player_ids=None):
         """
         Calculate the quality score for a complete matching.
         Higher scores are better.
         """
+        return sum(
+            self._pairing_score(player_one, player_two, previous_opponents, undefeated_player_ids)
+            for player_one, player_two in matching
+        )
+
+    def _pairing_score(self, player_one, player_two, previous_opponents, undefeated_player_ids=None):
+        """
+        Calculate the quality score of a single pairing (player_two is None
+        for a bye). No pairing scores more than MAX_POINT_DIFF.
+        """
         MAX_POINT_DIFF = 1000
         REPEAT_PENALTY = 10000
         UNDEFEATED_MISMATCH_PENALTY = 5000
         BYE_PAIR_DOWN_WEIGHT = 2000
 
-        total_score = 0
-        for player_one, player_two in matching:
-            if player_two is None:
-                bye_player_score = self._get_player_score(player_one)
-                score = MAX_POINT_DIFF - bye_player_score
-                if undefeated_player_ids and player_one.id in undefeated_player_ids:
-                    score -= UNDEFEATED_MISMATCH_PENALTY
-                score -= BYE_PAIR_DOWN_WEIGHT * (1 + bye_player_score)
-                total_score += score
-                continue
+        if player_two is None:
+            bye_player_score = self._get_player_score(player_one)
+            score = MAX_POINT_DIFF - bye_player_score
+            if undefeated_player_ids and player_one.id in undefeated_player_ids:
+                score -= UNDEFEATED_MISMATCH_PENALTY
+            score -= BYE_PAIR_DOWN_WEIGHT * (1 + bye_player_score)
+            return score
+
+        score_diff = abs(self._get_player_score(
+            player_one) - self._get_player_score(player_two))
+        score = MAX_POINT_DIFF - score_diff
 
-            score_diff = abs(self._get_player_score(
-                player_one) - self._get_player_score(player_two))
-            score = MAX_POINT_DIFF - score_diff
+        has_played = player_two.id in previous_opponents.get(
+            player_one.id, set())
+        if has_played:
+            score -= REPEAT_PENALTY
+
+        if undefeated_player_ids:
+            p1_undefeated = player_one.id in undefeated_player_ids
+            p2_undefeated = player_two.id in undefeated_player_ids
+            if p1_undefeated != p2_undefeated:
+                score -= UNDEFEATED_MISMATCH_PENALTY
+
+        return score
+
+    def _iter_improving_matchings(self, players, previous_opponents, undefeated_player_ids=None,
+                                  base_score=0, best_score=float('-inf')):
+        """
+        Lazily search perfect matchings of players with branch-and-bound.
+
+        Matchings are explored in the same order as a full enumeration (first
+        remaining player paired with each later player in turn), and one is
+        yielded each time it strictly beats the best score so far, so the last
+        yielded matching is the first best one. A branch is pruned when its
+        partial score plus each remaining player's best possible pairing score
+        cannot beat the best score so far.
+
+        Yields:
+            (matching, score) tuples with strictly increasing scores
+        """
+        count = len(players)
+        pair_scores = [[0] * count for _ in range(count)]
+        for i in range(count):
+            for j in range(i + 1, count):
+                pair_scores[i][j] = pair_scores[j][i] = self._pairing_score(
+                    players[i], players[j], previous_opponents, undefeated_player_ids)
+        best_partner_scores = [
+            max((pair_scores[i][j] for j in range(count) if j != i), default=0)
+            for i in range(count)
+        ]
 
-            has_played = player_two.id in previous_opponents.get(
-                player_one.id, set())
-            if has_played:
-                score -= REPEAT_PENALTY
+        incumbent = [best_score]
+        pairs = []
+
+        # bound is twice the partial score plus the best partner score of
+        # every unpaired player, i.e. twice an upper bound on the total.
+        def search(remaining, score, bound):
+            if not remaining:
+                if score > incumbent[0]:
+                    incumbent[0] = score
+                    yield [(players[i], players[j]) for i, j in pairs], score
+                return
+
+            first = remaining[0]
+            rest = remaining[1:]
+            for k, partner in enumerate(rest):
+                pair_score = pair_scores[first][partner]
+                partner_bound = (bound - best_partner_scores[first]
+                                 - best_partner_scores[partner] + 2 * pair_score)
+                if partner_bound <= 2 * incumbent[0]:
+                    continue
+                pairs.append((first, partner))
+                yield from search(rest[:k] + rest[k + 1:], score + pair_score, partner_bound)
+                pairs.pop()
 
-            if undefeated_player_ids:
-                p1_undefeated = player_one.id in undefeated_player_ids
-                p2_undefeated = player_two.id in undefeated_player_ids
-                if p1_undefeated != p2_undefeated:
-                    score -= UNDEFEATED_MISMATCH_PENALTY
+        yield from search(list(range(count)), base_score,
+                          2 * base_score + sum(best_partner_scores))
 
-            total_score += score
+    def _find_best_matching(self, players, previous_opponents, undefeated_player_ids=None,
+                            base_score=0, best_score=float('-inf')):
+        """
+        Find the highest scoring perfect matching that beats best_score.
 
-        return total_score
+        Returns:
+            (matching, score), or (None, best_score) if no matching beats it
+        """
+        best_matching = None
+        for best_matching, best_score in self._iter_improving_matchings(
+                players, previous_opponents, undefeated_player_ids, base_score, best_score):
+            pass
+        return best_matching, best_score
 
     def _backtrack_pair(self, players, current_pairing, used, start_index, previous_opponents):
         """
@@ -407,59 +533,9 @@ class SwissPairingStrategy(PairingStrategy):
 
         return pairings
 
-    def _get_previous_opponents(self, stage):
-        """
-        Get a dictionary mapping player IDs to sets of opponent IDs they've played.
-        """
-        from tourney.models import Match
-
-        opponents = {}
-
-        # Get all completed matches in this stage
-        matches = Match.objects.filter(
-            round__stage=stage,
-            result__isnull=False
-        ).select_related('player_one', 'player_two', 'result')
-
-        for match in matches:
-            if match.player_one and match.player_two:
-                # Add each as opponent of the other
-                if match.player_one.id not in opponents:
-                    opponents[match.player_one.id] = set()
-                if match.player_two.id not in opponents:
-                    opponents[match.player_two.id] = set()
-
-                opponents[match.player_one.id].add(match.player_two.id)
-                opponents[match.player_two.id].add(match.player_one.id)
-
-        return opponents
-
-    def _get_bye_history(self, stage):
-        """
-        Get a set of player IDs who have received byes in previous rounds.
-
-        Returns:
-            Set of stage_player IDs who have had byes
-        """
-        from tourney.models import Match
-
-        bye_recipients = set()
-
-        # Get all bye matches (where player_two is None)
-        bye_matches = Match.objects.filter(
-            round__stage=stage,
-            player_two__isnull=True
-        ).select_related('player_one')
-
-        for match in bye_matches:
-            if match.player_one:
-                bye_recipients.add(match.player_one.id)
-
-        return bye_recipients
-
     def _get_bye_candidates_by_priority(self, sorted_players, bye_history, round_number):
         if round_number == 1:
-            return [[random.choice(sorted_players)]]
+            return [[self.rng.choice(sorted_players)]]
 
         without_prior_bye = [
             p for p in reversed(sorted_players) if p.id not in bye_history
@@ -476,49 +552,23 @@ class SwissPairingStrategy(PairingStrategy):
 
         return tiers if tiers else [[sorted_players[-1]]]
 
-    def _get_undefeated_player_ids(self, stage):
-        from tourney.models import Player, MatchResult
-
-        undefeated = set()
-        for stage_player in stage.stage_players.filter(player__status=Player.PlayerStatus.ACTIVE):
-            wins = MatchResult.objects.filter(
-                match__round__stage=stage,
-                winner=stage_player
-            ).count()
-
-            losses = MatchResult.objects.filter(
-                Q(match__player_one=stage_player) | Q(
-                    match__player_two=stage_player),
-                match__round__stage=stage
-            ).exclude(winner=stage_player).exclude(winner=None).count()
-
-            if wins > 0 and losses == 0:
-                undefeated.add(stage_player.id)
-
-        return undefeated
-
     def _get_player_score(self, stage_player):
         """
         Get a player's current score (wins) for sorting purposes.
         """
-        from tourney.models import MatchResult
-
-        return MatchResult.objects.filter(
-            match__round__stage=stage_player.stage,
-            winner=stage_player
-        ).count()
+        return self._context.get_score(stage_player)
 
     def _exhaustive_search_pairing(self, sorted_players, previous_opponents,
                                     round_number=None, undefeated_player_ids=None):
         """
-        Exhaustive search for small tournaments (≤8 players).
+        Exhaustive search for small tournaments (≤16 players).
         Tries each eligible bye candidate and picks the one that produces the
         best-quality pairings, while respecting bye fairness through tiered
-        priority.
+        priority. The search is branch-and-bound, so only matchings that could
+        still beat the best one found so far are explored.
         """
         if len(sorted_players) % 2 == 1:
-            stage = sorted_players[0].stage if sorted_players else None
-            bye_history = self._get_bye_history(stage) if stage else set()
+            bye_history = self._context.bye_history
             bye_candidate_tiers = self._get_bye_candidates_by_priority(
                 sorted_players, bye_history, round_number or 1)
 
@@ -528,13 +578,13 @@ class SwissPairingStrategy(PairingStrategy):
 
                 for candidate in tier:
                     remaining = [p for p in sorted_players if p.id != candidate.id]
-                    matchings = self._generate_perfect_matchings(remaining)
-                    for matching in matchings:
-                        score = self._calculate_matching_score(
-                            matching + [(candidate, None)], previous_opponents, undefeated_player_ids)
-                        if score > best_score:
-                            best_score = score
-                            best_result = (matching, candidate)
+                    bye_score = self._pairing_score(
+                        candidate, None, previous_opponents, undefeated_player_ids)
+                    matching, best_score = self._find_best_matching(
+                        remaining, previous_opponents, undefeated_player_ids,
+                        base_score=bye_score, best_score=best_score)
+                    if matching is not None:
+                        best_result = (matching, candidate)
 
                 if best_result:
                     pairings, bye_player = best_result
@@ -542,75 +592,7 @@ class SwissPairingStrategy(PairingStrategy):
 
             return [(sorted_players[0], None)]
 
-        best_pairings = None
-        best_score = float('-inf')
-
-        matchings = self._generate_perfect_matchings(sorted_players)
-        for matching in matchings:
-            score = self._calculate_matching_score(
-                matching, previous_opponents, undefeated_player_ids)
-            if score > best_score:
-                best_score = score
-                best_pairings = matching
-
-        return best_pairings or self._create_simple_pairings(sorted_players)
-
-    def _smart_brute_force_pairing(self, sorted_players, previous_opponents,
-                                    round_number=None, undefeated_player_ids=None):
-        """
-        Smart brute force for medium tournaments (9-14 players).
-        Uses greedy approach with backtracking, limited search.
-        """
-        if len(sorted_players) % 2 == 1 and round_number is not None:
-            stage = sorted_players[0].stage if sorted_players else None
-            if stage:
-                bye_history = self._get_bye_history(stage)
-                bye_candidate_tiers = self._get_bye_candidates_by_priority(
-                    sorted_players, bye_history, round_number)
-
-                for tier in bye_candidate_tiers:
-                    best_score = float('-inf')
-                    best_result = None
-
-                    for candidate in tier:
-                        remaining = [p for p in sorted_players if p.id != candidate.id]
-                        result = []
-                        used = set()
-                        if self._backtrack_pair(remaining, result, used, 0, previous_opponents):
-                            score = self._calculate_matching_score(
-                                result + [(candidate, None)], previous_opponents, undefeated_player_ids)
-                            if score > best_score:
-                                best_score = score
-                                best_result = (result, candidate)
-
-                    if best_result:
-                        pairings, bye_player = best_result
-                        return pairings + [(bye_player, None)]
-
-                fallback_bye = sorted_players[-1]
-                remaining = [p for p in sorted_players if p.id != fallback_bye.id]
-                pairings = self._force_pair_with_repeats(remaining, previous_opponents)
-                return pairings + [(fallback_bye, None)]
-
-        result = []
-        used = set()
-
-        if self._backtrack_pair(sorted_players, result, used, 0, previous_opponents):
-            return result
-
-        best_pairings = None
-        best_score = float('-inf')
-
-        for start_offset in range(min(4, len(sorted_players))):
-            rotated_players = sorted_players[start_offset:] + \
-                sorted_players[:start_offset]
-            pairings = self._force_pair_with_repeats(
-                rotated_players, previous_opponents)
-            score = self._calculate_matching_score(
-                pairings, previous_opponents, undefeated_player_ids)
-
-            if score > best_score:
-                best_score = score
-                best_pairings = pairings
+        best_pairings, _ = self._find_best_matching(
+            sorted_players, previous_opponents, undefeated_player_ids)
 
         return best_pairings or self._create_simple_pairings(sorted_players)
@@ -0,0 +1,591 @@
+"""
+Swiss Matching Pairing Strategy
+
+A Swiss-system strategy that solves each round as a maximum-weight perfect
+matching (Edmonds' blossom algorithm) instead of a backtracking search. Every
+possible pairing gets an integer weight, and the matching with the highest
+total weight is provably optimal and deterministic for a given standings
+order, with polynomial running time even for very large fields.
+"""
+
+from .swiss import SwissPairingStrategy
+
+
+def max_weight_matching(num_vertices, edges, maxcardinality=False):
+    """
+    Compute a maximum-weight matching of a general undirected graph.
+
+    Implementation of Edmonds' blossom algorithm with dual variables (the
+    O(n^3) formulation from Galil, "Efficient algorithms for finding maximum
+    matching in graphs", 1986, following Joris van Rantwijk's reference
+    implementation). With integer weights only integer arithmetic is used.
+
+    Args:
+        num_vertices: Number of vertices, numbered 0..num_vertices-1
+        edges: List of (i, j, weight) tuples with i != j
+        maxcardinality: If True, only maximum-cardinality matchings are
+            considered and the heaviest of those is returned
+
+    Returns:
+        List where mate[v] is the vertex matched to v, or -1 if unmatched
+    """
+    if not edges:
+        return [-1] * num_vertices
+
+    nvertex = num_vertices
+    nedge = len(edges)
+    maxweight = max(0, max(weight for _, _, weight in edges))
+
+    # endpoint[p] is the vertex at endpoint p; edge k has endpoints 2k, 2k+1
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * nedge)]
+
+    # neighbend[v] lists the remote endpoints of the edges incident to v
+    neighbend = [[] for _ in range(nvertex)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbend[i].append(2 * k + 1)
+        neighbend[j].append(2 * k)
+
+    # mate[v] is the remote endpoint of v's matched edge, or -1
+    mate = nvertex * [-1]
+
+    # Top-level blossom labels: 0 free, 1 S-vertex, 2 T-vertex
+    label = (2 * nvertex) * [0]
+    labelend = (2 * nvertex) * [-1]
+    inblossom = list(range(nvertex))
+    blossomparent = (2 * nvertex) * [-1]
+    blossomchilds = (2 * nvertex) * [None]
+    blossombase = list(range(nvertex)) + nvertex * [-1]
+    blossomendps = (2 * nvertex) * [None]
+    bestedge = (2 * nvertex) * [-1]
+    blossombestedges = (2 * nvertex) * [None]
+    unusedblossoms = list(range(nvertex, 2 * nvertex))
+    dualvar = nvertex * [maxweight] + nvertex * [0]
+    allowedge = nedge * [False]
+    queue = []
+
+    def slack(k):
+        i, j, weight = edges[k]
+        return dualvar[i] + dualvar[j] - 2 * weight
+
+    def blossom_leaves(b):
+        if b < nvertex:
+            yield b
+        else:
+            for t in blossomchilds[b]:
+                if t < nvertex:
+                    yield t
+                else:
+                    yield from blossom_leaves(t)
+
+    def assign_label(w, t, p):
+        b = inblossom[w]
+        label[w] = label[b] = t
+        labelend[w] = labelend[b] = p
+        bestedge[w] = bestedge[b] = -1
+        if t == 1:
+            queue.extend(blossom_leaves(b))
+        elif t == 2:
+            base = blossombase[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        # Trace back from v and w to find a common ancestor (a new blossom
+        # base) or -1 when the paths reach two different roots.
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        v, w, _ = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        blossomchilds[b] = path = []
+        blossomendps[b] = endps = []
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0
+        for v in blossom_leaves(b):
+            if label[inblossom[v]] == 2:
+                queue.append(v)
+            inblossom[v] = b
+
+        bestedgeto = (2 * nvertex) * [-1]
+        for bv in path:
+            if blossombestedges[bv] is None:
+                nblists = [[p // 2 for p in neighbend[v]]
+                           for v in blossom_leaves(bv)]
+            else:
+                nblists = [blossombestedges[bv]]
+            for nblist in nblists:
+                for k in nblist:
+                    i, j, _ = edges[k]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if (bj != b and label[bj] == 1 and
+                            (bestedgeto[bj] == -1 or slack(k) < slack(bestedgeto[bj]))):
+                        bestedgeto[bj] = k
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = [k for k in bestedgeto if k != -1]
+        bestedge[b] = -1
+        for k in blossombestedges[b]:
+            if bestedge[b] == -1 or slack(k) < slack(bestedge[b]):
+                bestedge[b] = k
+
+    def expand_blossom(b, endstage):
+        for s in blossomchilds[b]:
+            blossomparent[s] = -1
+            if s < nvertex:
+                inblossom[s] = s
+            elif endstage and dualvar[s] == 0:
+                expand_blossom(s, endstage)
+            else:
+                for v in blossom_leaves(s):
+                    inblossom[v] = s
+
+        if not endstage and label[b] == 2:
+            # Relabel the sub-blossoms on the even path from the entry child
+            # to the base so the alternating tree stays consistent.
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = blossomchilds[b].index(entrychild)
+            if j & 1:
+                j -= len(blossomchilds[b])
+                jstep = 1
+                endptrick = 0
+            else:
+                jstep = -1
+                endptrick = 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossomendps[b][j - endptrick] ^ endptrick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowedge[blossomendps[b][j - endptrick] // 2] = True
+                j += jstep
+                p = blossomendps[b][j - endptrick] ^ endptrick
+                allowedge[p // 2] = True
+                j += jstep
+            bv = blossomchilds[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            j += jstep
+            while blossomchilds[b][j] != entrychild:
+                bv = blossomchilds[b][j]
+                if label[bv] == 1:
+                    j += jstep
+                    continue
+                for v in blossom_leaves(bv):
+                    if label[v] != 0:
+                        break
+                if label[v] != 0:
+                    label[v] = 0
+                    label[endpoint[mate[blossombase[bv]]]] = 0
+                    assign_label(v, 2, labelend[v])
+                j += jstep
+
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+
+    def augment_blossom(b, v):
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= nvertex:
+            augment_blossom(t, v)
+        i = j = blossomchilds[b].index(t)
+        if i & 1:
+            j -= len(blossomchilds[b])
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+        while j != 0:
+            j += jstep
+            t = blossomchilds[b][j]
+            p = blossomendps[b][j - endptrick] ^ endptrick
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p])
+            j += jstep
+            t = blossomchilds[b][j]
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossomchilds[b] = blossomchilds[b][i:] + blossomchilds[b][:i]
+        blossomendps[b] = blossomendps[b][i:] + blossomendps[b][:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]
+
+    def augment_matching(k):
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= nvertex:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= nvertex:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    for _ in range(nvertex):
+        # Each stage grows alternating trees from every free vertex until it
+        # finds an augmenting path or proves none exists.
+        label[:] = (2 * nvertex) * [0]
+        bestedge[:] = (2 * nvertex) * [-1]
+        blossombestedges[nvertex:] = nvertex * [None]
+        allowedge[:] = nedge * [False]
+        queue[:] = []
+
+        for v in range(nvertex):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    if not allowedge[k]:
+                        kslack = slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+
+            if augmented:
+                break
+
+            # No augmenting path with the current duals: find the smallest
+            # dual adjustment that makes progress.
+            deltatype = -1
+            delta = deltaedge = deltablossom = None
+
+            if not maxcardinality:
+                deltatype = 1
+                delta = min(dualvar[:nvertex])
+
+            for v in range(nvertex):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 2
+                        deltaedge = bestedge[v]
+
+            for b in range(2 * nvertex):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b]) // 2
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 3
+                        deltaedge = bestedge[b]
+
+            for b in range(nvertex, 2 * nvertex):
+                if (blossombase[b] >= 0 and blossomparent[b] == -1 and
+                        label[b] == 2 and (deltatype == -1 or dualvar[b] < delta)):
+                    delta = dualvar[b]
+                    deltatype = 4
+                    deltablossom = b
+
+            if deltatype == -1:
+                # Only possible with maxcardinality: the matching is
+                # already maximum, finish with a final dual update.
+                deltatype = 1
+                delta = max(0, min(dualvar[:nvertex]))
+
+            for v in range(nvertex):
+                if label[inblossom[v]] == 1:
+                    dualvar[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dualvar[v] += delta
+            for b in range(nvertex, 2 * nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+
+            if deltatype == 1:
+                break
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                queue.append(i)
+            elif deltatype == 4:
+                expand_blossom(deltablossom, False)
+
+        if not augmented:
+            break
+
+        for b in range(nvertex, 2 * nvertex):
+            if (blossomparent[b] == -1 and blossombase[b] >= 0 and
+                    label[b] == 1 and dualvar[b] == 0):
+                expand_blossom(b, True)
+
+    for v in range(nvertex):
+        if mate[v] >= 0:
+            mate[v] = endpoint[mate[v]]
+
+    return mate
+
+
+class SwissMatchingPairingStrategy(SwissPairingStrategy):
+    """
+    Swiss pairing solved as a maximum-weight perfect matching.
+
+    Round 1 is random like regular Swiss. Later rounds build a graph
+    over the active players (plus a bye vertex for odd fields) and weigh each
+    pairing by, in strict priority order:
+    - Bye fairness: a second bye is worse than anything else
+    - Repeat avoidance: rematches are avoided whenever possible
+    - Undefeated protection: undefeated players face undefeated players
+    - Score-group distance: the squared win difference (and byes go to the
+      lowest scores)
+    - Standings distance: a final deterministic tiebreak preferring players
+      close together in the standings (and byes to the lowest ranked)
+
+    Each tier is scaled past the largest possible total of the tiers below
+    it, so the optimal matching is lexicographically best across them.
+
+    Only players within `pairing_window` places of each other in the
+    standings are connected. The full graph is solved instead unless the
+    windowed matching meets the lower bound of every tier above standings
+    distance, which no matching can beat. Standings distance, the final
+    tiebreak, is therefore only optimized within the window.
+    """
+
+    name = "swiss_matching"
+    display_name = "Swiss (Optimal Matching)"
+    description = "Swiss pairings solved as an optimal weighted matching, suited to large fields"
+
+    pairing_window = 24
+
+    def _make_later_round_pairings(self, round_obj, stage_players):
+        sorted_players = self._get_sorted_players_by_standings(round_obj.stage)
+        return self._max_weight_pairing(sorted_players)
+
+    def _get_weight_units(self, num_vertices, max_score):
+        """
+        Integer weight of one unit of each penalty tier, lowest tier first.
+        """
+        position_unit = 1
+        score_unit = num_vertices * num_vertices + 1
+        undefeated_unit = (num_vertices * (max_score + 1) ** 2 + 1) * score_unit
+        repeat_unit = (num_vertices + 1) * undefeated_unit
+        bye_repeat_unit = (num_vertices + 1) * repeat_unit
+        return position_unit, score_unit, undefeated_unit, repeat_unit, bye_repeat_unit
+
+    def _get_pairing_edges(self, sorted_players, window=None):
+        """
+        Build weighted edges for the candidate pairings.
+
+        Vertex i is sorted_players[i]; for odd fields vertex len(sorted_players)
+        is the bye, which is connected to every player. With a window, players
+        are only connected to the next `window` players in the standings.
+        """
+        context = self._context
+        num_players = len(sorted_players)
+        num_vertices = num_players + (num_players % 2)
+        scores = [self._get_player_score(p) for p in sorted_players]
+        undefeated = [p.id in context.undefeated_player_ids for p in sorted_players]
+
+        (position_unit, score_unit, undefeated_unit,
+         repeat_unit, bye_repeat_unit) = self._get_weight_units(
+            num_vertices, max(scores, default=0))
+        base_weight = 2 * bye_repeat_unit
+
+        edges = []
+        for i, player_one in enumerate(sorted_players):
+            opponents = context.previous_opponents.get(player_one.id, set())
+            last = num_players if window is None else min(num_players, i + window + 1)
+            for j in range(i + 1, last):
+                penalty = (j - i) * position_unit
+                penalty += (scores[i] - scores[j]) ** 2 * score_unit
+                if undefeated[i] != undefeated[j]:
+                    penalty += undefeated_unit
+                if sorted_players[j].id in opponents:
+                    penalty += repeat_unit
+                edges.append((i, j, base_weight - penalty))
+
+            if num_vertices > num_players:
+                penalty = (num_players - i) * position_unit
+                penalty += scores[i] ** 2 * score_unit
+                if undefeated[i]:
+                    penalty += undefeated_unit
+                if player_one.id in context.bye_history:
+                    penalty += bye_repeat_unit
+                edges.append((i, num_players, base_weight - penalty))
+
+        return num_vertices, edges
+
+    def _max_weight_pairing(self, sorted_players):
+        """
+        Pair players by solving a maximum-weight perfect matching.
+
+        Args:
+            sorted_players: Active stage players in standings order
+
+        Returns:
+            List of (player_one, player_two) tuples, with None for the bye
+        """
+        if len(sorted_players) == 1:
+            return [(sorted_players[0], None)]
+
+        window = self.pairing_window
+        if window >= len(sorted_players):
+            window = None
+        num_vertices, edges = self._get_pairing_edges(sorted_players, window)
+        mate = max_weight_matching(num_vertices, edges, maxcardinality=True)
+        pairings = self._pairings_from_mates(sorted_players, mate)
+
+        if window is not None and (
+                self._get_tier_penalties(pairings) > self._get_tier_lower_bounds(sorted_players)):
+            num_vertices, edges = self._get_pairing_edges(sorted_players)
+            mate = max_weight_matching(num_vertices, edges, maxcardinality=True)
+            pairings = self._pairings_from_mates(sorted_players, mate)
+
+        return pairings
+
+    def _get_tier_penalties(self, pairings):
+        """
+        Penalty counts of pairings above standings distance, highest tier
+        first: second byes, rematches, undefeated mismatches and the summed
+        squared score differences.
+        """
+        context = self._context
+        bye_repeats = repeats = undefeated_mismatches = score_distance = 0
+        for player_one, player_two in pairings:
+            score = self._get_player_score(player_one)
+            undefeated = player_one.id in context.undefeated_player_ids
+            if player_two is None:
+                bye_repeats += player_one.id in context.bye_history
+                undefeated_mismatches += undefeated
+                score_distance += score ** 2
+                continue
+            repeats += player_two.id in context.previous_opponents.get(player_one.id, ())
+            undefeated_mismatches += undefeated != (
+                player_two.id in context.undefeated_player_ids)
+            score_distance += (score - self._get_player_score(player_two)) ** 2
+        return bye_repeats, repeats, undefeated_mismatches, score_distance
+
+    def _get_tier_lower_bounds(self, sorted_players):
+        """
+        Lower bounds of _get_tier_penalties over every possible pairing.
+
+        An odd number of undefeated players leaves one of them facing someone
+        else or the bye. Squared score differences are smallest when the
+        scores are paired in sorted order, counting the bye as a score of 0.
+        """
+        context = self._context
+        scores = sorted(self._get_player_score(p) for p in sorted_players)
+        bye_repeats = 0
+        if len(scores) % 2:
+            scores.insert(0, 0)
+            bye_repeats = int(all(p.id in context.bye_history for p in sorted_players))
+        undefeated = sum(p.id in context.undefeated_player_ids for p in sorted_players)
+        score_distance = sum(
+            (scores[k + 1] - scores[k]) ** 2 for k in range(0, len(scores), 2))
+        return bye_repeats, 0, undefeated % 2, score_distance
+
+    def _has_repeat_pairing(self, pairings):
+        previous_opponents = self._context.previous_opponents
+        return any(
+            player_two is not None and
+            player_two.id in previous_opponents.get(player_one.id, set())
+            for player_one, player_two in pairings
+        )
+
+    def _pairings_from_mates(self, sorted_players, mate):
+        pairings = []
+        bye_player = None
+        for i, player in enumerate(sorted_players):
+            partner = mate[i]
+            if partner == len(sorted_players):
+                bye_player = player
+            elif partner > i:
+                pairings.append((player, sorted_players[partner]))
+
+        if bye_player:
+            pairings.append((bye_player, None))
+        return pairings
@@ -0,0 +1,62 @@
+// Keeps the fragments of a tournament detail page current. The page marks
+// its container with data-live-updates-url and data-live-revision, and each
+// refreshable fragment with data-live-fragment and data-live-digest.
+const LIVE_UPDATE_INTERVAL_MS = 15000
+
+function getLiveUpdatesContainer() {
+  return document.querySelector('[data-live-updates-url]')
+}
+
+async function pollLiveUpdates() {
+  const container = getLiveUpdatesContainer()
+  if (!container || document.hidden) return
+
+  const fragments = container.querySelectorAll('[data-live-fragment]')
+  if (!fragments.length) return
+
+  const params = new URLSearchParams({
+    revision: container.dataset.liveRevision,
+  })
+  fragments.forEach((fragment) => {
+    params.append(fragment.dataset.liveFragment, fragment.dataset.liveDigest)
+  })
+
+  const response = await fetch(
+    `${container.dataset.liveUpdatesUrl}?${params}`,
+    { headers: { Accept: 'application/json' } }
+  )
+  if (response.status !== 200) return
+
+  const update = await response.json()
+  // The page may have been swapped by htmx while the poll was in flight
+  if (container !== getLiveUpdatesContainer()) return
+
+  container.dataset.liveRevision = update.revision
+  Object.entries(update.fragments).forEach(([name, fragment]) => {
+    const element = container.querySelector(`[data-live-fragment="${name}"]`)
+    if (!element) return
+    element.innerHTML = fragment.html
+    element.dataset.liveDigest = fragment.digest
+    htmx.process(element)
+    if (fragment.unmatched_players) {
+      const unmatchedPlayers = JSON.stringify(fragment.unmatched_players)
+      document
+        .querySelectorAll('[data-unmatched-players]')
+        .forEach((modal) => (modal.dataset.unmatchedPlayers = unmatchedPlayers))
+    }
+  })
+}
+
+async function runLiveUpdates() {
+  try {
+    await pollLiveUpdates()
+  } catch (error) {
+    // Network hiccups are retried on the next tick
+  }
+  setTimeout(runLiveUpdates, LIVE_UPDATE_INTERVAL_MS)
+}
+
+setTimeout(runLiveUpdates, LIVE_UPDATE_INTERVAL_MS)
+document.addEventListener('visibilitychange', () => {
+  if (!document.hidden) pollLiveUpdates().catch(() => {})
+})
@@ -1,13 +1,21 @@
 import logging
+from unittest import mock
 from datetime import date, timedelta
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth.models import User
 from django.db import models
 from django.urls import reverse
 from .models import (
     Tournament, Player, Stage, StagePlayer, Round, Match, MatchResult,
-    StandingCalculator, get_pairing_strategy, GamesPlayedRankingCriterion
+    StandingCalculator, StandingMaterializer, StagePlayerStanding,
+    get_pairing_strategy, GamesPlayedRankingCriterion, SeedRankingCriterion,
+    StrengthOfScheduleRankingCriterion, WinsRankingCriterion, get_available_ranking_criteria
 )
+from .pairing_strategies import get_available_strategies
+from .pairing_strategies.swiss import PairingContext
+from .pairing_strategies.swiss_matching import max_weight_matching
 from pmc.models import Event, EventResult, Playgroup, PlaygroupEvent, PlaygroupMember
 
 logger = logging.getLogger(__name__)
@@ -843,8 +851,8 @@ class SwissPairingPerformanceTestCase(TestCase):
                 MatchResult.objects.create(match=match, winner=winner)
 
 
-class SwissTournamentTestCase(TestCase):
-    """Test complete Swiss tournaments with various player counts and round structures."""
+class SwissTournamentBaseTestCase(TestCase):
+    """Shared setup for tests that play out Swiss stages."""
 
     def setUp(self):
         """Set up common test data."""
@@ -912,6 +920,10 @@ class SwissTournamentTestCase(TestCase):
                         winner = match.player_two if random.random() < 0.6 else match.player_one
                     MatchResult.objects.create(match=match, winner=winner)
 
+
+class SwissTournamentTestCase(SwissTournamentBaseTestCase):
+    """Test complete Swiss tournaments with various player counts and round structures."""
+
     def _verify_no_duplicate_pairings(self, stage):
         """Verify that no two players have been paired more than once."""
         matches = Match.objects.filter(round__stage=stage)
@@ -2718,4 +2730,926 @@ class SwissFoldInterlaceTestCase(TestCase):
             paired.extend([one.id, two.id])
 
         self.assertEqual(
-            sorted(paired), sorted(sp.id for sp in stage_players))
\ No newline at end of file
+            sorted(paired), sorted(sp.id for sp in stage_players))
+
+
+class MaterializedStandingsTestCase(StandingsTestCase):
+    """StagePlayerStanding rows must always match a full recompute."""
+
+    def setUp(self):
+        super().setUp()
+        self.main_stage.are_ties_allowed = True
+        self.main_stage.save()
+        self.round1 = Round.objects.create(stage=self.main_stage, order=1)
+
+    def assertMaterialized(self):
+        self.assertEqual(StandingMaterializer.verify_stage(self.main_stage), [])
+
+    def test_rows_created_with_stage_players(self):
+        self.assertEqual(StagePlayerStanding.objects.filter(
+            stage_player__stage=self.main_stage).count(), 4)
+
+    def test_results_update_rows_incrementally(self):
+        match1 = Match.objects.create(
+            round=self.round1, player_one=self.stage_player1, player_two=self.stage_player2)
+        match2 = Match.objects.create(
+            round=self.round1, player_one=self.stage_player3, player_two=self.stage_player4)
+        self.assertMaterialized()
+
+        MatchResult.objects.create(
+            match=match1, winner=self.stage_player1, player_one_score=3, player_two_score=1)
+        result2 = MatchResult.objects.create(match=match2, winner=None)
+        self.assertMaterialized()
+
+        result2.winner = self.stage_player4
+        result2.player_two_score = 2
+        result2.save()
+        self.assertMaterialized()
+
+        round2 = Round.objects.create(stage=self.main_stage, order=2)
+        match3 = Match.objects.create(
+            round=round2, player_one=self.stage_player1, player_two=self.stage_player4)
+        bye = Match.objects.create(round=round2, player_one=self.stage_player2)
+        MatchResult.objects.create(match=bye, winner=self.stage_player2)
+        MatchResult.objects.create(match=match3, winner=self.stage_player4)
+        self.assertMaterialized()
+
+        standing = StagePlayerStanding.objects.get(stage_player=self.stage_player1)
+        self.assertEqual((standing.wins, standing.losses), (1, 1))
+        self.assertEqual(standing.num_opponents, 2)
+
+        match1.delete()
+        self.assertMaterialized()
+
+        round2.delete()
+        self.assertMaterialized()
+
+    def test_bulk_created_pairings_are_recorded(self):
+        get_pairing_strategy('swiss').make_pairings_for_round(self.round1)
+        for match in self.round1.matches.filter(player_two__isnull=False):
+            MatchResult.objects.create(match=match, winner=match.player_one)
+        self.assertMaterialized()
+
+    def test_bulk_created_pairings_update_each_player_once(self):
+        players = [self.stage_player1, self.stage_player2,
+                   self.stage_player3, self.stage_player4]
+        for order, repeats in [(2, 1), (3, 4)]:
+            round_obj = Round.objects.create(stage=self.main_stage, order=order)
+            matches = Match.objects.bulk_create([
+                Match(round=round_obj, player_one=players[i], player_two=players[i + 1])
+                for _ in range(repeats) for i in (0, 2)
+            ])
+            # Points read, savepoint, one update per player, revision, release
+            with self.assertNumQueries(4 + len(players)):
+                StandingMaterializer.record_new_matches(matches)
+        self.assertMaterialized()
+
+    def test_reset_and_delete_round_views_keep_rows_current(self):
+        match1 = Match.objects.create(
+            round=self.round1, player_one=self.stage_player1, player_two=self.stage_player2)
+        MatchResult.objects.create(match=match1, winner=self.stage_player2)
+        self.client.login(username='owner', password='password')
+
+        self.client.post(reverse('tourney:tourney-reset-match', kwargs={
+            'tournament_code': self.tournament.code, 'match_id': match1.id}))
+        self.assertFalse(MatchResult.objects.filter(match=match1).exists())
+        self.assertMaterialized()
+
+        self.client.post(reverse('tourney:tourney-report-result', kwargs={
+            'tournament_code': self.tournament.code, 'match_id': match1.id}),
+            {'winner': self.stage_player1.id})
+        self.assertTrue(MatchResult.objects.filter(match=match1).exists())
+        self.assertMaterialized()
+
+        self.client.post(reverse('tourney:tourney-delete-round', kwargs={
+            'tournament_code': self.tournament.code, 'round_id': self.round1.id}))
+        self.assertFalse(Match.objects.filter(id=match1.id).exists())
+        self.assertMaterialized()
+
+    def test_unmaterialized_stage_is_rebuilt_on_read(self):
+        match1 = Match.objects.create(
+            round=self.round1, player_one=self.stage_player1, player_two=self.stage_player2)
+        MatchResult.objects.create(match=match1, winner=self.stage_player2)
+        StagePlayerStanding.objects.filter(
+            stage_player__stage=self.main_stage).delete()
+
+        standings = StandingCalculator.get_stage_standings(self.main_stage)
+
+        self.assertEqual(standings[0]['stage_player'], self.stage_player2)
+        self.assertMaterialized()
+
+    def test_rebuild_locks_the_stage(self):
+        StagePlayerStanding.objects.filter(
+            stage_player__stage=self.main_stage).delete()
+        with mock.patch.object(
+                Stage.objects, 'select_for_update',
+                wraps=Stage.objects.select_for_update) as select_for_update:
+            StandingCalculator.get_stage_standings(self.main_stage)
+            StandingCalculator.get_stage_standings(self.main_stage)
+        select_for_update.assert_called_once_with()
+        self.assertMaterialized()
+
+    def test_standings_read_does_not_scan_matches(self):
+        match1 = Match.objects.create(
+            round=self.round1, player_one=self.stage_player1, player_two=self.stage_player2)
+        MatchResult.objects.create(match=match1, winner=self.stage_player2)
+        StandingCalculator.get_stage_standings(self.main_stage)
+
+        with self.assertNumQueries(3):
+            StandingCalculator.get_stage_standings(self.main_stage)
+
+
+class TournamentStandingsQueryCountTestCase(TestCase):
+    """get_tournament_standings must not issue per-player queries."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            'qc_owner', 'qc_owner@test.com', 'password')
+        self.tournament = Tournament.objects.create(
+            name='Query Count', owner=self.owner)
+        self.main_stage = Stage.objects.create(
+            tournament=self.tournament, name='Main Stage', order=1)
+        self.main_stage.set_ranking_criteria([
+            {'key': 'wins', 'enabled': True},
+            {'key': 'seed', 'enabled': True},
+        ])
+        self.playoff_stage = Stage.objects.create(
+            tournament=self.tournament, name='Playoff Stage', order=2,
+            pairing_strategy='single_elimination')
+        self.playoff_stage.set_ranking_criteria([
+            {'key': 'wins', 'enabled': True},
+            {'key': 'seed', 'enabled': True},
+        ])
+
+    def _build_event(self, num_players):
+        main_round = Round.objects.create(stage=self.main_stage, order=1)
+        main_players = []
+        for i in range(num_players):
+            user = User.objects.create_user(
+                f'qc_player_{num_players}_{i}', f'qc_{num_players}_{i}@test.com', 'password')
+            player = Player.objects.create(user=user, tournament=self.tournament)
+            main_players.append(StagePlayer.objects.create(
+                player=player, stage=self.main_stage, seed=i + 1, rank=i + 1))
+
+        for i in range(0, num_players, 2):
+            match = Match.objects.create(
+                round=main_round, player_one=main_players[i],
+                player_two=main_players[i + 1])
+            MatchResult.objects.create(match=match, winner=main_players[i])
+
+        playoff_round = Round.objects.create(stage=self.playoff_stage, order=1)
+        playoff_one = StagePlayer.objects.create(
+            player=main_players[0].player, stage=self.playoff_stage, seed=1)
+        playoff_two = StagePlayer.objects.create(
+            player=main_players[2].player, stage=self.playoff_stage, seed=2)
+        match = Match.objects.create(
+            round=playoff_round, player_one=playoff_one, player_two=playoff_two)
+        MatchResult.objects.create(match=match, winner=playoff_two)
+
+        main_players[-1].player.status = Player.PlayerStatus.DROPPED
+        main_players[-1].player.save()
+        return main_players
+
+    def _count_standings_queries(self):
+        StandingCalculator.get_tournament_standings(self.tournament)
+        with CaptureQueriesContext(connection) as context:
+            standings = StandingCalculator.get_tournament_standings(self.tournament)
+            for standing in standings:
+                standing['player'].get_display_name()
+        return len(context.captured_queries), standings
+
+    def test_totals_span_stages(self):
+        main_players = self._build_event(4)
+        _, standings = self._count_standings_queries()
+        by_player = {s['player'].id: s for s in standings}
+
+        winner = by_player[main_players[2].player.id]
+        self.assertEqual((winner['wins'], winner['losses']), (2, 0))
+        runner_up = by_player[main_players[0].player.id]
+        self.assertEqual((runner_up['wins'], runner_up['losses']), (1, 1))
+        self.assertEqual(standings[0]['player'], main_players[2].player)
+
+    def test_query_count_is_independent_of_player_count(self):
+        self._build_event(4)
+        small_count, _ = self._count_standings_queries()
+
+        Player.objects.filter(tournament=self.tournament).delete()
+        Round.objects.filter(stage__tournament=self.tournament).delete()
+        self._build_event(16)
+        large_count, standings = self._count_standings_queries()
+
+        self.assertEqual(len(standings), 16)
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, 10)
+
+
+class SwissPairingContextTestCase(SwissTournamentBaseTestCase):
+    """PairingContext loads stage history once and the helpers stay in memory."""
+
+    def test_context_loads_in_one_query(self):
+        _, stage, _, stage_players = self._create_tournament_with_players(5, 'Context Load')
+        a, b, c, d, e = stage_players
+        round1 = Round.objects.create(stage=stage, order=1)
+        MatchResult.objects.create(
+            match=Match.objects.create(round=round1, player_one=a, player_two=b), winner=a)
+        MatchResult.objects.create(
+            match=Match.objects.create(round=round1, player_one=c, player_two=d), winner=None)
+        MatchResult.objects.create(
+            match=Match.objects.create(round=round1, player_one=e), winner=e)
+        Match.objects.create(
+            round=Round.objects.create(stage=stage, order=2), player_one=a, player_two=c)
+
+        with self.assertNumQueries(1):
+            context = PairingContext.for_stage(stage, stage_players)
+
+        self.assertEqual(context.scores, {a.id: 1, e.id: 1})
+        self.assertEqual(context.previous_opponents, {
+            a.id: {b.id}, b.id: {a.id}, c.id: {d.id}, d.id: {c.id}})
+        self.assertEqual(context.bye_history, {e.id})
+        self.assertEqual(context.undefeated_player_ids, {a.id, e.id})
+
+    def test_pairing_helpers_issue_no_queries(self):
+        _, stage, _, stage_players = self._create_tournament_with_players(40, 'Context Helpers')
+        self._create_rounds_and_assign_results(stage, 2)
+
+        strategy = get_pairing_strategy('swiss')
+        strategy._context = PairingContext.for_stage(stage, stage_players)
+        sorted_players = strategy._get_sorted_players_by_standings(stage)
+
+        with self.assertNumQueries(0):
+            fold_players = strategy._fold_interlace(sorted_players)
+            pairings = strategy._force_pair_with_repeats(
+                fold_players, strategy._context.previous_opponents)
+            strategy._calculate_matching_score(
+                pairings, strategy._context.previous_opponents,
+                strategy._context.undefeated_player_ids)
+            strategy._backtrack_pair(
+                fold_players, [], set(), 0, strategy._context.previous_opponents)
+
+
+
+class SwissMatchingPairingTestCase(SwissTournamentBaseTestCase):
+    """Maximum-weight matching Swiss strategy."""
+
+    def _brute_force_best_weight(self, num_vertices, edges):
+        weights = {}
+        for i, j, weight in edges:
+            weights[(i, j)] = weights[(j, i)] = weight
+
+        def best(remaining):
+            if not remaining:
+                return (0, 0)
+            first, rest = remaining[0], remaining[1:]
+            result = best(rest)
+            for other in rest:
+                if (first, other) in weights:
+                    size, total = best([v for v in rest if v != other])
+                    result = max(result, (size + 1, total + weights[(first, other)]))
+            return result
+
+        return best(list(range(num_vertices)))
+
+    def test_blossom_matches_brute_force(self):
+        import random
+        rng = random.Random(7)
+        for _ in range(200):
+            num_vertices = rng.randint(2, 9)
+            edges = [
+                (i, j, rng.randint(-5, 20))
+                for i in range(num_vertices)
+                for j in range(i + 1, num_vertices)
+                if rng.random() < 0.6
+            ]
+            mate = max_weight_matching(num_vertices, edges, maxcardinality=True)
+
+            weights = {(i, j): weight for i, j, weight in edges}
+            size = 0
+            total = 0
+            for v, partner in enumerate(mate):
+                if partner > v:
+                    self.assertEqual(mate[partner], v)
+                    size += 1
+                    total += weights[(v, partner)]
+            self.assertEqual(
+                (size, total), self._brute_force_best_weight(num_vertices, edges))
+
+    def test_strategy_is_registered(self):
+        self.assertIn('swiss_matching', get_available_strategies())
+
+    def _play_rounds(self, stage, strategy, round_count):
+        for round_num in range(1, round_count + 1):
+            round_obj = Round.objects.create(stage=stage, order=round_num)
+            strategy.make_pairings_for_round(round_obj)
+            for match in Match.objects.filter(round=round_obj, player_two__isnull=False):
+                winner = match.player_one if match.player_one.seed < match.player_two.seed else match.player_two
+                MatchResult.objects.create(match=match, winner=winner)
+
+    def test_no_repeats_or_second_byes(self):
+        _, stage, _, _ = self._create_tournament_with_players(13, 'Matching Small')
+        strategy = get_pairing_strategy('swiss_matching')
+        self._play_rounds(stage, strategy, 5)
+
+        seen_pairs = set()
+        bye_players = []
+        for match in Match.objects.filter(round__stage=stage):
+            if match.player_two_id is None:
+                bye_players.append(match.player_one_id)
+                continue
+            pair = frozenset((match.player_one_id, match.player_two_id))
+            self.assertNotIn(pair, seen_pairs)
+            seen_pairs.add(pair)
+        self.assertEqual(len(bye_players), 5)
+        self.assertEqual(len(set(bye_players)), 5)
+
+    def test_pairs_within_score_groups(self):
+        _, stage, _, stage_players = self._create_tournament_with_players(8, 'Matching Groups')
+        strategy = get_pairing_strategy('swiss_matching')
+        self._play_rounds(stage, strategy, 1)
+
+        round2 = Round.objects.create(stage=stage, order=2)
+        strategy.make_pairings_for_round(round2)
+        for match in Match.objects.filter(round=round2):
+            self.assertEqual(
+                strategy._get_player_score(match.player_one),
+                strategy._get_player_score(match.player_two))
+
+    def test_windowed_matching_is_optimal_above_standings_distance(self):
+        import random
+        from types import SimpleNamespace
+        rng = random.Random(11)
+        strategy = get_pairing_strategy('swiss_matching')
+        solve_full_graph = mock.patch.object(
+            strategy, '_get_pairing_edges', wraps=strategy._get_pairing_edges)
+        fallbacks = 0
+        for _ in range(60):
+            count = rng.randint(6, 16)
+            players = [SimpleNamespace(id=i + 1) for i in range(count)]
+            scores = {p.id: rng.randint(0, 3) for p in players}
+            previous_opponents = {}
+            for _ in range(rng.randint(0, count * 2)):
+                a, b = rng.sample(players, 2)
+                previous_opponents.setdefault(a.id, set()).add(b.id)
+                previous_opponents.setdefault(b.id, set()).add(a.id)
+            strategy._context = PairingContext(
+                scores=scores, previous_opponents=previous_opponents,
+                bye_history={p.id for p in players if rng.random() < 0.3},
+                undefeated_player_ids={p.id for p in players if scores[p.id] == 3})
+            players.sort(key=lambda p: -scores[p.id])
+
+            strategy.pairing_window = 2
+            with solve_full_graph as get_pairing_edges:
+                windowed = strategy._get_tier_penalties(strategy._max_weight_pairing(players))
+            fallbacks += get_pairing_edges.call_count - 1
+            strategy.pairing_window = count
+            full = strategy._get_tier_penalties(strategy._max_weight_pairing(players))
+
+            self.assertEqual(windowed, full)
+            self.assertGreaterEqual(full, strategy._get_tier_lower_bounds(players))
+        self.assertGreater(fallbacks, 0)
+
+    def test_large_field_is_fast(self):
+        import time
+        _, stage, _, stage_players = self._create_tournament_with_players(256, 'Matching Large')
+        strategy = get_pairing_strategy('swiss_matching')
+        self._play_rounds(stage, strategy, 3)
+
+        strategy._context = PairingContext.for_stage(stage, stage_players)
+        sorted_players = strategy._get_sorted_players_by_standings(stage)
+        # Time only the matching; the standings read above is database work
+        start = time.perf_counter()
+        pairings = strategy._max_weight_pairing(sorted_players)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(pairings), 128)
+        self.assertFalse(strategy._has_repeat_pairing(pairings))
+        self.assertLess(elapsed, 0.5)
+
+
+class SwissExhaustiveSearchTestCase(TestCase):
+    """Branch-and-bound exhaustive search picks the same pairings as full enumeration."""
+
+    def _make_strategy(self, rng, player_count):
+        from types import SimpleNamespace
+        players = [SimpleNamespace(id=i + 1) for i in range(player_count)]
+        scores = {p.id: rng.randint(0, 3) for p in players}
+        previous_opponents = {}
+        for _ in range(rng.randint(0, player_count * 2)):
+            a, b = rng.sample(players, 2)
+            previous_opponents.setdefault(a.id, set()).add(b.id)
+            previous_opponents.setdefault(b.id, set()).add(a.id)
+        undefeated_player_ids = {p.id for p in players if scores[p.id] == 3}
+        bye_history = {p.id for p in players if rng.random() < 0.3}
+
+        strategy = get_pairing_strategy('swiss')
+        strategy._context = PairingContext(
+            scores=scores, previous_opponents=previous_opponents,
+            bye_history=bye_history, undefeated_player_ids=undefeated_player_ids)
+        players.sort(key=lambda p: -scores[p.id])
+        return strategy, players
+
+    def _all_matchings(self, players):
+        if not players:
+            return [[]]
+        matchings = []
+        for i in range(1, len(players)):
+            remaining = players[1:i] + players[i + 1:]
+            for sub_matching in self._all_matchings(remaining):
+                matchings.append([(players[0], players[i])] + sub_matching)
+        return matchings
+
+    def _enumerated_best_matching(self, strategy, players):
+        """First highest scoring matching in _all_matchings order."""
+        context = strategy._context
+        best, best_score = None, float('-inf')
+        for matching in self._all_matchings(players):
+            score = strategy._calculate_matching_score(
+                matching, context.previous_opponents, context.undefeated_player_ids)
+            if score > best_score:
+                best, best_score = matching, score
+        return best, best_score
+
+    def _memoized_best_matching(self, strategy, players):
+        """
+        The same matching as _enumerated_best_matching, with the enumeration
+        memoized on the remaining players so fields of 16 stay tractable.
+        Matching scores are integer sums of pair scores, so the first best
+        matching is the first best pair for players[0] followed by the first
+        best matching of the rest.
+        """
+        from functools import lru_cache
+        context = strategy._context
+
+        # Players are keyed by index, as the test players are not hashable
+        @lru_cache(maxsize=None)
+        def best(remaining):
+            if not remaining:
+                return [], 0
+            first = players[remaining[0]]
+            best_matching, best_score = None, float('-inf')
+            for i in range(1, len(remaining)):
+                second = players[remaining[i]]
+                pair_score = strategy._pairing_score(
+                    first, second, context.previous_opponents,
+                    context.undefeated_player_ids)
+                sub_matching, sub_score = best(remaining[1:i] + remaining[i + 1:])
+                if pair_score + sub_score > best_score:
+                    best_matching = [(first, second)] + sub_matching
+                    best_score = pair_score + sub_score
+            return best_matching, best_score
+
+        return best(tuple(range(len(players))))
+
+    def _expected_pairings(self, strategy, players, round_number, find_best_matching):
+        """Bye tiers and candidates in the strategy's order, each matched by find_best_matching."""
+        context = strategy._context
+        if len(players) % 2 == 0:
+            return find_best_matching(strategy, players)[0]
+
+        for tier in strategy._get_bye_candidates_by_priority(
+                players, context.bye_history, round_number):
+            best, best_score = None, float('-inf')
+            for candidate in tier:
+                matching, score = find_best_matching(
+                    strategy, [p for p in players if p.id != candidate.id])
+                score += strategy._pairing_score(
+                    candidate, None, context.previous_opponents, context.undefeated_player_ids)
+                if score > best_score:
+                    best, best_score = matching + [(candidate, None)], score
+            if best:
+                return best
+
+    def test_matches_full_enumeration(self):
+        import random
+        rng = random.Random(11)
+        for _ in range(100):
+            strategy, players = self._make_strategy(rng, rng.choice([2, 4, 6, 8]))
+            context = strategy._context
+            expected, expected_score = self._enumerated_best_matching(strategy, players)
+
+            matching, score = strategy._find_best_matching(
+                players, context.previous_opponents, context.undefeated_player_ids)
+            self.assertEqual(matching, expected)
+            self.assertEqual(score, expected_score)
+
+    def test_odd_fields_match_full_enumeration(self):
+        import random
+        rng = random.Random(13)
+        for _ in range(60):
+            strategy, players = self._make_strategy(rng, rng.choice([3, 5, 7, 9, 11]))
+            context = strategy._context
+            self.assertEqual(
+                strategy._exhaustive_search_pairing(
+                    players, context.previous_opponents, 3, context.undefeated_player_ids),
+                self._expected_pairings(strategy, players, 3, self._enumerated_best_matching))
+
+    def test_memoized_enumeration_matches_full_enumeration(self):
+        import random
+        rng = random.Random(17)
+        for _ in range(30):
+            strategy, players = self._make_strategy(rng, rng.choice([4, 6, 8, 10]))
+            self.assertEqual(
+                self._memoized_best_matching(strategy, players),
+                self._enumerated_best_matching(strategy, players))
+
+    def test_fields_up_to_sixteen_match_enumeration(self):
+        import random
+        from types import SimpleNamespace
+        rng = random.Random(19)
+        round_obj = SimpleNamespace(stage=None, order=3)
+        for player_count in range(9, 17):
+            for _ in range(2):
+                strategy, players = self._make_strategy(rng, player_count)
+                # Fold interlacing shuffles, so fix one interlaced order
+                fold_players = strategy._fold_interlace(players)
+                expected = self._expected_pairings(
+                    strategy, fold_players, 3, self._memoized_best_matching)
+                with mock.patch.object(
+                        strategy, '_get_sorted_players_by_standings', return_value=players), \
+                        mock.patch.object(
+                            strategy, '_fold_interlace', return_value=fold_players) as fold:
+                    self.assertEqual(
+                        strategy._brute_force_pairing(round_obj, players), expected,
+                        f'{player_count} players')
+                fold.assert_called_once_with(players)
+
+    def test_sixteen_players_is_fast(self):
+        import random
+        import time
+        rng = random.Random(5)
+        for _ in range(5):
+            strategy, players = self._make_strategy(rng, 16)
+            context = strategy._context
+            start = time.perf_counter()
+            pairings = strategy._exhaustive_search_pairing(
+                players, context.previous_opponents, 3, context.undefeated_player_ids)
+            self.assertLess(time.perf_counter() - start, 1.0)
+            self.assertEqual(len(pairings), 8)
+
+
+class PairingBenchmarkTestCase(TestCase):
+    """Pairing benchmark harness and command."""
+
+    def test_swiss_rounds_are_measured(self):
+        from .pairing_benchmark import BENCHMARK_FIELDS, simulate_strategy
+        rows = simulate_strategy('swiss', 9, 3, seed=1)
+
+        self.assertEqual([row['round'] for row in rows], [1, 2, 3])
+        for row in rows:
+            self.assertEqual(list(row), BENCHMARK_FIELDS)
+            self.assertEqual(row['matches'], 5)
+            self.assertEqual(row['byes'], 1)
+            self.assertEqual(row['repeat_pairings'], 0)
+            self.assertEqual(row['repeat_byes'], 0)
+            self.assertGreater(row['queries'], 0)
+
+    def test_simulation_is_rolled_back(self):
+        from .pairing_benchmark import simulate_strategy
+        simulate_strategy('single_elimination', 8, 5, seed=1)
+        self.assertFalse(Tournament.objects.exists())
+        self.assertFalse(Match.objects.exists())
+
+    def test_single_elimination_stops_at_final(self):
+        from .pairing_benchmark import simulate_strategy
+        rows = simulate_strategy('single_elimination', 8, 10, seed=1)
+        self.assertEqual([row['matches'] for row in rows], [4, 2, 1])
+
+    def test_command_writes_csv(self):
+        import csv
+        import io
+        from django.core.management import call_command
+
+        out = io.StringIO()
+        call_command(
+            'benchmark_pairings', '--players', '4', '--rounds', '2',
+            '--strategy', 'swiss', '--seed', '3', '--format', 'csv', stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['strategy'], 'swiss')
+        self.assertEqual(rows[0]['players'], '4')
+        # The simulation ran in the in-memory database
+        self.assertFalse(User.objects.filter(username='pairing_benchmark').exists())
+
+    def test_seed_does_not_touch_the_global_random_state(self):
+        import random
+        from .pairing_benchmark import simulate_strategy
+        with mock.patch('random.seed') as seed:
+            first = simulate_strategy('swiss', 9, 3, seed=5)
+        seed.assert_not_called()
+
+        random.seed(99)
+        second = simulate_strategy('swiss', 9, 3, seed=5)
+        for rows in (first, second):
+            for row in rows:
+                row.pop('wall_time_ms')
+        self.assertEqual(first, second)
+
+    def test_use_database_restores_routers_on_error(self):
+        from django.db import router
+        from .pairing_benchmark import use_database
+        routers = list(router.routers)
+        with self.assertRaises(ValueError):
+            with use_database('other'):
+                self.assertEqual(router.db_for_read(Tournament), 'other')
+                raise ValueError
+        self.assertEqual(router.routers, routers)
+        self.assertEqual(router.db_for_read(Tournament), 'default')
+
+
+class ColumnarStandingsTestCase(SwissTournamentBaseTestCase):
+    """Standings are ranked from per-criterion value columns."""
+
+    def test_calculate_values_match_calculate_value(self):
+        _, stage, _, _ = self._create_tournament_with_players(11, 'Columns')
+        self._create_rounds_and_assign_results(stage, 3)
+
+        stage_players = list(stage.stage_players.all())
+        standings_cache = StandingCalculator._load_standings_cache(stage_players, stage)
+        for criterion in get_available_ranking_criteria():
+            self.assertEqual(
+                criterion.calculate_values(stage_players, stage, standings_cache),
+                [criterion.calculate_value(sp, stage, standings_cache) for sp in stage_players],
+                criterion.get_key())
+
+    def test_rank_by_columns_matches_tuple_sort(self):
+        import random
+        rng = random.Random(4)
+        criteria = [WinsRankingCriterion(), StrengthOfScheduleRankingCriterion(), SeedRankingCriterion()]
+        for _ in range(50):
+            size = rng.randint(1, 30)
+            columns = [
+                [rng.randint(0, 3) for _ in range(size)],
+                [rng.choice([0, 0.5, 1.5, 2]) for _ in range(size)],
+                [rng.randint(1, 4) for _ in range(size)],
+            ]
+            expected = sorted(
+                range(size), key=lambda i: (-columns[0][i], -columns[1][i], columns[2][i]))
+            self.assertEqual(StandingCalculator._rank_by_columns(criteria, columns), expected)
+
+    def test_head_to_head_ties_load_results_once(self):
+        _, stage, _, _ = self._create_tournament_with_players(24, 'Head To Head')
+        stage.set_ranking_criteria([
+            {'key': 'wins', 'enabled': True},
+            {'key': 'head_to_head', 'enabled': True},
+            {'key': 'seed', 'enabled': True},
+        ])
+        self._create_rounds_and_assign_results(stage, 2)
+
+        stage = Stage.objects.get(pk=stage.pk)
+        with self.assertNumQueries(4):
+            standings = StandingCalculator.get_stage_standings(stage)
+        self.assertEqual(len(standings), 24)
+        self.assertTrue(all('head_to_head_value' in s for s in standings))
+
+
+class HeadToHeadMiniLeagueTestCase(TestCase):
+    """Head-to-head ties are resolved by recursive mini-leagues."""
+
+    def setUp(self):
+        owner = User.objects.create_user('h2h_owner', 'h2h@test.com', 'password')
+        tournament = Tournament.objects.create(name='H2H', owner=owner)
+        self.stage = Stage.objects.create(
+            tournament=tournament, name='Main Stage', order=1, pairing_strategy='swiss')
+        self.stage.set_ranking_criteria([
+            {'key': 'wins', 'enabled': True},
+            {'key': 'head_to_head', 'enabled': True},
+            {'key': 'seed', 'enabled': True},
+        ])
+        # Seeds run against the alphabet so seed alone would reverse A-D
+        self.players = {}
+        for name, seed in [('a', 4), ('b', 3), ('c', 2), ('d', 1), ('e', 5), ('f', 6)]:
+            player = Player.objects.create(tournament=tournament, nickname=name)
+            self.players[name] = StagePlayer.objects.create(
+                player=player, stage=self.stage, seed=seed)
+        self.round_count = 0
+
+    def _win(self, winner, loser):
+        self.round_count += 1
+        round_obj = Round.objects.create(stage=self.stage, order=self.round_count)
+        match = Match.objects.create(
+            round=round_obj, player_one=self.players[winner], player_two=self.players[loser])
+        MatchResult.objects.create(match=match, winner=self.players[winner])
+
+    def _ranked_names(self):
+        standings = StandingCalculator.get_stage_standings(self.stage)
+        return [s['stage_player'].player.nickname for s in standings]
+
+    def test_mini_league_recurses_into_remaining_ties(self):
+        for winner, loser in [('a', 'b'), ('b', 'c'), ('c', 'd'),
+                              ('a', 'e'), ('b', 'e'), ('c', 'f'), ('d', 'f'), ('d', 'e')]:
+            self._win(winner, loser)
+
+        self.assertEqual(self._ranked_names(), ['a', 'b', 'c', 'd', 'e', 'f'])
+        standings = StandingCalculator.get_stage_standings(self.stage)
+        self.assertEqual([s['head_to_head_value'] for s in standings[:4]], [1, 1, 1, 0])
+
+    def test_unresolved_cycle_falls_back_to_next_criterion(self):
+        for winner, loser in [('a', 'b'), ('b', 'c'), ('c', 'a')]:
+            self._win(winner, loser)
+
+        self.assertEqual(self._ranked_names()[:3], ['c', 'b', 'a'])
+
+    def test_win_graph_loaded_once(self):
+        for winner, loser in [('a', 'b'), ('c', 'd'), ('e', 'f')]:
+            self._win(winner, loser)
+
+        with CaptureQueriesContext(connection) as queries:
+            StandingCalculator.get_stage_standings(self.stage)
+        result_queries = [
+            q for q in queries.captured_queries if 'tourney_matchresult' in q['sql']]
+        self.assertEqual(len(result_queries), 1)
+
+
+class TournamentDetailCacheTestCase(TestCase):
+    """Detail page fragments are cached per tournament revision."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.owner = User.objects.create_user('cache_owner', 'owner@test.com', 'password')
+        self.viewer = User.objects.create_user('cache_viewer', 'viewer@test.com', 'password')
+        self.tournament = Tournament.objects.create(name='Cached', owner=self.owner)
+        self.stage = Stage.objects.create(
+            tournament=self.tournament, name='Main Stage', order=1, pairing_strategy='swiss')
+        self.stage_players = []
+        for i in range(4):
+            player = Player.objects.create(tournament=self.tournament, nickname=f'Cached {i + 1}')
+            self.stage_players.append(
+                StagePlayer.objects.create(player=player, stage=self.stage, seed=i + 1))
+        self.round = Round.objects.create(stage=self.stage, order=1)
+        self.match = Match.objects.create(
+            round=self.round, player_one=self.stage_players[0], player_two=self.stage_players[1])
+
+    def _revision(self):
+        return Tournament.objects.values_list('revision', flat=True).get(pk=self.tournament.pk)
+
+    def test_writes_bump_revision(self):
+        revision = self._revision()
+        MatchResult.objects.create(match=self.match, winner=self.stage_players[0])
+        self.assertGreater(self._revision(), revision)
+
+        revision = self._revision()
+        self.stage_players[2].player.status = Player.PlayerStatus.DROPPED
+        self.stage_players[2].player.save()
+        self.assertGreater(self._revision(), revision)
+
+        revision = self._revision()
+        strategy = get_pairing_strategy('swiss')
+        strategy.make_pairings_for_round(Round.objects.create(stage=self.stage, order=2))
+        self.assertGreater(self._revision(), revision)
+
+    def test_stale_instance_does_not_roll_back_revision(self):
+        stale = Tournament.objects.get(pk=self.tournament.pk)
+        Tournament.bump_revision(pk=self.tournament.pk)
+        revision = self._revision()
+
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertGreater(self._revision(), revision)
+        self.assertEqual(Tournament.objects.get(pk=self.tournament.pk).name, 'Renamed')
+
+    def _standings_fragment(self):
+        from .detail_cache import TournamentDetailCache
+        from .views import render_standings_table
+        tournament = Tournament.objects.get(pk=self.tournament.pk)
+        return TournamentDetailCache.get_or_render(
+            tournament, 'standings', lambda: render_standings_table(tournament, self.stage))
+
+    def test_standings_served_from_cache_until_revision_changes(self):
+        from .detail_cache import TournamentDetailCache
+
+        self._standings_fragment()
+        self.assertEqual(TournamentDetailCache.get_metrics()['misses'], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            html = self._standings_fragment()
+        self.assertEqual(TournamentDetailCache.get_metrics()['hits'], 1)
+        self.assertFalse(any(
+            'tourney_stageplayerstanding' in q['sql'] for q in queries.captured_queries))
+        self.assertIn('Cached 1', html)
+
+        MatchResult.objects.create(match=self.match, winner=self.stage_players[0])
+        updated = self._standings_fragment()
+        self.assertEqual(TournamentDetailCache.get_metrics()['misses'], 2)
+        self.assertNotEqual(html, updated)
+
+    def test_variants_are_cached_separately(self):
+        from .detail_cache import TournamentDetailCache
+        TournamentDetailCache.get_or_build(self.tournament, 'matches', lambda: 'public')
+        value = TournamentDetailCache.get_or_build(
+            self.tournament, 'matches', lambda: 'player', variant='player-1')
+        self.assertEqual(value, 'player')
+        self.assertEqual(TournamentDetailCache.get_or_build(
+            self.tournament, 'matches', lambda: 'rebuilt'), 'public')
+
+    def test_page_context_is_built_once_per_revision(self):
+        from django.test import RequestFactory
+        from .views import get_tournament_base_context
+        request = RequestFactory().get('/')
+        request.user = self.viewer
+
+        def get_context():
+            tournament = Tournament.objects.get(pk=self.tournament.pk)
+            return get_tournament_base_context(request, tournament)
+
+        first = get_context()
+        with CaptureQueriesContext(connection) as queries:
+            second = get_context()
+        self.assertEqual(second['current_stage'], first['current_stage'])
+        self.assertEqual(second['current_round'], self.round)
+        self.assertFalse(any(
+            'FROM "tourney_stage"' in q['sql'] or 'FROM "tourney_round"' in q['sql']
+            for q in queries.captured_queries))
+
+        # Each user's own role is still read per request
+        self.assertFalse(second['is_admin'])
+        request.user = self.owner
+        self.assertTrue(get_context()['is_admin'])
+
+    def test_metrics_require_staff(self):
+        url = reverse('tourney:tourney-detail-cache-metrics')
+        self.client.login(username='cache_viewer', password='password')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.viewer.is_staff = True
+        self.viewer.save()
+        response = self.client.get(url)
+        self.assertEqual(response.json(), {'hits': 0, 'misses': 0, 'hit_rate': None})
+
+
+class TournamentLiveUpdatesTestCase(TestCase):
+    """The live updates endpoint only sends fragments that changed."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.owner = User.objects.create_user('live_owner', 'owner@test.com', 'password')
+        self.viewer = User.objects.create_user('live_viewer', 'viewer@test.com', 'password')
+        self.tournament = Tournament.objects.create(name='Live', owner=self.owner)
+        self.stage = Stage.objects.create(
+            tournament=self.tournament, name='Main Stage', order=1, pairing_strategy='swiss')
+        self.stage_players = []
+        for i in range(4):
+            player = Player.objects.create(tournament=self.tournament, nickname=f'Live {i + 1}')
+            self.stage_players.append(
+                StagePlayer.objects.create(player=player, stage=self.stage, seed=i + 1))
+        self.round = Round.objects.create(stage=self.stage, order=1)
+        self.match = Match.objects.create(
+            round=self.round, player_one=self.stage_players[0], player_two=self.stage_players[1])
+        self.url = reverse('tourney:tourney-live-updates', args=[self.tournament.code])
+        self.client.login(username='live_viewer', password='password')
+
+    def _revision(self):
+        return Tournament.objects.values_list('revision', flat=True).get(pk=self.tournament.pk)
+
+    def _clear_revision_cache(self):
+        from django.core.cache import cache
+        cache.delete(f'tourney:live:revision:{self.tournament.pk}')
+
+    def test_unchanged_revision_is_answered_without_rendering(self):
+        revision = self._revision()
+        self.client.get(self.url, {'revision': revision, 'matches': ''})
+        # Session, user and tournament; the revision comes from the shared cache
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'revision': revision, 'matches': ''})
+        self.assertEqual(response.status_code, 204)
+
+    def test_stale_revision_returns_requested_fragments(self):
+        response = self.client.get(self.url, {'revision': -1, 'matches': '', 'standings': ''})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['revision'], self._revision())
+        self.assertEqual(set(data['fragments']), {'matches', 'standings'})
+        self.assertIn('Live 2', data['fragments']['matches']['html'])
+        self.assertEqual(
+            [p['name'] for p in data['fragments']['matches']['unmatched_players']],
+            ['Live 3', 'Live 4'])
+
+    def test_only_changed_fragments_are_sent(self):
+        data = self.client.get(
+            self.url, {'revision': -1, 'matches': '', 'standings': ''}).json()
+        digests = {name: f['digest'] for name, f in data['fragments'].items()}
+
+        # Saving the tournament bumps the revision without changing either fragment
+        Tournament.objects.get(pk=self.tournament.pk).save()
+        self._clear_revision_cache()
+        response = self.client.get(self.url, {'revision': data['revision'], **digests})
+        self.assertEqual(response.json()['fragments'], {})
+
+        MatchResult.objects.create(match=self.match, winner=self.stage_players[0])
+        self._clear_revision_cache()
+        response = self.client.get(self.url, {'revision': data['revision'], **digests})
+        self.assertEqual(set(response.json()['fragments']), {'matches', 'standings'})
+
+    def test_private_tournament_requires_login(self):
+        from django.contrib.auth.models import AnonymousUser
+        from django.core.exceptions import PermissionDenied
+        from django.test import RequestFactory
+        from .views import tournament_live_updates
+
+        request = RequestFactory().get(self.url, {'revision': 0})
+        request.user = AnonymousUser()
+        with self.assertRaises(PermissionDenied):
+            tournament_live_updates(request, self.tournament.code)
+
+    def test_revision_is_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
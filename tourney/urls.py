@@ -8,12 +8,16 @@ urlpatterns = [
     path('create/', views.create_tournament, name='tourney-create-tournament'),
     path('create/from-event/<int:event_id>/',
          views.create_tournament_from_event, name='tourney-create-from-event'),
+    path('cache-metrics/', views.tournament_detail_cache_metrics,
+         name='tourney-detail-cache-metrics'),
     path('<str:tournament_code>/', views.tournament_detail_matches,
          name='tourney-detail-home'),
     path('<str:tournament_code>/matches/',
          views.tournament_detail_matches, name='tourney-detail-matches'),
     path('<str:tournament_code>/standings/',
          views.tournament_detail_standings, name='tourney-detail-standings'),
+    path('<str:tournament_code>/updates/',
+         views.tournament_live_updates, name='tourney-live-updates'),
     path('<str:tournament_code>/admin/', views.tournament_detail_admin,
          name='tourney-tournament-detail-admin'),
     path('<str:tournament_code>/admin/add/',
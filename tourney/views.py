@@ -1,15 +1,18 @@
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
+from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
 from django.core.paginator import Paginator
 from django.db import transaction, IntegrityError
 from django.db import models
 from django.db.models import Q, F, Case, When, Value, IntegerField
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import render, get_object_or_404
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.views.decorators.http import require_POST, require_GET
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 import json
 import re
@@ -20,6 +23,8 @@ from .models import (
     get_pairing_strategy, get_available_ranking_criteria,
     get_ordered_criteria_display
 )
+from .detail_cache import TournamentDetailCache
+from .live_updates import TournamentLiveUpdates
 from .forms import (
     TournamentForm, PlayerForm, EditPlayerForm, StageForm, MatchResultForm,
     PlayerRegistrationForm, AddMatchForm, SelectPlaygroupForm, TournamentExportForm
@@ -239,9 +244,6 @@ def edit_tournament(request, tournament_code):
 
 
 def get_tournament_base_context(request, tournament):
-    current_stage = tournament.get_current_stage()
-    current_round = current_stage.get_current_round() if current_stage else None
-
     is_admin = False
     player = None
     is_player = False
@@ -258,21 +260,13 @@ def get_tournament_base_context(request, tournament):
         except Player.DoesNotExist:
             pass
 
-    can_create_round = False
-    can_start_next_stage = False
-    can_start_current_stage = False
-    next_stage = None
-    if is_admin:
-        can_create_round = tournament.can_create_round_in_current_stage()
-        can_start_next_stage = tournament.can_start_next_stage()
-        next_stage = tournament.get_next_stage()
-
-        if current_stage and not current_stage.rounds.exists():
-            can_start_current_stage = True
-            can_create_round = False
-
-        if current_stage:
-            latest_round = current_stage.rounds.order_by('-order').first()
+    # Everything but the user's own role and matches only changes with the
+    # tournament, so it is built once per revision
+    stage_context = TournamentDetailCache.get_or_build(
+        tournament, 'base-context',
+        lambda: get_tournament_stage_context(tournament, is_admin),
+        'admin' if is_admin else 'public')
+    current_stage = stage_context['current_stage']
 
     pending_matches = []
     if request.user.is_authenticated and is_active_player:
@@ -294,6 +288,7 @@ def get_tournament_base_context(request, tournament):
                 'player_two__player'
             ).order_by('round__stage__order', 'round__order')
 
+    # Timers run down without touching the tournament, so they are read live
     active_timer = tournament.get_active_timer()
     timer_context = None
     if active_timer:
@@ -305,10 +300,8 @@ def get_tournament_base_context(request, tournament):
             'pause_time_remaining_seconds': active_timer.pause_time_remaining_seconds,
         }
 
-    default_timer_name = f'{tournament.name} - Round {current_round.order}' if current_round else f'{tournament.name} - Timer'
-    default_timer_minutes = current_stage.round_length_in_minutes if current_stage and current_stage.round_length_in_minutes else 50
-
     return {
+        **stage_context,
         'tournament': tournament,
         'stages': tournament.stages.all(),
         'is_admin': is_admin,
@@ -316,16 +309,41 @@ def get_tournament_base_context(request, tournament):
         'is_active_player': is_active_player,
         'is_dropped_player': is_dropped_player,
         'player': player,
+        'pending_matches': pending_matches,
+        'user': request.user,
+        'active_timer': active_timer,
+        'timer_context': timer_context,
+    }
+
+
+def get_tournament_stage_context(tournament, is_admin):
+    """The part of the base context that only depends on the tournament."""
+    current_stage = tournament.get_current_stage()
+    current_round = current_stage.get_current_round() if current_stage else None
+
+    can_create_round = False
+    can_start_next_stage = False
+    can_start_current_stage = False
+    next_stage = None
+    if is_admin:
+        can_create_round = tournament.can_create_round_in_current_stage()
+        can_start_next_stage = tournament.can_start_next_stage()
+        next_stage = tournament.get_next_stage()
+
+        if current_stage and not current_stage.rounds.exists():
+            can_start_current_stage = True
+            can_create_round = False
+
+    default_timer_name = f'{tournament.name} - Round {current_round.order}' if current_round else f'{tournament.name} - Timer'
+    default_timer_minutes = current_stage.round_length_in_minutes if current_stage and current_stage.round_length_in_minutes else 50
+
+    return {
         'can_create_round': can_create_round,
         'can_start_next_stage': can_start_next_stage,
         'can_start_current_stage': can_start_current_stage,
         'next_stage': next_stage,
         'current_stage': current_stage,
         'current_round': current_round,
-        'pending_matches': pending_matches,
-        'user': request.user,
-        'active_timer': active_timer,
-        'timer_context': timer_context,
         'default_timer_name': default_timer_name,
         'default_timer_minutes': default_timer_minutes,
     }
@@ -333,9 +351,70 @@ def get_tournament_base_context(request, tournament):
 
 def tournament_detail_matches(request, tournament_code):
     tournament = get_object_or_404(Tournament, code=tournament_code)
+    context = get_tournament_matches_context(request, tournament)
+
+    if request.htmx:
+        return render(request, 'tourney/partials/tournament-detail-matches-content.html', context)
+    return render(request, 'tourney/tournament-detail-matches.html', context)
+
+
+def get_tournament_matches_context(request, tournament):
     context = get_tournament_base_context(request, tournament)
     context['current_tab'] = 'matches'
+    current_stage = context['current_stage']
+
+    can_add_match = False
+    can_report_result = False
+    show_unmatched_players = True
+    if current_stage:
+        pairing_strategy = current_stage.get_pairing_strategy()
+        is_self_scheduled = pairing_strategy.is_self_scheduled()
+        is_elimination_style = pairing_strategy.is_elimination_style()
+
+        if request.user.is_authenticated:
+            user_is_admin = tournament.is_user_admin(request.user)
+            user_is_player = tournament.players.filter(
+                user=request.user).exists()
+            can_report_result = is_self_scheduled and user_is_player
+            can_add_match = user_is_admin or can_report_result
 
+        show_unmatched_players = not (
+            is_elimination_style or is_self_scheduled)
+
+    context.update({
+        'can_add_match': can_add_match,
+        'can_report_result': can_report_result,
+        'show_unmatched_players': show_unmatched_players,
+        'selected_stage': current_stage,
+    })
+
+    matches_list = {'html': '', 'unmatched_players_json': '[]'}
+    if request.user.is_authenticated or tournament.is_public:
+        def build_matches_list():
+            return get_tournament_matches_list(request, tournament, context)
+
+        if context['is_admin']:
+            # Admin controls carry the admin's CSRF token, so never share them
+            matches_list = build_matches_list()
+        else:
+            # Match cards only differ for the players in them
+            variant = f'user-{request.user.id}' if context['is_player'] else 'public'
+            matches_list = TournamentDetailCache.get_or_build(
+                tournament, 'matches', build_matches_list, variant)
+
+    context['matches_list'] = mark_safe(matches_list['html'])
+    context['matches_list_digest'] = TournamentLiveUpdates.get_digest(matches_list['html'])
+    context['unmatched_players_json'] = matches_list['unmatched_players_json']
+    return context
+
+
+def get_tournament_matches_list(request, tournament, context):
+    """
+    Render the matches list of the matches tab.
+
+    Returns a dict with the rendered 'html' and the 'unmatched_players_json'
+    used by the add match and report result modals.
+    """
     stages = tournament.stages.prefetch_related(
         'rounds__matches__result',
         'rounds__matches__player_one__player',
@@ -383,44 +462,20 @@ def tournament_detail_matches(request, tournament_code):
         else:
             unmatched_players = stage_players
 
-    can_add_match = False
-    can_report_result = False
-    show_unmatched_players = True
-    if current_stage:
-        pairing_strategy = current_stage.get_pairing_strategy()
-        is_self_scheduled = pairing_strategy.is_self_scheduled()
-        is_elimination_style = pairing_strategy.is_elimination_style()
-
-        if request.user.is_authenticated:
-            user_is_admin = tournament.is_user_admin(request.user)
-            user_is_player = tournament.players.filter(
-                user=request.user).exists()
-            can_report_result = is_self_scheduled and user_is_player
-            can_add_match = user_is_admin or can_report_result
-
-        show_unmatched_players = not (
-            is_elimination_style or is_self_scheduled)
-
     unmatched_players_json = json.dumps([{
         'id': sp.id,
         'name': sp.player.get_display_name(),
         'userId': sp.player.user.id if sp.player.user else None
     } for sp in unmatched_players])
 
-    context.update({
+    html = render_to_string('tourney/partials/tournament-matches-list.html', {
+        **context,
         'grouped_matches': grouped_matches,
         'latest_round': latest_round,
         'unmatched_players': unmatched_players,
-        'unmatched_players_json': unmatched_players_json,
-        'can_add_match': can_add_match,
-        'can_report_result': can_report_result,
-        'show_unmatched_players': show_unmatched_players,
-        'selected_stage': current_stage,
-    })
+    }, request=request)
 
-    if request.htmx:
-        return render(request, 'tourney/partials/tournament-detail-matches-content.html', context)
-    return render(request, 'tourney/tournament-detail-matches.html', context)
+    return {'html': html, 'unmatched_players_json': unmatched_players_json}
 
 
 def tournament_detail_standings(request, tournament_code):
@@ -428,21 +483,88 @@ def tournament_detail_standings(request, tournament_code):
     context = get_tournament_base_context(request, tournament)
     context['current_tab'] = 'standings'
 
-    standings = []
-    enabled_criteria = []
-    if context['current_stage']:
-        standings = StandingCalculator.get_tournament_standings(tournament)
-        enabled_criteria = context['current_stage'].get_enabled_ranking_criteria_objects(
-        )
+    standings_table = ''
+    if request.user.is_authenticated or tournament.is_public:
+        standings_table = TournamentDetailCache.get_or_render(
+            tournament, 'standings',
+            lambda: render_standings_table(tournament, context['current_stage']))
 
-    context['standings'] = standings
-    context['enabled_criteria'] = enabled_criteria
+    context['standings_table'] = standings_table
+    context['standings_table_digest'] = TournamentLiveUpdates.get_digest(standings_table)
 
     if request.htmx:
         return render(request, 'tourney/partials/tournament-detail-standings-content.html', context)
     return render(request, 'tourney/tournament-detail-standings.html', context)
 
 
+def render_standings_table(tournament, current_stage):
+    standings = []
+    enabled_criteria = []
+    if current_stage:
+        standings = StandingCalculator.get_tournament_standings(tournament)
+        enabled_criteria = current_stage.get_enabled_ranking_criteria_objects()
+
+    return render_to_string('tourney/partials/tournament-standings-table.html', {
+        'standings': standings,
+        'enabled_criteria': enabled_criteria,
+    })
+
+
+@require_GET
+def tournament_live_updates(request, tournament_code):
+    """
+    Poll for changes to the detail page fragments.
+
+    The client sends the revision it last rendered and, for each fragment it
+    shows, the digest of its current content (e.g. ?revision=3&matches=ab12).
+    Answers 204 while the revision is unchanged, otherwise the new revision
+    and only the fragments whose content actually differs.
+    """
+    tournament = get_object_or_404(Tournament, code=tournament_code)
+    if not (request.user.is_authenticated or tournament.is_public):
+        raise PermissionDenied
+
+    try:
+        revision = int(request.GET.get('revision', ''))
+    except ValueError:
+        return HttpResponse(status=400)
+
+    current_revision = TournamentLiveUpdates.wait_for_change(
+        tournament.id, revision, settings.TOURNEY_LIVE_UPDATE_WAIT)
+    if current_revision == revision:
+        return HttpResponse(status=204)
+
+    # Render against the revision that was just observed
+    tournament = get_object_or_404(Tournament, code=tournament_code)
+    renderers = {}
+    unmatched_players_json = None
+    if 'matches' in request.GET:
+        context = get_tournament_matches_context(request, tournament)
+        unmatched_players_json = context['unmatched_players_json']
+        renderers['matches'] = lambda: context['matches_list']
+    if 'standings' in request.GET:
+        renderers['standings'] = lambda: TournamentDetailCache.get_or_render(
+            tournament, 'standings',
+            lambda: render_standings_table(tournament, tournament.get_current_stage()))
+
+    fragments = TournamentLiveUpdates.get_changed_fragments(renderers, request.GET)
+    if 'matches' in fragments:
+        fragments['matches']['unmatched_players'] = json.loads(unmatched_players_json)
+
+    return JsonResponse({
+        'revision': tournament.revision,
+        'fragments': fragments,
+    })
+
+
+@require_GET
+@login_required
+@user_passes_test(lambda user: user.is_staff)
+def tournament_detail_cache_metrics(request):
+    # Counted per process, so this only covers the worker that answers
+    return JsonResponse(TournamentDetailCache.get_metrics())
+
+
 @login_required
 @is_tournament_admin
 def tournament_detail_admin(request, tournament_code):
@@ -1056,6 +1178,8 @@ def update_seeding_order(request, tournament_code):
                     stage=target_stage
                 ).update(seed=i + 1)
 
+            Tournament.bump_revision(pk=tournament.pk)
+
         stage_players = target_stage.stage_players.order_by('seed')
         context = {
             'tournament': tournament,